@@ -2,6 +2,9 @@
 ASGI config for appbackend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn appbackend.asgi:application``) so the
+long-lived event stream at /api/events/ runs on the event loop instead of
+holding a sync worker per connected client.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
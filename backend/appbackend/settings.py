@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 """
 import os
 from pathlib import Path
+from django.core.exceptions import ImproperlyConfigured
 from dotenv import find_dotenv, load_dotenv
 
 dotenv_path = find_dotenv()
@@ -64,6 +65,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Session logins resolve the user and profile with one query, like the JWT API
+AUTHENTICATION_BACKENDS = ['myapp.authentication.ProfileModelBackend']
+
 ROOT_URLCONF = 'appbackend.urls'
 
 TEMPLATES = [
@@ -103,12 +107,70 @@ WSGI_APPLICATION = 'appbackend.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Database profile, picked with DB_ENGINE: 'sqlite' (default) or 'postgresql'.
+# Benchmark write throughput for a profile with `manage.py benchmark_db_writes`.
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite")
+# Seconds a connection is kept open between requests; 0 reconnects on every request
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
+# How long a writer queues for the SQLite lock before failing with "database is locked".
+# Passed to the driver as the connection's timeout, which sets SQLite's busy timeout.
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+
+# Applied on every new SQLite connection. WAL lets readers run alongside the single writer,
+# and synchronous=NORMAL is durable under WAL except on power loss.
+SQLITE_PRAGMAS = [
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', str(128 * 1024 * 1024)))}",
+    "PRAGMA cache_size=-20000",  # KiB
+    "PRAGMA temp_store=MEMORY",
+]
+
+if DB_ENGINE == "sqlite" and os.getenv("SQLITE_TUNED", "1") == "0":
+    # Untuned baseline (rollback journal, reconnect per request), for benchmarking
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
+        }
     }
-}
+elif DB_ENGINE == "sqlite":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': '; '.join(SQLITE_PRAGMAS),
+                # Take the write lock when a transaction starts, so the busy timeout applies;
+                # a deferred transaction upgrading to a writer fails immediately when locked
+                'transaction_mode': 'IMMEDIATE',
+                'timeout': SQLITE_BUSY_TIMEOUT_MS / 1000,
+            },
+        }
+    }
+elif DB_ENGINE == "postgresql":
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("DB_NAME", "appbackend"),
+            'USER': os.getenv("DB_USER", ""),
+            'PASSWORD': os.getenv("DB_PASSWORD", ""),
+            'HOST': os.getenv("DB_HOST", "localhost"),
+            'PORT': os.getenv("DB_PORT", "5432"),
+            'CONN_MAX_AGE': DB_CONN_MAX_AGE,
+            # Check a reused connection before the request uses it, so a server restart
+            # costs one reconnect instead of a failed request
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'connect_timeout': 5,
+            },
+        }
+    }
+else:
+    raise ImproperlyConfigured(f"Unknown DB_ENGINE '{DB_ENGINE}'. Use 'sqlite' or 'postgresql'.")
 
 
 # Password validation
@@ -221,7 +283,8 @@ CSRF_COOKIE_SECURE = False  # Set to True in production with HTTPS
 # REST Framework and JWT settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication that also loads request.user.userprofile in the same query
+        'myapp.authentication.ProfileJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -243,3 +306,105 @@ SIMPLE_JWT = {
 }
 
 HIGH_SCHOOL_ADDRESS = "Normal Community High School, 3900 E Raab Rd, Normal, IL 61761"
+
+# Real-time push (Server-Sent Events at /api/events/)
+# 'local' fans out within one process; use 'redis' when running several ASGI workers or nodes
+REALTIME_BACKEND = os.getenv("REALTIME_BACKEND", "local")
+REALTIME_REDIS_URL = os.getenv("REALTIME_REDIS_URL")
+REALTIME_HEARTBEAT_SECONDS = 15
+
+# Seconds to cache pages of /api/job-post-success-rate/; 0 disables the cache
+PROVIDER_STATS_CACHE_TTL = int(os.getenv("PROVIDER_STATS_CACHE_TTL", "60"))
+
+# Caching. Each namespace below is its own cache alias (used through myapp/caching.py) with
+# its own default TTL and, on the locmem and file backends, its own entry limit past which
+# old entries are culled. CACHE_BACKEND picks where they live:
+# 'locmem' is per process, the stand-in for development and single-process deployments;
+# 'file' is shared by the processes of one host; 'redis' (any Redis-compatible server) by every node.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem")
+CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL")
+CACHE_FILE_DIR = os.getenv("CACHE_FILE_DIR", str(BASE_DIR / 'cache'))
+
+# name -> (default TTL in seconds, max entries); override a TTL with CACHE_TTL_<NAME>
+CACHE_NAMESPACES = {
+    'job_lists': (30, 500),
+    'grades': (7 * 24 * 3600, 5000),
+    'geocodes': (30 * 24 * 3600, 10000),
+    'stats': (60, 1000),
+    'leaderboards': (30, 100),
+    'prescreen': (24 * 3600, 10),
+}
+
+
+def cache_config(name, timeout=300, max_entries=300):
+    if CACHE_BACKEND == "locmem":
+        # A distinct LOCATION gives each namespace its own store and cull
+        return {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': name,
+            'TIMEOUT': timeout,
+            'OPTIONS': {'MAX_ENTRIES': max_entries},
+        }
+    if CACHE_BACKEND == "file":
+        return {
+            # Django's FileBasedCache with atomic add()/incr(), which locks and counters need
+            'BACKEND': 'myapp.cache_backends.LockingFileBasedCache',
+            'LOCATION': os.path.join(CACHE_FILE_DIR, name),
+            'TIMEOUT': timeout,
+            'OPTIONS': {'MAX_ENTRIES': max_entries},
+        }
+    if CACHE_BACKEND == "redis":
+        if not CACHE_REDIS_URL:
+            raise ImproperlyConfigured("CACHE_BACKEND 'redis' requires CACHE_REDIS_URL to be set.")
+        # Eviction is the server's maxmemory-policy; namespaces share the server, split by prefix
+        return {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+            'KEY_PREFIX': name,
+            'TIMEOUT': timeout,
+        }
+    raise ImproperlyConfigured(f"Unknown CACHE_BACKEND '{CACHE_BACKEND}'. Use 'locmem', 'file' or 'redis'.")
+
+
+CACHES = {
+    'default': cache_config('default'),
+    **{
+        name: cache_config(name, int(os.getenv(f"CACHE_TTL_{name.upper()}", timeout)), max_entries)
+        for name, (timeout, max_entries) in CACHE_NAMESPACES.items()
+    },
+}
+
+# LLM gateway (myapp/llm.py), shared by every grader in the process.
+# CEREBRAS_BASE_URL points the client elsewhere, e.g. at a local fake completion server.
+LLM_BASE_URL = os.getenv("CEREBRAS_BASE_URL") or None
+LLM_API_KEY = os.getenv("API_KEY")
+# Requests started per second (token bucket refill) and the burst allowed on top; 0 disables
+LLM_REQUESTS_PER_SECOND = float(os.getenv("LLM_REQUESTS_PER_SECOND", "5"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+# Completions in flight at once per process
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Deadline for one call, covering queueing, retries and streaming the reply
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "30"))
+# Retries after a 429, waiting Retry-After or LLM_BACKOFF_SECONDS doubled per attempt, with jitter
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_SECONDS = float(os.getenv("LLM_BACKOFF_SECONDS", "0.5"))
+
+# Applicant grading condenses each resume once into a short summary (stored on the
+# profile) and grades that against each job, instead of sending the whole resume per job
+RESUME_SUMMARIES = os.getenv("RESUME_SUMMARIES", "true").lower() in ("1", "true", "yes")
+
+# With RESUME_PRESCREEN on, applicant grading first scores the resume against the job's
+# terms locally (myapp.prescreen): a score of at least PRESCREEN_MATCH_SCORE with every
+# requirement met grades 85, at most PRESCREEN_MISMATCH_SCORE on a job that lists
+# requirements with none met grades 0, and everything else goes to the model. Off until
+# the thresholds are tuned on real model grades: python manage.py evaluate_prescreen
+# --labels reports calls avoided and agreement with them for other thresholds.
+RESUME_PRESCREEN = os.getenv("RESUME_PRESCREEN", "false").lower() in ("1", "true", "yes")
+# Placeholders, not validated against model grades: set both from an evaluate_prescreen
+# --labels --sweep run on real labels before turning RESUME_PRESCREEN on
+PRESCREEN_MATCH_SCORE = float(os.getenv("PRESCREEN_MATCH_SCORE", "0.5"))
+PRESCREEN_MISMATCH_SCORE = float(os.getenv("PRESCREEN_MISMATCH_SCORE", "0.1"))
+
+# Job descriptions scored per model call by the bulk and admin re-grading paths; 1 scores
+# each on its own (myapp.job_grade.score_descriptions_batched)
+JOB_GRADE_BATCH_SIZE = int(os.getenv("JOB_GRADE_BATCH_SIZE", "10"))
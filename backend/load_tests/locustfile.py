@@ -1,4 +1,5 @@
-from locust import HttpUser, between, task
+import os
+from locust import HttpUser, between, constant, task
 
 class WebsiteUser(HttpUser):
     wait_time = between(1, 5)
@@ -17,4 +18,46 @@ class WebsiteUser(HttpUser):
 
     @task
     def view_postjob(self):
-        self.client.get("api/postjob/")
\ No newline at end of file
+        self.client.get("api/postjob/")
+
+
+# Inbox load: compare the polling the frontend does today with the push stream.
+# Run each class on its own against the same server, e.g.
+#   locust -f load_tests/locustfile.py PollingInboxUser --users 200
+#   locust -f load_tests/locustfile.py StreamingInboxUser --users 200
+# PollingInboxUser holds roughly users / 1.5 requests per second for as long as
+# the tabs stay open; StreamingInboxUser makes one request per tab, so the
+# difference in total RPS is the polling load the event stream removes.
+LOAD_TEST_USERNAME = os.getenv("LOAD_TEST_USERNAME", "loadtest")
+LOAD_TEST_PASSWORD = os.getenv("LOAD_TEST_PASSWORD", "loadtest")
+
+class InboxUser(HttpUser):
+    abstract = True
+
+    def on_start(self):
+        response = self.client.post("/api/login/", json={
+            "username": LOAD_TEST_USERNAME,
+            "password": LOAD_TEST_PASSWORD,
+        })
+        self.token = response.json().get("access")
+        self.client.headers["Authorization"] = f"Bearer {self.token}"
+
+class PollingInboxUser(InboxUser):
+    # Same interval as the inbox page's unread/conversation polling
+    wait_time = constant(1.5)
+
+    @task
+    def poll_unread_count(self):
+        self.client.get("/api/messages/unread-count/")
+
+class StreamingInboxUser(InboxUser):
+    wait_time = constant(0)
+
+    @task
+    def hold_event_stream(self):
+        # One long-lived request per tab; heartbeats arrive every 15 seconds
+        with self.client.get(f"/api/events/?token={self.token}", stream=True,
+                             name="/api/events/", catch_response=True) as response:
+            for _ in response.iter_lines():
+                pass
+            response.success()
@@ -1,7 +1,12 @@
-from django.contrib import admin
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib import admin, messages
 from django.contrib.auth.models import User
 from django.contrib.auth.admin import UserAdmin
+from .caching import job_list_cache
+from .job_grade import GRADE_FIELDS, grade_jobs
 from .models import TodoItem, UserProfile, JobPosting, Reference, Education, Message
+from .stats import invalidate_dashboard_stats
 
 # Register your models here.
 admin.site.register(TodoItem)
@@ -47,8 +52,9 @@ class JobPostingAdmin(admin.ModelAdmin):
     list_display = ('title', 'company_name', 'created_at', 'status','grade')
     list_filter = ('status', 'created_at')
     search_fields = ('title', 'company_name', 'description')
-    fields = ('title', 'company_name', 'company_email', 'location', 'salary', 'job_type', 'description', 'requirements', 'custom_questions', 'featured', 'status', 'grade', 'created_at','posted_by')
-    actions = ['approve_jobs', 'deny_jobs']
+    fields = ('title', 'company_name', 'company_email', 'location', 'salary', 'job_type', 'description', 'requirements', 'custom_questions', 'featured', 'status', 'grade', 'grade_description_points', 'grade_travel_minutes', 'grade_travel_points', 'grade_model', 'grade_prompt_hash', 'grade_inputs_hash', 'graded_at', 'created_at','posted_by')
+    readonly_fields = ('grade_description_points', 'grade_travel_minutes', 'grade_travel_points', 'grade_model', 'grade_prompt_hash', 'grade_inputs_hash', 'graded_at')
+    actions = ['approve_jobs', 'deny_jobs', 'regrade_jobs']
 
     def approve_jobs(self, request, queryset):
         queryset.update(status='approved')
@@ -58,6 +64,22 @@ class JobPostingAdmin(admin.ModelAdmin):
         queryset.update(status='denied')
     deny_jobs.short_description = "Deny selected job postings"
 
+    def regrade_jobs(self, request, queryset):
+        # Batched like manage.py regrade_jobs; a job whose model call or travel lookup fails keeps its grade
+        jobs = list(queryset.only('id', 'title', 'description', 'location', *GRADE_FIELDS))
+        with ThreadPoolExecutor(settings.LLM_MAX_CONCURRENCY) as pool:
+            results = grade_jobs(jobs, pool.map, strict=True)
+        graded = [job for job, error in results if error is None]
+        JobPosting.objects.bulk_update(graded, GRADE_FIELDS)
+        # bulk_update sends no post_save, so drop what the job receivers would
+        job_list_cache.invalidate()
+        invalidate_dashboard_stats()
+        self.message_user(request, f"Re-graded {len(graded)} job posting(s).")
+        failed = [job.title for job, error in results if error is not None]
+        if failed:
+            self.message_user(request, f"Could not re-grade: {', '.join(failed)}", messages.WARNING)
+    regrade_jobs.short_description = "Re-grade selected job postings"
+
 @admin.register(Message)
 class MessageAdmin(admin.ModelAdmin):
     list_display = ('sender', 'recipient', 'timestamp', 'is_read')
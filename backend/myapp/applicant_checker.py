@@ -1,15 +1,17 @@
-import pdfplumber,os
-from dotenv import find_dotenv, load_dotenv
-from openai import OpenAI
-from openai import RateLimitError, APIError, APIConnectionError
+import json
+import os
 import requests
 from urllib.parse import urlparse
 from io import BytesIO
-import PyPDF2
 import re
+from contextlib import aclosing
+from . import llm
+from django.conf import settings
+from .caching import grade_cache, hash_key
+from .models import UserProfile
+from .prescreen import prescreen_grade
 
 
-api_key_me = os.getenv('API_KEY')
 #Giving the AI a role
 role = """You are an AI recruiter. Your task is to evaluate candidates based solely on their submitted resume and the provided job description for an open role. Your evaluation must produce a single output that consists of a numerical grade and a concise explanation, formatted as follows:
 
@@ -54,35 +56,16 @@ Your response must be in this format: <Grade>;<Explanation>.
 Here is the job desctiption and the resume
 """
 
-#setting up client
-
-from cerebras.cloud.sdk import Cerebras
-
-
-# Initialize with a default response in case of API failure
-try:
-    client = Cerebras(
-    api_key=api_key_me,  # This is the default and can be omitted
-    
-    )
-    stream = client.chat.completions.create(
-    messages=[
-        {
-            "role": "system",
-            "content": role
-        }
-    ],
-    model="llama-4-scout-17b-16e-instruct",
-    stream=True,
-    max_completion_tokens=16382,
-    temperature=0.7,
-    top_p=0.95
-)
-except (RateLimitError, APIError, APIConnectionError) as e:
-    print(f"Warning: Initial API call failed: {str(e)}")
-    completion = None
+# Stage one of two-stage grading: condenses a resume once, so each job is graded
+# against the summary instead of the full text
+summary_prompt = """Summarize the candidate's resume below for a recruiter who will compare it against several job descriptions. Reply with a single compact JSON object and nothing else, using these keys:
+"education" (school, grade level or graduation year, GPA if given), "experience" (list of role, organization, duration, main duties), "skills" (list), "certifications" (list), "activities" (list of extracurriculars, volunteering and awards), "availability" (hours or schedule if stated, else null).
+Keep every value short; omit nothing relevant to job fit and include nothing else. Here is the resume:
+"""
 
 def get_pdf_text(pdf_path):
+    import PyPDF2  # only needed once a resume is actually read
+
     try:
         # Handle Django FieldFile object
         if hasattr(pdf_path, 'path'):
@@ -181,53 +164,163 @@ def redact_pii_from_text(text, pii_data):
     
     return redacted_text
 
-import functools
+def check_applicant(pdf_path, job_description, profile=None, requirements=None):
+    grade, cache_key, content = prepare_grading(pdf_path, job_description, profile, requirements)
+    if grade is not None:
+        return grade
+    return grade_with_fallbacks(cache_key, content)
 
-@functools.cache
-def check_applicant(pdf_path, job_description):
-    global client
-    
+def prepare_grading(pdf_path, job_description, profile=None, requirements=None):
+    """
+    Everything before the grading call: reads, redacts, pre-screens and summarizes the
+    resume. Returns (grade, None, None) when the pre-screen settles it, else
+    (None, cache_key, content) for the grading prompt.
+    """
     text = get_pdf_text(pdf_path)
     
     # Extract and redact PII from the resume text
     pii_data = extract_pii_from_text(text)
     redacted_text = redact_pii_from_text(text, pii_data)
     print(redacted_text)
-    
+
+    if settings.RESUME_PRESCREEN:
+        # Clear matches and mismatches are graded locally, without a model call
+        grade = prescreen_grade(redacted_text, job_description, requirements)
+        if grade is not None:
+            llm.record('prescreened')
+            return grade, None, None
+
+    if settings.RESUME_SUMMARIES and redacted_text:
+        # Two stages: the resume is condensed once, and only the summary is sent per job
+        try:
+            # Only the profile's own resume is stored on it; live grading takes any URL
+            summary = get_resume_summary(redacted_text, profile if is_profile_resume(pdf_path, profile) else None)
+        except Exception as e:
+            print(f"Error summarizing resume, grading the full text: {str(e)}")
+        else:
+            return (None, *resume_summary_prompt(summary, job_description))
+    return (None, *resume_text_prompt(redacted_text, job_description))
+
+def is_profile_resume(pdf_path, profile):
+    """Whether pdf_path (a file field, path or URL) is the resume stored on profile."""
+    if profile is None or not profile.resume:
+        return False
+    resume = profile.resume
+    if isinstance(pdf_path, str):
+        try:
+            local_path = resume.path
+        except NotImplementedError:  # remote storage
+            local_path = None
+        return pdf_path in (resume.url, local_path) or urlparse(pdf_path).path == resume.url
+    return getattr(pdf_path, 'instance', None) == profile and pdf_path.name == resume.name
+
+def get_resume_summary(redacted_text, profile=None):
+    """
+    The compact JSON summary of a redacted resume, made once per content: reused from
+    the profile when it was made from the same text, else shared through the grade
+    cache (so concurrent requests summarize once) and stored on the profile. Pass
+    only the profile the resume belongs to.
+    """
+    content_hash = hash_key(summary_prompt, redacted_text)
+    if profile is not None and profile.resume_summary_hash == content_hash:
+        return profile.resume_summary
+
+    def summarize():
+        reply = llm.complete(summary_prompt + redacted_text)
+        # Raises ValueError on anything but a JSON object, so nothing malformed is cached
+        summary = json.loads(reply.strip().removeprefix("```json").strip("`"))
+        if not isinstance(summary, dict):
+            raise ValueError("Resume summary is not a JSON object")
+        return json.dumps(summary, separators=(',', ':'))
+
+    summary = grade_cache.get_or_set_once(f"summary:{content_hash}", summarize)
+    if profile is not None:
+        UserProfile.objects.filter(pk=profile.pk).update(resume_summary=summary, resume_summary_hash=content_hash)
+        profile.resume_summary, profile.resume_summary_hash = summary, content_hash
+    return summary
+
+def resume_text_prompt(redacted_text, job_description):
+    """(cache key, grading prompt) for already-redacted resume text."""
+    # Keyed on content rather than the file, so re-uploads and URLs of the same resume hit.
+    # An unreadable resume (no text) is never cached, since the read may succeed next time
+    return (
+        hash_key(redacted_text, job_description) if redacted_text else None,
+        role + f"The job description is as follows: {job_description} and here is the canidates job application: {redacted_text}"
+    )
+
+def resume_summary_prompt(summary, job_description):
+    """(cache key, grading prompt) for a resume summary from get_resume_summary."""
+    return (
+        hash_key('summary', summary, job_description),
+        role + f"The job description is as follows: {job_description} and here is a summary of the canidates resume: {summary}"
+    )
+
+def grade_resume_text(redacted_text, job_description):
+    """Grades already-redacted resume text against a job description, as "<Grade>;<Explanation>"."""
+    return grade_with_fallbacks(*resume_text_prompt(redacted_text, job_description))
+
+def grade_resume_summary(summary, job_description):
+    """Grades a resume summary from get_resume_summary against a job description."""
+    return grade_with_fallbacks(*resume_summary_prompt(summary, job_description))
+
+def grade_with_fallbacks(cache_key, content):
+    """
+    Runs one grading prompt. Identical requests arriving together share one call. Only
+    real grades are cached (unless cache_key is None); the fallbacks below are retried
+    on the next call.
+    """
+    def complete():
+        return llm.complete(content)
+
     try:
-        stream = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": role + f"The job description is as follows: {job_description} and here is the canidates job application: {redacted_text}"
-                }
-            ],
-            model="llama-4-scout-17b-16e-instruct",
-            stream=True,
-            max_completion_tokens=16382,
-            temperature=0.7,
-            top_p=0.95
-        )
-        
-        # Collect the streamed response
-        full_response = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                full_response += chunk.choices[0].delta.content
-        
-        return full_response
-    except RateLimitError as e:
-        print(f"Rate limit exceeded: {str(e)}")
+        if cache_key:
+            return grade_cache.get_or_set_once(cache_key, complete)
+        return complete()
+    except Exception as e:
+        return fallback_grade(e)
+
+async def astream_grade(cache_key, content):
+    """
+    grade_with_fallbacks() for a streaming response: yields the reply as it arrives
+    (a cached grade comes whole) and caches it once complete. A failure before any
+    text yields the fallback grade; after some text it is raised. Closing the
+    generator early closes the upstream stream, and nothing is cached.
+    """
+    if cache_key:
+        cached = grade_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+    parts = []
+    try:
+        async with aclosing(llm.astream(content)) as reply:
+            async for piece in reply:
+                parts.append(piece)
+                yield piece
+    except Exception as e:
+        if parts:
+            raise
+        yield fallback_grade(e)
+        return
+    if cache_key:
+        grade_cache.set(cache_key, "".join(parts))
+
+def fallback_grade(error):
+    """The grade reported when the grading call fails; it asks for a human review."""
+    if isinstance(error, llm.LLMTimeout):
+        print(f"Grading timed out: {str(error)}")
+        return "75;The grading service is busy. Please try again later or contact support."
+    if isinstance(error, llm.RateLimitError):
+        print(f"Rate limit exceeded: {str(error)}")
         return "75;Rate limit exceeded. Please try again later or contact support."
-    except APIError as e:
-        print(f"API error occurred: {str(e)}")
+    if isinstance(error, llm.APIError):
+        print(f"API error occurred: {str(error)}")
         return "75;API error occurred. Please try again later or contact support."
-    except APIConnectionError as e:
-        print(f"Connection error: {str(e)}")
+    if isinstance(error, llm.APIConnectionError):
+        print(f"Connection error: {str(error)}")
         return "75;Connection error. Please check your internet connection and try again."
-    except Exception as e:
-        print(f"Unexpected error: {str(e)}")
-        return "75;An unexpected error occurred. Please try again later or contact support."
+    print(f"Unexpected error: {str(error)}")
+    return "75;An unexpected error occurred. Please try again later or contact support."
 
 def clean_grade(grade_response):
     grade = ""
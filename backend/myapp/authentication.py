@@ -0,0 +1,41 @@
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import User
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+
+def users_with_profile():
+    # The reverse one-to-one join also fills profile.user, so serializers reading
+    # request.user.userprofile.user do not query again
+    return User.objects.select_related('userprofile')
+
+
+class UsersWithProfile:
+    """Stands in for the user model in JWTAuthentication's user lookup."""
+    DoesNotExist = User.DoesNotExist
+
+    @property
+    def objects(self):
+        return users_with_profile()
+
+
+class ProfileJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that loads the user and their UserProfile in one query, so
+    request.user.userprofile is free for the rest of the request. Missing profiles
+    raise UserProfile.DoesNotExist on access, without a query, as before.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.user_model = UsersWithProfile()
+
+
+class ProfileModelBackend(ModelBackend):
+    """ModelBackend whose session user lookup joins the profile in the same way."""
+
+    def get_user(self, user_id):
+        try:
+            user = users_with_profile().get(pk=user_id)
+        except User.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
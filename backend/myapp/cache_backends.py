@@ -0,0 +1,35 @@
+import os
+from contextlib import contextmanager
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.files import locks
+
+LOCK_FILE_NAME = 'cache.lock'
+
+
+class LockingFileBasedCache(FileBasedCache):
+    """
+    FileBasedCache whose add() and incr() are atomic across processes. Django's
+    versions check and then write, so two workers can both "add" the same key;
+    caching.CacheNamespace relies on add() for its generation counter and
+    single-flight locks, and on incr() to invalidate.
+    """
+
+    @contextmanager
+    def _exclusive(self):
+        self._createdir()
+        # The lock file has no cache suffix, so cull and clear leave it alone
+        with open(os.path.join(self._dir, LOCK_FILE_NAME), 'ab') as lock_file:
+            locks.lock(lock_file, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(lock_file)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self._exclusive():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self._exclusive():
+            return super().incr(key, delta, version)
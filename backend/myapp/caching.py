@@ -0,0 +1,209 @@
+import hashlib
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+
+# Stored outside the generation scheme, under a version no entry ever uses
+GENERATION_KEY = 'generation'
+GENERATION_VERSION = 0
+
+_MISSING = object()
+
+# How often a worker waiting on another worker's computation checks for its result
+SINGLE_FLIGHT_POLL_SECONDS = 0.05
+
+# Per-process counters: {namespace: Counter(hits=, misses=, sets=, invalidations=)}
+_metrics = defaultdict(Counter)
+_metrics_lock = threading.Lock()
+
+
+def record(namespace, event, count=1):
+    with _metrics_lock:
+        _metrics[namespace][event] += count
+
+
+def cache_metrics():
+    """This process's counters per namespace, with hit_rate (None before the first read)."""
+    with _metrics_lock:
+        snapshot = {name: Counter(_metrics[name]) for name in settings.CACHE_NAMESPACES}
+    result = {}
+    for name, counts in snapshot.items():
+        reads = counts['hits'] + counts['misses']
+        result[name] = {
+            'hits': counts['hits'],
+            'misses': counts['misses'],
+            'sets': counts['sets'],
+            'invalidations': counts['invalidations'],
+            'coalesced': counts['coalesced'],
+            'hit_rate': round(counts['hits'] / reads, 4) if reads else None,
+        }
+    return result
+
+
+def reset_cache_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+class InFlight:
+    """One computation that callers in this process are waiting on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+# (namespace, key) -> InFlight, for single-flight within the process
+_in_flight = {}
+_in_flight_lock = threading.Lock()
+
+
+def hash_key(*parts):
+    """A short fixed-length key for free text (addresses, resumes, descriptions)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+class CacheNamespace:
+    """
+    One named cache from settings.CACHE_NAMESPACES. Every key is versioned with the
+    namespace's generation number, so invalidate() drops all of its entries at once
+    without knowing which exist; the orphaned entries expire through their TTL.
+    """
+
+    def __init__(self, name):
+        self.name = name
+
+    @property
+    def cache(self):
+        return caches[self.name]
+
+    def generation(self):
+        generation = self.cache.get(GENERATION_KEY, version=GENERATION_VERSION)
+        if generation is None:
+            # Seeded from the clock: if the counter was evicted, the new one cannot
+            # land on a generation whose entries are still stored
+            self.cache.add(GENERATION_KEY, int(time.time() * 1000), None, version=GENERATION_VERSION)
+            generation = self.cache.get(GENERATION_KEY, version=GENERATION_VERSION)
+        return generation
+
+    def get(self, key, default=None):
+        value = self.cache.get(key, _MISSING, version=self.generation())
+        if value is _MISSING:
+            record(self.name, 'misses')
+            return default
+        record(self.name, 'hits')
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        """Stores value; timeout defaults to the namespace TTL, None never expires."""
+        self.cache.set(key, value, timeout, version=self.generation())
+        record(self.name, 'sets')
+
+    def get_or_set(self, key, compute, timeout=DEFAULT_TIMEOUT):
+        """Returns the cached value, or computes, stores and returns it on a miss."""
+        version = self.generation()
+        value = self.cache.get(key, _MISSING, version=version)
+        if value is not _MISSING:
+            record(self.name, 'hits')
+            return value
+        record(self.name, 'misses')
+        value = compute()
+        # Under the generation read before computing: an invalidation meanwhile orphans it
+        self.cache.set(key, value, timeout, version=version)
+        record(self.name, 'sets')
+        return value
+
+    def get_or_set_once(self, key, compute, timeout=DEFAULT_TIMEOUT, lock_timeout=60):
+        """
+        get_or_set() where concurrent misses for the same key share one compute().
+        Threads of this process wait on the first caller; other processes wait on a
+        lock stored in this cache (so only when the backend is shared, file or redis)
+        and read the result it stores. If compute() raises, the waiting threads get
+        the same error and nothing is stored; a waiting process then computes itself.
+        lock_timeout bounds how long a crashed worker's lock can hold others up.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with _in_flight_lock:
+            call = _in_flight.get((self.name, key))
+            leader = call is None
+            if leader:
+                call = _in_flight[(self.name, key)] = InFlight()
+        if not leader:
+            record(self.name, 'coalesced')
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = self._compute_once(key, compute, timeout, lock_timeout)
+            return call.value
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with _in_flight_lock:
+                del _in_flight[(self.name, key)]
+            call.done.set()
+
+    def _compute_once(self, key, compute, timeout, lock_timeout):
+        version = self.generation()
+        lock_key = f"lock:{key}"
+        token = uuid.uuid4().hex
+        give_up = time.monotonic() + lock_timeout
+        while not self.cache.add(lock_key, token, lock_timeout, version=version):
+            # Another process is computing: wait for its result or for the lock to go
+            if time.monotonic() > give_up:
+                return self._compute_and_set(key, compute, timeout, version)
+            time.sleep(SINGLE_FLIGHT_POLL_SECONDS)
+            value = self.cache.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                record(self.name, 'coalesced')
+                return value
+        try:
+            # The holder of the lock may have stored the value just before releasing it
+            value = self.cache.get(key, _MISSING, version=version)
+            if value is not _MISSING:
+                return value
+            return self._compute_and_set(key, compute, timeout, version)
+        finally:
+            if self.cache.get(lock_key, version=version) == token:
+                self.cache.delete(lock_key, version=version)
+
+    def _compute_and_set(self, key, compute, timeout, version):
+        value = compute()
+        self.cache.set(key, value, timeout, version=version)
+        record(self.name, 'sets')
+        return value
+
+    def delete(self, key):
+        self.cache.delete(key, version=self.generation())
+
+    def invalidate(self):
+        """Drops every entry in the namespace."""
+        try:
+            self.cache.incr(GENERATION_KEY, version=GENERATION_VERSION)
+        except ValueError:
+            # No counter stored; the next read seeds a fresh one
+            pass
+        record(self.name, 'invalidations')
+
+
+job_list_cache = CacheNamespace('job_lists')
+grade_cache = CacheNamespace('grades')
+geocode_cache = CacheNamespace('geocodes')
+stats_cache = CacheNamespace('stats')
+leaderboard_cache = CacheNamespace('leaderboards')
+prescreen_cache = CacheNamespace('prescreen')
@@ -1,7 +1,23 @@
-import math
+from collections import defaultdict
 from django.utils import timezone
 from django.db.models import Sum
 from .models import UserProfile, Challenge, UserChallenge, Message
+from .leaderboard import refresh_leaderboard_entries
+
+# --- Domain events ---
+# Each event names something that happened to a user. Only challenges whose
+# criteria can be affected by that event are re-evaluated when it fires.
+APPLIED = 'applied'
+FAVORITED = 'favorited'
+MESSAGE_RECEIVED = 'message_received'
+MESSAGES_READ = 'messages_read'
+REFERENCE_ADDED = 'reference_added'
+# Resume uploads arrive as PROFILE_SAVED since the resume is a profile field
+PROFILE_SAVED = 'profile_saved'
+# Fired by myapp.profile_completion once the stored completion percentage moves
+PROFILE_COMPLETION_CHANGED = 'profile_completion_changed'
+CHALLENGE_COMPLETED = 'challenge_completed'
+
 
 def recalculate_and_update_user_points(user_profile: UserProfile):
     """
@@ -16,210 +32,312 @@ def recalculate_and_update_user_points(user_profile: UserProfile):
     )['total'] or 0
 
     user_profile.points = total_points
+    # Plain UPDATE so recording points does not fire post_save and re-trigger evaluation
+    UserProfile.objects.filter(pk=user_profile.pk).update(points=total_points)
 
-def calculate_profile_completion(user_profile: UserProfile) -> int:
-    """Calculates the profile completion percentage based on actual model fields."""
-    fields_to_check = [
-        # User model fields
-        user_profile.user.first_name,
-        user_profile.user.last_name,
-        user_profile.user.email,
-        # UserProfile model fields
-        user_profile.profile_picture,
-        user_profile.resume,
-        user_profile.gpa,
-        user_profile.skills.exists(),
-        user_profile.references.exists(),
-        user_profile.education.exists(),
-    ]
-    total_fields = len(fields_to_check)
-    
-    # Count how many of the fields are filled/present
-    completed_fields = 0
-    for field in fields_to_check:
-        if isinstance(field, bool): # For .exists() which returns True/False
-            if field:
-                completed_fields += 1
-        elif field: # For other fields that can be None, empty string, etc.
-            completed_fields += 1
-
-    return math.floor((completed_fields / total_fields) * 100) if total_fields > 0 else 0
-
-
-def check_application_challenge(user_profile: UserProfile, user_challenge: UserChallenge):
-    """Checks challenges related to applying for jobs."""
-    try:
-        # Assumes criteria is like {'action': 'apply_to_jobs', 'count': 3}
-        target_count = int(user_challenge.challenge.criteria.get('count', 1))
-        current_count = user_profile.num_applications
-        
-        user_challenge.progress = {'current': min(current_count, target_count), 'target': target_count}
-        
-        if not user_challenge.is_completed and current_count >= target_count:
-            user_challenge.is_completed = True
-            user_challenge.completed_at = timezone.now()
-            # Award points etc. can be handled by signals or here
-            
-        user_challenge.save()
-    except (ValueError, TypeError):
-        # Handle cases where criteria is not set or malformed
-        pass
+class ChallengeMetrics:
+    """
+    Lazily computed per-user figures shared by every challenge evaluated in one pass,
+    so several challenges of the same kind cost a single query between them.
+    """
 
+    def __init__(self, user_profile: UserProfile):
+        self.user_profile = user_profile
+        self._cache = {}
 
-def check_profile_completion_challenge(user_profile: UserProfile, user_challenge: UserChallenge):
-    """Checks challenges related to profile completion."""
-    try:
-        target_percentage = int(user_challenge.challenge.criteria.get('percentage', 100))
-        current_percentage = calculate_profile_completion(user_profile)
+    def _get(self, key, compute):
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
 
-        user_challenge.progress = {'current': min(current_percentage, 100), 'target': target_percentage}
+    def forget(self, key):
+        self._cache.pop(key, None)
 
-        if not user_challenge.is_completed and current_percentage >= target_percentage:
-            user_challenge.is_completed = True
-            user_challenge.completed_at = timezone.now()
-            
-        user_challenge.save()
-    except (ValueError, TypeError):
-        pass
+    @property
+    def num_applications(self):
+        return self._get('num_applications', lambda: UserProfile.objects.values_list('num_applications', flat=True).get(pk=self.user_profile.pk) or 0)
 
+    @property
+    def profile_completion(self):
+        # The stored value, kept current by myapp.profile_completion
+        return self._get('profile_completion', lambda: UserProfile.objects.values_list('profile_completion', flat=True).get(pk=self.user_profile.pk))
 
-def check_first_challenge_completed(user_profile: UserProfile, user_challenge: UserChallenge):
-    """Checks if the user has completed their first challenge of any type."""
-    # Count all completed challenges, including meta-challenges.
-    completed_challenges_count = UserChallenge.objects.filter(
-        user=user_profile,
-        is_completed=True
-    ).exclude(id=user_challenge.id).count() # Exclude itself to prevent self-completion
+    @property
+    def unread_count(self):
+        # Read fresh: the counter is maintained with F() updates the in-memory profile has not seen
+        return self._get('unread_count', lambda: UserProfile.objects.values_list('unread_message_count', flat=True).get(pk=self.user_profile.pk))
 
-    user_challenge.progress = {'current': min(completed_challenges_count, 1), 'target': 1}
+    @property
+    def has_resume(self):
+        return self._get('has_resume', lambda: bool(self.user_profile.resume))
 
-    if not user_challenge.is_completed and completed_challenges_count >= 1:
-        user_challenge.is_completed = True
-        user_challenge.completed_at = timezone.now()
-    
-    user_challenge.save()
+    @property
+    def has_received_message(self):
+        return self._get('has_received_message', lambda: Message.objects.filter(recipient=self.user_profile).exists())
 
-def check_multiple_challenges_completed(user_profile: UserProfile, user_challenge: UserChallenge):
-    """Checks if the user has completed a specific number of challenges of any type."""
-    try:
-        # Expects criteria like {'count': 5}
-        target_count = int(user_challenge.challenge.criteria.get('count', 1))
+    @property
+    def has_references(self):
+        return self._get('has_references', lambda: self.user_profile.references.exists())
 
-        # Count all completed challenges, including other meta-challenges.
-        completed_challenges_count = UserChallenge.objects.filter(
-            user=user_profile,
-            is_completed=True
-        ).exclude(id=user_challenge.id).count() # Exclude itself from the count
+    @property
+    def has_favorited(self):
+        return self._get('has_favorited', lambda: self.user_profile.favorited_jobs.exists())
 
-        user_challenge.progress = {'current': min(completed_challenges_count, target_count), 'target': target_count}
+    @property
+    def completed_challenges(self):
+        return self._get('completed_challenges', lambda: UserChallenge.objects.filter(user=self.user_profile, is_completed=True).count())
 
-        if not user_challenge.is_completed and completed_challenges_count >= target_count:
-            user_challenge.is_completed = True
-            user_challenge.completed_at = timezone.now()
 
-        user_challenge.save()
-    except (ValueError, TypeError):
-        pass # Fail gracefully if criteria is malformed
+# --- Evaluators ---
+# Each returns (current, target) for one challenge; the challenge is met once current >= target.
+
+def check_application_challenge(metrics: ChallengeMetrics, challenge: Challenge):
+    """Checks challenges related to applying for jobs."""
+    # Assumes criteria is like {'action': 'apply_to_jobs', 'count': 3}
+    target_count = int(challenge.criteria.get('count', 1))
+    return metrics.num_applications, target_count
+
+
+def check_profile_completion_challenge(metrics: ChallengeMetrics, challenge: Challenge):
+    """Checks challenges related to profile completion."""
+    target_percentage = int(challenge.criteria.get('percentage', 100))
+    return min(int(metrics.profile_completion), 100), target_percentage
+
+
+def check_first_challenge_completed(metrics: ChallengeMetrics, challenge: Challenge):
+    """Checks if the user has completed their first challenge of any type."""
+    # Only incomplete challenges are evaluated, so the count never includes this one
+    return metrics.completed_challenges, 1
+
+
+def check_multiple_challenges_completed(metrics: ChallengeMetrics, challenge: Challenge):
+    """Checks if the user has completed a specific number of challenges of any type."""
+    # Expects criteria like {'count': 5}
+    target_count = int(challenge.criteria.get('count', 1))
+    return metrics.completed_challenges, target_count
+
 
-def check_inbox_zero(user_profile: UserProfile, user_challenge: UserChallenge):
+def check_inbox_zero(metrics: ChallengeMetrics, challenge: Challenge):
     """Checks if the user has read all their messages."""
-    unread_count = Message.objects.filter(recipient=user_profile, is_read=False).count()
-    
     # This challenge is binary: either you have 0 unread, or you don't.
-    # Progress can be shown as 1 (done) or 0 (not done).
-    current_progress = 1 if unread_count == 0 else 0
-    user_challenge.progress = {'current': current_progress, 'target': 1}
+    return (1 if metrics.unread_count == 0 else 0), 1
 
-    if not user_challenge.is_completed and unread_count == 0:
-        user_challenge.is_completed = True
-        user_challenge.completed_at = timezone.now()
-        
-    user_challenge.save()
 
-
-def check_resume_upload_challenge(user_profile: UserProfile, user_challenge: UserChallenge):
+def check_resume_upload_challenge(metrics: ChallengeMetrics, challenge: Challenge):
     """Checks if the user has uploaded a resume."""
-    has_resume = bool(user_profile.resume)
-    
-    user_challenge.progress = {'current': 1 if has_resume else 0, 'target': 1}
+    return (1 if metrics.has_resume else 0), 1
 
-    if not user_challenge.is_completed and has_resume:
-        user_challenge.is_completed = True
-        user_challenge.completed_at = timezone.now()
-        
-    user_challenge.save()
 
-def check_received_message_challenge(user_profile: UserProfile, user_challenge: UserChallenge):
+def check_received_message_challenge(metrics: ChallengeMetrics, challenge: Challenge):
     """Checks if the user has received at least one message."""
-    has_message = Message.objects.filter(recipient=user_profile).exists()
-    
-    user_challenge.progress = {'current': 1 if has_message else 0, 'target': 1}
+    return (1 if metrics.has_received_message else 0), 1
 
-    if not user_challenge.is_completed and has_message:
-        user_challenge.is_completed = True
-        user_challenge.completed_at = timezone.now()
-        
-    user_challenge.save()
 
-def check_references_added_challenge(user_profile: UserProfile, user_challenge: UserChallenge):
+def check_references_added_challenge(metrics: ChallengeMetrics, challenge: Challenge):
     """Checks if the user has added at least one reference."""
-    has_references = user_profile.references.exists()
-    
-    user_challenge.progress = {'current': 1 if has_references else 0, 'target': 1}
+    return (1 if metrics.has_references else 0), 1
 
-    if not user_challenge.is_completed and has_references:
-        user_challenge.is_completed = True
-        user_challenge.completed_at = timezone.now()
-        
-    user_challenge.save()
 
-def check_favorited_job_challenge(user_profile: UserProfile, user_challenge: UserChallenge):
+def check_favorited_job_challenge(metrics: ChallengeMetrics, challenge: Challenge):
     """Checks if the user has favorited at least one job."""
-    has_favorited = user_profile.favorited_jobs.exists()
-    
-    user_challenge.progress = {'current': 1 if has_favorited else 0, 'target': 1}
-
-    if not user_challenge.is_completed and has_favorited:
-        user_challenge.is_completed = True
-        user_challenge.completed_at = timezone.now()
-        
-    user_challenge.save()
+    return (1 if metrics.has_favorited else 0), 1
 
 
-# --- Main Dispatcher ---
+# --- Registry ---
 
 # A list of tuples guarantees the order of checks.
 # More specific keywords should come before more general ones.
-CHALLENGE_CHECKERS = [
-    ('first challenge', check_first_challenge_completed),
-    ('challenge', check_multiple_challenges_completed), # Catches "Challenge Champion" and "Complete 5 Challenges"
-    ('apply', check_application_challenge),
-    ('profile', check_profile_completion_challenge),
-    ('inbox zero', check_inbox_zero),
-    ('resume', check_resume_upload_challenge),
-    ('message', check_received_message_challenge),
-    ('reference', check_references_added_challenge),
-    ('favorite', check_favorited_job_challenge),
+CHALLENGE_KINDS = [
+    ('first challenge', 'first_challenge'),
+    ('challenge', 'challenge_count'), # Catches "Challenge Champion" and "Complete 5 Challenges"
+    ('apply', 'applications'),
+    ('profile', 'profile_completion'),
+    ('inbox zero', 'inbox_zero'),
+    ('resume', 'resume'),
+    ('message', 'message_received'),
+    ('reference', 'references'),
+    ('favorite', 'favorites'),
 ]
 
+CHALLENGE_CHECKERS = {
+    'first_challenge': check_first_challenge_completed,
+    'challenge_count': check_multiple_challenges_completed,
+    'applications': check_application_challenge,
+    'profile_completion': check_profile_completion_challenge,
+    'inbox_zero': check_inbox_zero,
+    'resume': check_resume_upload_challenge,
+    'message_received': check_received_message_challenge,
+    'references': check_references_added_challenge,
+    'favorites': check_favorited_job_challenge,
+}
+
+# Which challenge kinds each event can move
+EVENT_CHALLENGE_KINDS = {
+    APPLIED: {'applications'},
+    FAVORITED: {'favorites'},
+    MESSAGE_RECEIVED: {'message_received', 'inbox_zero'},
+    MESSAGES_READ: {'inbox_zero'},
+    REFERENCE_ADDED: {'references'},
+    PROFILE_SAVED: {'resume', 'applications'},
+    PROFILE_COMPLETION_CHANGED: {'profile_completion'},
+    CHALLENGE_COMPLETED: {'first_challenge', 'challenge_count'},
+}
+
+# Completing challenges can complete meta-challenges, which can complete more; bound the cascade
+MAX_COMPLETION_ROUNDS = 5
+
+
+def get_challenge_kind(challenge: Challenge):
+    """Resolves a challenge to its kind, preferring an explicit criteria['kind'] over the name keywords."""
+    kind = challenge.criteria.get('kind') if isinstance(challenge.criteria, dict) else None
+    if kind in CHALLENGE_CHECKERS:
+        return kind
+    challenge_name = challenge.name.lower()
+    for key, kind in CHALLENGE_KINDS:
+        if key in challenge_name:
+            return kind
+    return None
+
+
+def _evaluate(user_challenges, metrics: ChallengeMetrics):
+    """Updates the given challenges in memory. Returns (changed, newly_completed)."""
+    changed, newly_completed = [], []
+    for user_challenge in user_challenges:
+        checker = CHALLENGE_CHECKERS.get(get_challenge_kind(user_challenge.challenge))
+        if checker is None:
+            continue
+        try:
+            current, target = checker(metrics, user_challenge.challenge)
+        except (ValueError, TypeError):
+            # Handle cases where criteria is not set or malformed
+            continue
+
+        progress = {'current': min(current, target), 'target': target}
+        completed = current >= target
+        if progress == user_challenge.progress and not completed:
+            continue
+
+        user_challenge.progress = progress
+        if completed:
+            user_challenge.is_completed = True
+            user_challenge.completed_at = timezone.now()
+            newly_completed.append(user_challenge)
+        changed.append(user_challenge)
+    return changed, newly_completed
+
+
+def _pending_challenges(user_profile: UserProfile, kinds):
+    user_challenges = UserChallenge.objects.filter(user=user_profile, is_completed=False).select_related('challenge')
+    return [uc for uc in user_challenges if get_challenge_kind(uc.challenge) in kinds]
+
+
+def evaluate_user_challenges(user_profile: UserProfile, user_challenges):
+    """
+    Re-evaluates the given incomplete challenges, writes only the rows whose progress
+    changed with one bulk_update, cascades into meta-challenges when anything completes,
+    and refreshes the user's points only if a completion happened.
+    """
+    metrics = ChallengeMetrics(user_profile)
+    any_completed = False
+
+    for _ in range(MAX_COMPLETION_ROUNDS):
+        changed, newly_completed = _evaluate(user_challenges, metrics)
+        if changed:
+            UserChallenge.objects.bulk_update(changed, ['progress', 'is_completed', 'completed_at'])
+        if not newly_completed:
+            break
+        any_completed = True
+        metrics.forget('completed_challenges')
+        # Re-check meta-challenges, including ones evaluated earlier this pass
+        user_challenges = _pending_challenges(user_profile, EVENT_CHALLENGE_KINDS[CHALLENGE_COMPLETED])
+        if not user_challenges:
+            break
+
+    if any_completed:
+        recalculate_and_update_user_points(user_profile)
+        refresh_leaderboard_entries(user_profile.pk)
+
+
+def process_challenge_event(user_profile: UserProfile, event):
+    """Re-evaluates only the user's incomplete challenges that the event can affect."""
+    user_challenges = _pending_challenges(user_profile, EVENT_CHALLENGE_KINDS[event])
+    if user_challenges:
+        evaluate_user_challenges(user_profile, user_challenges)
+
+
 def update_all_challenges_for_user(user_profile: UserProfile):
     """
-    Iterates through all of a user's active challenges, updates their progress,
-    recalculates total points, and saves the profile.
+    Full re-check of every incomplete challenge for the user. Event handlers should use
+    process_challenge_event instead; this is for newly provisioned challenges and repairs.
     """
-    user_challenges = UserChallenge.objects.filter(user=user_profile, is_completed=False).select_related('challenge')
+    user_challenges = list(
+        UserChallenge.objects.filter(user=user_profile, is_completed=False).select_related('challenge')
+    )
+    if user_challenges:
+        evaluate_user_challenges(user_profile, user_challenges)
 
-    for user_challenge in user_challenges:
-        challenge_name = user_challenge.challenge.name.lower()
-        
-        # Find the appropriate checker function from the prioritized list
-        for key, checker_function in CHALLENGE_CHECKERS:
-            if key in challenge_name:
-                checker_function(user_profile, user_challenge)
-                break # Move to the next user_challenge after finding the first match
-    
-    # After checking challenges, recalculate points from the single source of truth.
-    recalculate_and_update_user_points(user_profile)
-    
-    # Save the profile once to persist all changes (points, etc.)
-    user_profile.save() 
\ No newline at end of file
+
+# --- Provisioning ---
+
+PROVISION_BATCH_SIZE = 2000
+
+
+def get_active_challenges():
+    today = timezone.now().date()
+    return Challenge.objects.filter(start_date__lte=today, end_date__gte=today)
+
+
+def provision_challenges_for_profiles(challenge_ids, profile_ids):
+    """
+    Creates the missing UserChallenge rows (and profile.challenges links) for every
+    (profile, challenge) pair. Existing pairs are skipped by the unique constraints,
+    and bulk_create fires no per-profile signals. The new rows are evaluated here, so
+    listing challenges never has to.
+    """
+    UserChallenge.objects.bulk_create(
+        [UserChallenge(user_id=profile_id, challenge_id=challenge_id)
+         for profile_id in profile_ids for challenge_id in challenge_ids],
+        ignore_conflicts=True,
+    )
+    ProfileChallenge = UserProfile.challenges.through
+    ProfileChallenge.objects.bulk_create(
+        [ProfileChallenge(userprofile_id=profile_id, challenge_id=challenge_id)
+         for profile_id in profile_ids for challenge_id in challenge_ids],
+        ignore_conflicts=True,
+    )
+
+    # Never evaluated: the rows just created (and any an earlier run left behind)
+    unevaluated = defaultdict(list)
+    for user_challenge in UserChallenge.objects.filter(
+        user_id__in=profile_ids, challenge_id__in=challenge_ids, is_completed=False,
+    ).select_related('challenge'):
+        if not user_challenge.progress:
+            unevaluated[user_challenge.user_id].append(user_challenge)
+    for profile in UserProfile.objects.filter(id__in=unevaluated).select_related('user'):
+        evaluate_user_challenges(profile, unevaluated[profile.id])
+
+
+def provision_challenges(challenge_ids, batch_size=PROVISION_BATCH_SIZE, progress=None):
+    """
+    Provisions the given challenges for every profile, walking profile ids in keyset
+    batches so memory stays bounded regardless of the number of users.
+    Returns the number of profiles processed.
+    """
+    challenge_ids = list(challenge_ids)
+    if not challenge_ids:
+        return 0
+
+    processed = 0
+    last_id = 0
+    while True:
+        profile_ids = list(
+            UserProfile.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:batch_size]
+        )
+        if not profile_ids:
+            break
+        provision_challenges_for_profiles(challenge_ids, profile_ids)
+        processed += len(profile_ids)
+        last_id = profile_ids[-1]
+        if progress:
+            progress(processed)
+    return processed
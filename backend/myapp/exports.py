@@ -0,0 +1,127 @@
+import csv
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from django.db.models import Count, Q
+from django.db.models.functions import Length
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import ValidationError
+from .models import JobPosting, Message
+
+EXPORT_CHUNK_SIZE = 2000
+
+# ?output= value -> content type. Not ?format=, which DRF reserves for renderer selection.
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+class Echo:
+    """File-like object whose write() returns the line instead of buffering it, for csv.writer."""
+
+    def write(self, value):
+        return value
+
+
+def plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def csv_rows(header, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow([plain(value) for value in row])
+
+
+def ndjson_rows(header, rows):
+    for row in rows:
+        yield json.dumps({key: plain(value) for key, value in zip(header, row)}) + '\n'
+
+
+def export_response(request, name, header, rows):
+    """
+    Streams rows (an iterable of sequences matching header) as CSV or NDJSON, picked
+    with ?output=. Memory stays flat however many rows there are, as long as rows
+    comes from queryset.iterator(chunk_size=...).
+    """
+    output = request.GET.get('output', 'csv')
+    if output not in EXPORT_FORMATS:
+        raise ValidationError({'output': f"Use one of: {', '.join(EXPORT_FORMATS)}"})
+    lines = csv_rows(header, rows) if output == 'csv' else ndjson_rows(header, rows)
+    response = StreamingHttpResponse(lines, content_type=EXPORT_FORMATS[output])
+    response['Content-Disposition'] = f'attachment; filename="{name}.{output}"'
+    return response
+
+
+def stream_values(queryset, fields):
+    """Yields value tuples for the fields without building model instances."""
+    return queryset.values_list(*fields).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+# --- Export definitions ---
+# Each returns (header, rows) for export_response.
+
+JOB_EXPORT_FIELDS = [
+    'id', 'title', 'company_name', 'company_email', 'location', 'salary', 'salary_amount', 'job_type',
+    'status', 'grade', 'featured', 'posted_by_id', 'created_at', 'updated_at', 'applicant_count',
+]
+
+
+def job_export(status=None):
+    jobs = JobPosting.objects.annotate(applicant_count=Count('applicants')).order_by('id')
+    if status:
+        jobs = jobs.filter(status=status)
+    return JOB_EXPORT_FIELDS, stream_values(jobs, JOB_EXPORT_FIELDS)
+
+
+APPLICANT_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('username', 'user__username'),
+    ('first_name', 'user__first_name'),
+    ('last_name', 'user__last_name'),
+    ('email', 'user__email'),
+    ('gpa', 'gpa'),
+    ('num_applications', 'num_applications'),
+    ('currently_working', 'currently_working'),
+    ('date_joined', 'user__date_joined'),
+]
+
+
+def applicant_export(job):
+    applicants = job.applicants.order_by('id')
+    return [column for column, _ in APPLICANT_EXPORT_COLUMNS], stream_values(applicants, [field for _, field in APPLICANT_EXPORT_COLUMNS])
+
+
+STUDENT_EXPORT_COLUMNS = [
+    ('id', 'id'),
+    ('username', 'user__username'),
+    ('first_name', 'user__first_name'),
+    ('last_name', 'user__last_name'),
+    ('email', 'user__email'),
+    ('date_joined', 'user__date_joined'),
+    ('is_active', 'user__is_active'),
+    ('num_applications', 'num_applications'),
+    ('num_favorited_jobs', 'num_favorited_jobs'),
+]
+
+
+def student_stats_export(students):
+    """students: the annotated queryset from stats.student_account_stats."""
+    return [column for column, _ in STUDENT_EXPORT_COLUMNS], stream_values(students, [field for _, field in STUDENT_EXPORT_COLUMNS])
+
+
+# Metadata only: message bodies are never exported
+MESSAGE_EXPORT_FIELDS = ['id', 'sender_id', 'recipient_id', 'timestamp', 'is_read', 'content_length']
+
+
+def message_export(profile_id=None):
+    messages = Message.objects.annotate(content_length=Length('content')).order_by('id')
+    if profile_id:
+        messages = messages.filter(Q(sender_id=profile_id) | Q(recipient_id=profile_id))
+    return MESSAGE_EXPORT_FIELDS, stream_values(messages, MESSAGE_EXPORT_FIELDS)
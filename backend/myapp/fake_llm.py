@@ -0,0 +1,194 @@
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# The fake accepts any key, but the client will not start without one
+FAKE_API_KEY = "fake"
+
+# Replies in the shape the graders parse: job grading asks for a bare integer
+JOB_GRADE_REPLY = "60"
+APPLICANT_REPLY = "72;The candidate meets most of the requirements."
+# Resume summaries are a compact JSON object (applicant_checker.summary_prompt)
+SUMMARY_REPLY = {
+    'education': "11th grade, GPA 3.6",
+    'experience': [["Cashier", "Grocery store", "1 year", "register, restocking"]],
+    'skills': ["customer service", "cash handling"],
+    'certifications': [],
+    'activities': ["honor roll"],
+    'availability': "evenings and weekends",
+}
+
+
+# Batched job grading numbers its jobs <job id="N"> and asks for {"N": score, ...}
+BATCH_JOB_PATTERN = re.compile(r'<job id="([^"]+)">')
+
+
+def default_reply(content):
+    if "SINGLE INTEGER" in content:
+        return JOB_GRADE_REPLY
+    if BATCH_JOB_PATTERN.search(content):
+        return json.dumps({job_id: int(JOB_GRADE_REPLY) for job_id in BATCH_JOB_PATTERN.findall(content)})
+    if "compact JSON object" in content:
+        # Different resumes get different summaries, as they would from the real model
+        return json.dumps({**SUMMARY_REPLY, 'resume': hashlib.sha256(content.encode()).hexdigest()[:8]},
+                          separators=(',', ':'))
+    return APPLICANT_REPLY
+
+
+def count_tokens(text):
+    # Roughly four characters per token, the usual rule of thumb for English text
+    return max(len(text) // 4, 1)
+
+
+class FakeCompletionServer:
+    """
+    A local stand-in for the Cerebras chat completions API, for benchmarks and
+    development (point CEREBRAS_BASE_URL at .url). Streams a canned reply after
+    `latency` seconds, plus `prefill_seconds_per_1k` per thousand prompt tokens
+    (so long prompts cost time, as they do on the real provider), and, like the
+    real provider, answers 429 with Retry-After once more than
+    `requests_per_second` (a token bucket of `burst`) arrive. Counts the prompt
+    and completion tokens it served. With `chunk_delay`, streams the reply a word
+    at a time that many seconds apart, and counts the streams whose client hung
+    up before the end as `aborted`.
+
+        with FakeCompletionServer(latency=0.2, requests_per_second=10) as server:
+            ...
+    """
+
+    def __init__(self, latency=0.2, requests_per_second=0, burst=1, reply=default_reply, port=0,
+                 prefill_seconds_per_1k=0, chunk_delay=0):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.prefill_seconds_per_1k = prefill_seconds_per_1k
+        self.requests_per_second = requests_per_second
+        self.burst = burst
+        self.reply = reply
+        self.lock = threading.Lock()
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.requests = 0
+        self.rate_limited = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.aborted = 0
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self.handler_class())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}"
+
+    def __enter__(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def admit(self):
+        """Counts the request; returns False if it is over the rate limit."""
+        with self.lock:
+            self.requests += 1
+            if self.requests_per_second > 0:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.requests_per_second)
+                self.updated = now
+                if self.tokens < 1:
+                    self.rate_limited += 1
+                    return False
+                self.tokens -= 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            return True
+
+    def finish(self, prompt_tokens=0, completion_tokens=0):
+        with self.lock:
+            self.in_flight -= 1
+            self.prompt_tokens += prompt_tokens
+            self.completion_tokens += completion_tokens
+
+    def handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('content-length', 0))
+                body = json.loads(self.rfile.read(length) or b'{}')
+                if not server.admit():
+                    self.send_json(429, {'error': {'message': 'Too many requests', 'type': 'rate_limit'}},
+                                   {'retry-after': f"{1 / server.requests_per_second:.3f}"})
+                    return
+                content = ''.join(message.get('content', '') for message in body.get('messages', []))
+                text = ''
+                try:
+                    text = server.reply(content)
+                    time.sleep(server.latency + count_tokens(content) / 1000 * server.prefill_seconds_per_1k)
+                    if body.get('stream'):
+                        self.send_stream(text)
+                    else:
+                        self.send_json(200, {
+                            'id': 'fake', 'object': 'chat.completion', 'created': int(time.time()),
+                            'model': body.get('model', ''), 'system_fingerprint': 'fake',
+                            'choices': [{'index': 0, 'finish_reason': 'stop',
+                                         'message': {'role': 'assistant', 'content': text}}],
+                            'usage': {'prompt_tokens': count_tokens(content),
+                                      'completion_tokens': count_tokens(text),
+                                      'total_tokens': count_tokens(content) + count_tokens(text)},
+                        })
+                finally:
+                    server.finish(count_tokens(content), count_tokens(text) if text else 0)
+
+            def send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('content-type', 'application/json')
+                self.send_header('content-length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def send_stream(self, text):
+                self.send_response(200)
+                self.send_header('content-type', 'text/event-stream')
+                self.send_header('connection', 'close')
+                self.end_headers()
+                if server.chunk_delay:
+                    pieces = re.findall(r"\S+\s*", text) or [text]
+                else:
+                    # A few chunks, so callers exercise their stream handling
+                    step = max(len(text) // 3, 1)
+                    pieces = [text[start:start + step] for start in range(0, len(text), step)]
+                self.close_connection = True
+                try:
+                    for number, piece in enumerate(pieces):
+                        if number and server.chunk_delay:
+                            time.sleep(server.chunk_delay)
+                        chunk = {
+                            'id': 'fake', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                            'model': 'fake', 'system_fingerprint': 'fake',
+                            'choices': [{'index': 0, 'delta': {'content': piece}, 'finish_reason': None}],
+                        }
+                        self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode())
+                        self.wfile.flush()
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except OSError:
+                    # The client closed the stream early
+                    with server.lock:
+                        server.aborted += 1
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -1,12 +1,19 @@
 import requests , os
+from .caching import geocode_cache, hash_key
 api_key = os.getenv('GEO_APIFY')
 
 def geocode_address(address, api_key):
+    # Addresses repeat (every job at a location, the fixed school address), so lookups are cached
+    key = hash_key(' '.join(address.lower().split()))
+    coords = geocode_cache.get(key)
+    if coords is not None:
+        return coords
     geocode_url = f"https://api.geoapify.com/v1/geocode/search?text={address}&apiKey={api_key}"
     response = requests.get(geocode_url)
     data = response.json()
     if data['features']:
         coords = data['features'][0]['geometry']['coordinates']
+        geocode_cache.set(key, (coords[1], coords[0]))
         return coords[1], coords[0]
     else:
         raise ValueError(f"Address '{address}' not found.")
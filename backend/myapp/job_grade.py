@@ -1,136 +1,214 @@
+import json
 import os
-from openai import OpenAI
-from openai import RateLimitError, APIError, APIConnectionError
+from django.conf import settings
+from . import llm
+from .caching import hash_key
 from .geo_apify import *
+from .models import grade_inputs_hash
+from django.db.models import F
 from django.http import JsonResponse
-from cerebras.cloud.sdk import Cerebras
+from django.utils import timezone
 
-Api = os.getenv("API_KEY")
-prompt = "You are an administrator for a job finder website designed to help high school students find jobs. Your task is to grade how obtainable a job is for high school students on a scale from 1 to 75. The final score should reflect only how attainable the job is, without considering location (location accounts for an additional 25 points, calculated separately).Scoring Criteria:Education Requirements (High Weight): Jobs requiring little to no formal education should score higher. Positions demanding higher education (e.g., college degrees) should be heavily penalized.Typical High School Job (Moderate Weight): If the job is common for high school students (e.g., retail, food service, internships), it should score higher.Experience Requirements (Moderate Weight): Jobs requiring little to no prior work experience should score higher. If minimal experience is needed but attainable through extracurriculars, minor deductions apply.Age Restrictions (Moderate Weight): Jobs with strict age requirements (e.g., must be 18+) should have points deducted.Job Complexity (Low Weight): Highly technical or specialized jobs should lose some points, but only slightly, as long as they remain attainable.Work Hours (Moderate Weight): Jobs requiring work during typical school hours should lose points unless flexible scheduling is mentioned.IMPORTANT:ONLY OUTPUT A SINGLE INTEGER BETWEEN 1 AND 75.DO NOT include any text, explanations, or additional details—ONLY the integer.IF YOU DO INCLUDE ANY DETAILS  OTHER THAN THE INTEGER YOU WILL BE TERMINATED NO MATTER THE CIRCUMSTANCES SO ONLY OUT PUT AN INTTEGER. You must fully reason through all relevant factors to determine the most accurate score, but DO NOT include your reasoning in the output.Focus solely on obtainability, not pay, soft skills, demand, or location.Assume the student has minimal job experience but strong extracurricular involvement and basic job-ready skills.The job description may be unstructured, so interpret details flexibly.Example Outputs:A typical part-time retail job with no education or experience requirements: 75A full-time office job requiring a college degree: 15A seasonal lifeguard job requiring certification and age 18+: 50- Here is the Job to be grader: "
+# What makes a job obtainable; shared by the single-job and the batched prompt
+scoring_criteria = "You are an administrator for a job finder website designed to help high school students find jobs. Your task is to grade how obtainable a job is for high school students on a scale from 1 to 75. The final score should reflect only how attainable the job is, without considering location (location accounts for an additional 25 points, calculated separately).Scoring Criteria:Education Requirements (High Weight): Jobs requiring little to no formal education should score higher. Positions demanding higher education (e.g., college degrees) should be heavily penalized.Typical High School Job (Moderate Weight): If the job is common for high school students (e.g., retail, food service, internships), it should score higher.Experience Requirements (Moderate Weight): Jobs requiring little to no prior work experience should score higher. If minimal experience is needed but attainable through extracurriculars, minor deductions apply.Age Restrictions (Moderate Weight): Jobs with strict age requirements (e.g., must be 18+) should have points deducted.Job Complexity (Low Weight): Highly technical or specialized jobs should lose some points, but only slightly, as long as they remain attainable.Work Hours (Moderate Weight): Jobs requiring work during typical school hours should lose points unless flexible scheduling is mentioned."
 
+prompt = scoring_criteria + "IMPORTANT:ONLY OUTPUT A SINGLE INTEGER BETWEEN 1 AND 75.DO NOT include any text, explanations, or additional details—ONLY the integer.IF YOU DO INCLUDE ANY DETAILS  OTHER THAN THE INTEGER YOU WILL BE TERMINATED NO MATTER THE CIRCUMSTANCES SO ONLY OUT PUT AN INTTEGER. You must fully reason through all relevant factors to determine the most accurate score, but DO NOT include your reasoning in the output.Focus solely on obtainability, not pay, soft skills, demand, or location.Assume the student has minimal job experience but strong extracurricular involvement and basic job-ready skills.The job description may be unstructured, so interpret details flexibly.Example Outputs:A typical part-time retail job with no education or experience requirements: 75A full-time office job requiring a college degree: 15A seasonal lifeguard job requiring certification and age 18+: 50- Here is the Job to be grader: "
 
 
-# Initialize with a default response in case of API failure
-try:
-    # Initialize Cerebras client
-    client = Cerebras(
-        api_key=Api,
-    )
-    stream = client.chat.completions.create(
-        messages=[
-            {
-                "role": "system",
-                "content": prompt
-            }
-        ],
-        model="llama-4-scout-17b-16e-instruct",
-        stream=True,
-        max_completion_tokens=16382,
-        temperature=0.7,
-        top_p=0.95
-    )
-except (RateLimitError, APIError, APIConnectionError) as e:
-    print(f"Warning: Initial API call failed: {str(e)}")
-    completion = None
-except Exception as e:
-    print(f"Warning: Unexpected error in initial API call: {str(e)}")
-    completion = None
+# Several jobs in one call: the same criteria, with each job's score keyed by its number
+batch_prompt = scoring_criteria + "IMPORTANT:You will be given several jobs, each between <job id=\"N\"> and </job>. Grade each job on its own, exactly as if it were the only one.ONLY OUTPUT A JSON OBJECT mapping every job id (as a string) to its integer score between 1 and 75, for example {\"1\": 75, \"2\": 15}.DO NOT include any text, explanations, or additional details—ONLY the JSON object.- Here are the Jobs to be graded: "
 
-def grade_job(job_posting):
-    global prompt
+# Identifies the grading prompt in stored grade provenance; editing the prompt makes
+# every stored grade stale
+PROMPT_HASH = hash_key(prompt)
+BATCH_PROMPT_HASH = hash_key(batch_prompt)
+
+# Where students travel from when scoring a job's location
+SCHOOL_ADDRESS = "3900 E Raab Rd, Normal, IL 61761"
+
+# Used for a part whose score cannot be computed
+DEFAULT_JOB_GRADE = 50
+DEFAULT_TRAVEL_GRADE = 25
+
+def score_description(description):
+    """The model's 1-75 obtainability score. Raises if the call fails or the reply is not a 1-75 score."""
+    full_response = llm.complete(prompt + description)
+    score = parse_score(full_response)
+    if score is None:
+        raise ValueError(f"Job grade reply is not a score from 1 to 75: {full_response!r}")
+    return score
+
+def parse_score(value):
+    """A 1-75 score from the model, or None if it is anything else."""
+    if isinstance(value, bool):
+        return None
+    try:
+        score = int(str(value).replace("*", "").strip())
+    except ValueError:
+        return None
+    return score if 1 <= score <= 75 else None
+
+def score_description_batch(descriptions):
+    """
+    Scores several descriptions in one call: a list aligned with descriptions, None
+    for each one the reply leaves out or scores invalidly. Raises if the call fails
+    or the reply is not a JSON object.
+    """
+    jobs = "".join(f'<job id="{number}">{description}</job>' for number, description in enumerate(descriptions, 1))
+    reply = llm.complete(batch_prompt + jobs).strip().removeprefix("```json").strip("`")
+    scores = json.loads(reply)
+    if not isinstance(scores, dict):
+        raise ValueError("Batch grade reply is not a JSON object")
+    return [parse_score(scores.get(str(number))) for number in range(1, len(descriptions) + 1)]
+
+def score_descriptions_batched(descriptions, map=map, batch_size=None):
+    """
+    Model scores for many descriptions, batch_size (JOB_GRADE_BATCH_SIZE) to a call;
+    map runs the calls, e.g. a thread pool's. None where a batch failed or left a
+    description unscored, for the caller to score on its own.
+    """
+    batch_size = batch_size or settings.JOB_GRADE_BATCH_SIZE
+    if batch_size <= 1:
+        return [None] * len(descriptions)
+
+    def score(batch):
+        try:
+            return score_description_batch(batch)
+        except Exception as e:
+            print(f"Error in batch grading, scoring {len(batch)} job(s) one at a time: {str(e)}")
+            return [None] * len(batch)
+
+    batches = [descriptions[i:i + batch_size] for i in range(0, len(descriptions), batch_size)]
+    return [points for scores in map(score, batches) for points in scores]
+
+def score_travel(location):
+    """0-25 points for the drive from the school. Raises if Geoapify fails."""
+    return travel_points(get_travel_time(location, SCHOOL_ADDRESS))
+
+def travel_points(travel_time):
+    """0-25 points: full marks up to 15 minutes from the school, one less per minute after."""
+    travel_grade = 0
+    if travel_time > 15:
+        travel_grade = 25 - (travel_time - 15)
+        if travel_grade < 0:
+            travel_grade = 0
+    else:
+        travel_grade += 25
+    return travel_grade
+
+def grade_description_and_location(description, location, caller):
     try:
-        stream = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt + job_posting.description
-                }
-            ],
-            model="llama-4-scout-17b-16e-instruct",
-            stream=True,
-            max_completion_tokens=16382,
-            temperature=0.7,
-            top_p=0.95
-        )
-        
-        # Collect the streamed response
-        full_response = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                full_response += chunk.choices[0].delta.content
-        
-        grade = int(full_response.replace("*",""))
-    except (RateLimitError, APIError, APIConnectionError) as e:
-        print(f"API error in grade_job: {str(e)}")
-        grade = 50  # Default middle grade if API fails
+        grade = score_description(description)
+    except (llm.LLMTimeout, llm.RateLimitError, llm.APIError, llm.APIConnectionError) as e:
+        print(f"API error in {caller}: {str(e)}")
+        grade = DEFAULT_JOB_GRADE  # Default middle grade if API fails
     except Exception as e:
-        print(f"Unexpected error in grade_job: {str(e)}")
-        grade = 50  # Default middle grade for any other error
+        print(f"Unexpected error in {caller}: {str(e)}")
+        grade = DEFAULT_JOB_GRADE  # Default middle grade for any other error
 
     try:
-        travel_time = get_travel_time(job_posting.location, "3900 E Raab Rd, Normal, IL 61761")
-        travel_grade = 0
-        if travel_time > 15:
-            travel_grade = 25 - (travel_time - 15)
-            if travel_grade < 0:
-                travel_grade = 0
-        else:
-            travel_grade += 25
+        travel_grade = score_travel(location)
     except Exception as e:
         print(f"Error calculating travel grade: {str(e)}")
-        travel_grade = 25  # Default middle travel grade if calculation fails
+        travel_grade = DEFAULT_TRAVEL_GRADE  # Default middle travel grade if calculation fails
 
     return grade + travel_grade
 
-def grade_job_lv(request):
-    global prompt
-    description = request.GET.get("description", "") 
-    location = request.GET.get("location")
-    
-    try:
-        stream = client.chat.completions.create(
-            messages=[
-                {
-                    "role": "user",
-                    "content": prompt + description
-                }
-            ],
-            model="llama-4-scout-17b-16e-instruct",
-            stream=True,
-            max_completion_tokens=16382,
-            temperature=0.7,
-            top_p=0.95
-        )
-        
-        # Collect the streamed response
-        full_response = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content:
-                full_response += chunk.choices[0].delta.content
-        
-        grade = int(full_response.replace("*",""))
-    except (RateLimitError, APIError, APIConnectionError) as e:
-        print(f"API error in grade_job_lv: {str(e)}")
-        grade = 50  # Default middle grade if API fails
-    except Exception as e:
-        print(f"Unexpected error in grade_job_lv: {str(e)}")
-        grade = 50  # Default middle grade for any other error
+# The grade and its provenance, as apply_grade sets them
+GRADE_FIELDS = [
+    'grade', 'grade_prompt_hash', 'grade_inputs_hash', 'grade_model', 'grade_description_points',
+    'grade_travel_minutes', 'grade_travel_points', 'graded_at',
+]
 
+def apply_grade(job_posting, strict=False, description_points=None):
+    """
+    Grades a job posting and sets the grade and its provenance on it, unsaved.
+    A part that fails keeps the job's previous value for it, or counts its default
+    without recording it, so the row stays stale and is retried. With strict, a
+    failed part raises instead and nothing is changed. description_points is a
+    score already made by the batched prompt; without it the description is scored
+    on its own.
+    """
+    prompt_hash = BATCH_PROMPT_HASH
+    travel_minutes = None
+    if description_points is None:
+        prompt_hash = PROMPT_HASH
+        try:
+            description_points = score_description(job_posting.description)
+        except Exception as e:
+            if strict:
+                raise
+            print(f"Error scoring job {job_posting.pk}: {str(e)}")
     try:
-        travel_time = get_travel_time(location, "3900 E Raab Rd, Normal, IL 61761")
-        travel_grade = 0
-        if travel_time > 15:
-            travel_grade = 25 - (travel_time - 15)
-            if travel_grade < 0:
-                travel_grade = 0
-        else:
-            travel_grade += 25
+        travel_minutes = get_travel_time(job_posting.location, SCHOOL_ADDRESS)
     except Exception as e:
-        print(f"Error calculating travel grade: {str(e)}")
-        travel_grade = 25  # Default middle travel grade if calculation fails
+        if strict:
+            raise
+        print(f"Error calculating travel time for job {job_posting.pk}: {str(e)}")
+
+    if description_points is not None:
+        job_posting.grade_description_points = description_points
+        job_posting.grade_prompt_hash = prompt_hash
+        job_posting.grade_model = llm.MODEL
+    if travel_minutes is not None:
+        job_posting.grade_travel_minutes = travel_minutes
+        # Whole points, as the integer grade column has always stored them
+        job_posting.grade_travel_points = int(travel_points(travel_minutes))
+    if description_points is not None and travel_minutes is not None:
+        # Only when both parts are from this text; a kept part may be from older text
+        job_posting.grade_inputs_hash = grade_inputs_hash(job_posting.description, job_posting.location)
+    description_points = job_posting.grade_description_points
+    travel = job_posting.grade_travel_points
+    job_posting.grade = (
+        (DEFAULT_JOB_GRADE if description_points is None else description_points)
+        + (DEFAULT_TRAVEL_GRADE if travel is None else travel)
+    )
+    job_posting.graded_at = timezone.now()
+    return job_posting
+
+def grade_jobs(job_postings, map=map, strict=False, batch_size=None):
+    """
+    apply_grade for many job postings, their descriptions scored batch_size to a call
+    (see score_descriptions_batched); a posting the batch left unscored is scored on
+    its own. map runs the calls. Returns [(job_posting, error)], error being what
+    made the posting fail with strict, else None.
+    """
+    scores = score_descriptions_batched([job.description for job in job_postings], map, batch_size)
+
+    def grade(job_and_points):
+        job_posting, points = job_and_points
+        try:
+            return apply_grade(job_posting, strict, points), None
+        except Exception as e:
+            return job_posting, e
+
+    return list(map(grade, zip(job_postings, scores)))
+
+def stale_grades(jobs):
+    """
+    The jobs whose grade needs recomputing: never graded by the server, graded with
+    another prompt or model or from another description or location, with a part that
+    fell back to its default, or whose grade was since set by hand (it no longer adds
+    up to its parts). Scores from the single and the batched prompt are both current.
+    """
+    return jobs.exclude(
+        grade_prompt_hash__in=[PROMPT_HASH, BATCH_PROMPT_HASH],
+        grade_inputs_hash=F('inputs_hash'),
+        grade_model=llm.MODEL,
+        grade_description_points__isnull=False,
+        grade_travel_points__isnull=False,
+        grade=F('grade_description_points') + F('grade_travel_points'),
+    )
+
+def grade_job(job_posting):
+    return grade_description_and_location(job_posting.description, job_posting.location, 'grade_job')
+
+def grade_job_lv(request):
+    description = request.GET.get("description", "") 
+    location = request.GET.get("location")
     
-    total_grade = grade + travel_grade
+    total_grade = grade_description_and_location(description, location, 'grade_job_lv')
     print(total_grade)
     return JsonResponse({
         'grade': total_grade
-    })
\ No newline at end of file
+    })
@@ -0,0 +1,123 @@
+from django.db.models import Count, Q
+from django.utils import timezone
+from .caching import leaderboard_cache
+from .models import LeaderboardEntry, UserProfile
+
+# Board name -> the stat key the frontend reads for that board's score
+BOARDS = {
+    'applications': 'num_applications',
+    'profile_completion': 'profile_completion',
+    'challenge_completers': 'num_challenges_completed',
+}
+
+LEADERBOARD_SIZE = 10
+REBUILD_BATCH_SIZE = 1000
+
+
+def leaderboard_profiles():
+    """Profiles with every figure a leaderboard row needs, loaded in one query."""
+    return UserProfile.objects.select_related('user').annotate(
+        num_challenges_completed=Count('user_challenges', filter=Q(user_challenges__is_completed=True))
+    )
+
+
+def is_ranked(profile):
+    return not profile.is_job_provider and profile.opt_in_leaderboard
+
+
+def build_entries(profile):
+    display_name = profile.account_holder_name or profile.user.get_full_name() or profile.user.username
+    avatar = profile.profile_picture.url if profile.profile_picture else ''
+    now = timezone.now()
+    return [
+        LeaderboardEntry(
+            board=board,
+            user_profile=profile,
+            score=getattr(profile, stat_key) or 0,
+            username=profile.user.username,
+            display_name=display_name,
+            avatar=avatar,
+            updated_at=now,
+        )
+        for board, stat_key in BOARDS.items()
+    ]
+
+
+def save_entries(entries):
+    # One upsert statement for all rows
+    LeaderboardEntry.objects.bulk_create(
+        entries,
+        update_conflicts=True,
+        unique_fields=['board', 'user_profile'],
+        update_fields=['score', 'username', 'display_name', 'avatar', 'updated_at'],
+    )
+
+
+def refresh_leaderboard_entries(profile_id):
+    """
+    Re-materializes one profile's rows on every board after its counters change.
+    Reads the figures fresh, since counters are often moved with UPDATEs the
+    caller's instance has not seen.
+    """
+    profile = leaderboard_profiles().filter(pk=profile_id).first()
+    if profile is None:
+        return
+    if not is_ranked(profile):
+        LeaderboardEntry.objects.filter(user_profile_id=profile_id).delete()
+        return
+    save_entries(build_entries(profile))
+
+
+def rebuild_leaderboards(batch_size=REBUILD_BATCH_SIZE):
+    """Rebuilds every row from scratch in batches. Returns the number of ranked profiles."""
+    LeaderboardEntry.objects.all().delete()
+    ranked = leaderboard_profiles().filter(is_job_provider=False, opt_in_leaderboard=True).order_by('id')
+    total = 0
+    last_id = 0
+    while True:
+        profiles = list(ranked.filter(id__gt=last_id)[:batch_size])
+        if not profiles:
+            break
+        save_entries([entry for profile in profiles for entry in build_entries(profile)])
+        total += len(profiles)
+        last_id = profiles[-1].id
+    leaderboard_cache.invalidate()
+    return total
+
+
+def with_ranks(entries):
+    """Pairs entries (sorted by score, descending) with competition ranks: ties share a rank."""
+    ranked = []
+    previous_score = None
+    rank = 0
+    for position, entry in enumerate(entries, start=1):
+        if entry.score != previous_score:
+            rank = position
+            previous_score = entry.score
+        ranked.append((rank, entry))
+    return ranked
+
+
+def get_leaderboard(board):
+    """Top rows for a board, served from the leaderboards cache for its short TTL."""
+    entries = leaderboard_cache.get_or_set(
+        f"{board}:{LEADERBOARD_SIZE}",
+        lambda: list(
+            LeaderboardEntry.objects.filter(board=board).order_by('-score', 'user_profile_id')[:LEADERBOARD_SIZE]
+        ),
+    )
+    return with_ranks(entries)
+
+
+def get_ranks(profile_id):
+    """
+    Rank of one profile on each board. Each rank is an index range count over
+    (board, score) above the profile's score, so it never scans the table.
+    """
+    ranks = {}
+    for entry in LeaderboardEntry.objects.filter(user_profile_id=profile_id):
+        ranks[entry.board] = {
+            'rank': LeaderboardEntry.objects.filter(board=entry.board, score__gt=entry.score).count() + 1,
+            'score': entry.score,
+        }
+    return ranks
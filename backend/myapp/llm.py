@@ -0,0 +1,373 @@
+import asyncio
+import random
+import threading
+import time
+import weakref
+from collections import Counter
+from contextlib import aclosing
+from django.conf import settings
+
+# The gateway every grader goes through: one process-wide client behind a token-bucket
+# rate limit, a concurrency cap and a per-call deadline, retrying 429s with backoff.
+# Tuned by the LLM_* settings.
+
+# Loaded on first use rather than at import, so processes that never grade
+# (migrate, workers, management commands) do not pay for the SDK
+SDK_NAMES = ('Cerebras', 'AsyncCerebras', 'RateLimitError', 'APIError', 'APIConnectionError', 'APITimeoutError')
+
+MODEL = "llama-4-scout-17b-16e-instruct"
+
+# Longest single backoff, whatever Retry-After or the doubling says
+MAX_BACKOFF_SECONDS = 10
+
+# How often a call on the event loop retries for a concurrency slot held by other calls
+SLOT_POLL_SECONDS = 0.02
+
+_client = None
+# Async clients per event loop, since their connections belong to the loop that made them
+_async_clients = weakref.WeakKeyDictionary()
+_limits = None
+_setup_lock = threading.Lock()
+
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+
+def __getattr__(name):
+    # llm.RateLimitError etc. in an except clause is only evaluated when an exception
+    # reaches it, so the SDK stays unloaded until a call is actually made
+    if name in SDK_NAMES:
+        from cerebras.cloud import sdk
+        return getattr(sdk, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class LLMTimeout(Exception):
+    """The call could not finish within its deadline (queueing, retries or a slow reply)."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket. A rate of 0 or less means unlimited."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.capacity = max(burst, 1)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self, deadline):
+        """
+        Takes a token and returns how long to wait before using it. Tokens may be
+        taken ahead of time, which queues callers in order. Returns None, taking
+        nothing, if the token would only be ready after the deadline.
+        """
+        if self.rate <= 0:
+            return 0
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            if now + wait > deadline:
+                return None
+            self.tokens -= 1
+            return wait
+
+
+def record(event, count=1):
+    with _metrics_lock:
+        _metrics[event] += count
+
+
+def llm_metrics():
+    """This process's gateway counters, with average queue wait and call latency."""
+    with _metrics_lock:
+        counts = Counter(_metrics)
+    finished = counts['completed'] + counts['failed']
+    return {
+        'calls': counts['calls'],
+        'completed': counts['completed'],
+        'failed': counts['failed'],
+        'timeouts': counts['timeouts'],
+        'rate_limited': counts['rate_limited'],
+        'retries': counts['retries'],
+        # Streams closed early because the caller stopped reading
+        'cancelled': counts['cancelled'],
+        # Applicant gradings settled by the local pre-screen, without a call
+        'prescreened': counts['prescreened'],
+        'in_flight': counts['in_flight'],
+        'max_concurrency': settings.LLM_MAX_CONCURRENCY,
+        'avg_wait_seconds': round(counts['wait_seconds'] / counts['calls'], 4) if counts['calls'] else None,
+        'avg_latency_seconds': round(counts['latency_seconds'] / finished, 4) if finished else None,
+    }
+
+
+def reset_llm_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+def reset_gateway():
+    """Drops the client and limiters so they are rebuilt from the current settings."""
+    global _client, _limits
+    with _setup_lock:
+        _client = None
+        _async_clients.clear()
+        _limits = None
+
+
+def get_client():
+    """The process-wide Cerebras client, created on first use."""
+    global _client
+    if _client is None:
+        with _setup_lock:
+            if _client is None:
+                from cerebras.cloud.sdk import Cerebras
+                # Retries and timeouts are the gateway's, so they count against the deadline
+                _client = Cerebras(
+                    api_key=settings.LLM_API_KEY,
+                    base_url=settings.LLM_BASE_URL,
+                    max_retries=0,
+                    warm_tcp_connection=False,
+                )
+    return _client
+
+
+def get_async_client():
+    """The AsyncCerebras client for the running event loop, created on first use."""
+    loop = asyncio.get_running_loop()
+    with _setup_lock:
+        client = _async_clients.get(loop)
+        if client is None:
+            from cerebras.cloud.sdk import AsyncCerebras
+            client = _async_clients[loop] = AsyncCerebras(
+                api_key=settings.LLM_API_KEY,
+                base_url=settings.LLM_BASE_URL,
+                max_retries=0,
+                warm_tcp_connection=False,
+            )
+    return client
+
+
+def get_limits():
+    """(token bucket, concurrency semaphore) for this process, built on first use."""
+    global _limits
+    if _limits is None:
+        with _setup_lock:
+            if _limits is None:
+                _limits = (
+                    TokenBucket(settings.LLM_REQUESTS_PER_SECOND, settings.LLM_BURST),
+                    threading.BoundedSemaphore(settings.LLM_MAX_CONCURRENCY),
+                )
+    return _limits
+
+
+def backoff_seconds(error, attempt):
+    """Retry-After when the provider sends it, else doubling backoff with full jitter."""
+    retry_after = None
+    response = getattr(error, 'response', None)
+    if response is not None:
+        try:
+            retry_after = float(response.headers.get('retry-after'))
+        except (TypeError, ValueError):
+            pass
+    if retry_after is None:
+        retry_after = random.uniform(0, settings.LLM_BACKOFF_SECONDS * 2 ** attempt)
+    return min(retry_after, MAX_BACKOFF_SECONDS)
+
+
+def completion_request(content, deadline):
+    """Arguments of the streamed chat completion, for the sync and the async client."""
+    return dict(
+        messages=[
+            {
+                "role": "user",
+                "content": content
+            }
+        ],
+        model=MODEL,
+        stream=True,
+        max_completion_tokens=16382,
+        temperature=0.7,
+        top_p=0.95,
+        timeout=deadline - time.monotonic(),
+    )
+
+
+def stream_reply(content, deadline):
+    """Yields the reply's text as it streams in. Closing the generator closes the upstream stream."""
+    from cerebras.cloud.sdk import APITimeoutError
+
+    try:
+        stream = get_client().chat.completions.create(**completion_request(content, deadline))
+
+        try:
+            for chunk in stream:
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if time.monotonic() > deadline:
+                    raise LLMTimeout("Reply still streaming at the deadline")
+        finally:
+            stream.close()
+    except APITimeoutError as e:
+        raise LLMTimeout(str(e)) from e
+
+
+async def astream_reply(content, deadline):
+    """stream_reply() on the event loop, with the async client."""
+    from cerebras.cloud.sdk import APITimeoutError
+
+    try:
+        stream = await get_async_client().chat.completions.create(**completion_request(content, deadline))
+
+        try:
+            async for chunk in stream:
+                if chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+                if time.monotonic() > deadline:
+                    raise LLMTimeout("Reply still streaming at the deadline")
+        finally:
+            await stream.close()
+    except APITimeoutError as e:
+        raise LLMTimeout(str(e)) from e
+
+
+def stream(content, timeout=None):
+    """
+    Sends one user message and yields the reply as it streams in. Waits for a
+    rate-limit token and a concurrency slot first; raises LLMTimeout if the whole
+    call cannot finish within timeout (default LLM_TIMEOUT_SECONDS), or the
+    provider's RateLimitError once retries are used up. A 429 arrives before any
+    text, so retries never repeat text already yielded. Closing the generator early
+    closes the upstream stream and frees the slot.
+    """
+    from cerebras.cloud.sdk import RateLimitError
+
+    started = time.monotonic()
+    deadline = started + (timeout or settings.LLM_TIMEOUT_SECONDS)
+    bucket, slots = get_limits()
+    record('calls')
+    attempt = 0
+    try:
+        while True:
+            wait = bucket.reserve(deadline)
+            if wait is None:
+                raise LLMTimeout("No rate-limit token before the deadline")
+            time.sleep(wait)
+            queued = time.monotonic()
+            if not slots.acquire(timeout=max(deadline - queued, 0)):
+                raise LLMTimeout("No free concurrency slot before the deadline")
+            if attempt == 0:
+                record('wait_seconds', time.monotonic() - started)
+            record('in_flight')
+            try:
+                yield from stream_reply(content, deadline)
+                record('completed')
+                return
+            except RateLimitError as e:
+                record('rate_limited')
+                delay = backoff_seconds(e, attempt)
+                if attempt >= settings.LLM_MAX_RETRIES or time.monotonic() + delay > deadline:
+                    raise
+            finally:
+                record('in_flight', -1)
+                slots.release()
+            # Back off outside the slot, so other calls can use it meanwhile
+            record('retries')
+            time.sleep(delay)
+            attempt += 1
+    except LLMTimeout:
+        record('timeouts')
+        record('failed')
+        raise
+    except GeneratorExit:
+        # The caller stopped reading, e.g. its client disconnected
+        record('cancelled')
+        raise
+    except Exception:
+        record('failed')
+        raise
+    finally:
+        record('latency_seconds', time.monotonic() - started)
+
+
+def complete(content, timeout=None):
+    """stream() collected into a single string."""
+    return "".join(stream(content, timeout))
+
+
+async def acomplete(content, timeout=None):
+    """astream() collected into a single string."""
+    return "".join([piece async for piece in astream(content, timeout)])
+
+
+async def acquire_slot(slots, deadline):
+    """
+    Takes one of the shared concurrency slots without blocking the event loop (sync
+    calls block on the same semaphore in their threads). False if none frees up
+    before the deadline.
+    """
+    while not slots.acquire(blocking=False):
+        if time.monotonic() + SLOT_POLL_SECONDS > deadline:
+            return False
+        await asyncio.sleep(SLOT_POLL_SECONDS)
+    return True
+
+
+async def astream(content, timeout=None):
+    """
+    stream() for async code: runs on the event loop with the async client, so it holds
+    no thread while it queues or streams, and shares the process's token bucket and
+    concurrency slots with the sync calls. Cancelling or closing this generator (e.g.
+    the client disconnected) closes the upstream stream, or drops the call before it
+    is made if it is still queued.
+    """
+    from cerebras.cloud.sdk import RateLimitError
+
+    started = time.monotonic()
+    deadline = started + (timeout or settings.LLM_TIMEOUT_SECONDS)
+    bucket, slots = get_limits()
+    record('calls')
+    attempt = 0
+    try:
+        while True:
+            wait = bucket.reserve(deadline)
+            if wait is None:
+                raise LLMTimeout("No rate-limit token before the deadline")
+            await asyncio.sleep(wait)
+            if not await acquire_slot(slots, deadline):
+                raise LLMTimeout("No free concurrency slot before the deadline")
+            if attempt == 0:
+                record('wait_seconds', time.monotonic() - started)
+            record('in_flight')
+            try:
+                async with aclosing(astream_reply(content, deadline)) as reply:
+                    async for piece in reply:
+                        yield piece
+                record('completed')
+                return
+            except RateLimitError as e:
+                record('rate_limited')
+                delay = backoff_seconds(e, attempt)
+                if attempt >= settings.LLM_MAX_RETRIES or time.monotonic() + delay > deadline:
+                    raise
+            finally:
+                record('in_flight', -1)
+                slots.release()
+            record('retries')
+            await asyncio.sleep(delay)
+            attempt += 1
+    except LLMTimeout:
+        record('timeouts')
+        record('failed')
+        raise
+    except (GeneratorExit, asyncio.CancelledError):
+        # The caller stopped reading or was cancelled, e.g. its client disconnected
+        record('cancelled')
+        raise
+    except Exception:
+        record('failed')
+        raise
+    finally:
+        record('latency_seconds', time.monotonic() - started)
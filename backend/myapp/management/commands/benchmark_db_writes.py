@@ -0,0 +1,108 @@
+import multiprocessing
+import statistics
+import time
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+from myapp.models import JobPosting, UserProfile
+
+SEED_PREFIX = 'bench_writer_'
+
+
+def apply_all(profile_id, job_ids, start_barrier):
+    """
+    One worker process: applies the profile to every job the way api_apply_job does,
+    one transaction per application. Returns (latencies, failures).
+    """
+    latencies = []
+    failures = 0
+    start_barrier.wait()
+    for job_id in job_ids:
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                profile = UserProfile.objects.get(pk=profile_id)
+                profile.applied_jobs.add(job_id)
+                profile.num_applications = (profile.num_applications or 0) + 1
+                profile.save(update_fields=['num_applications'])
+        except OperationalError:
+            # "database is locked" and similar contention errors
+            failures += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+    return latencies, failures
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures write throughput of the configured database profile under parallel job "
+        "applications, the same writes api_apply_job makes. Each writer is a separate process, "
+        "like the workers of a production server. Seeds its own users and jobs and deletes them "
+        "afterwards; point it at a disposable database (SQLITE_PATH / DB_NAME)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=8, help="Concurrent writer processes.")
+        parser.add_argument('--applies', type=int, default=200, help="Applications per worker.")
+
+    def handle(self, *args, **options):
+        db = settings.DATABASES['default']
+        self.stdout.write(
+            f"Profile: {db['ENGINE'].rsplit('.', 1)[-1]}, CONN_MAX_AGE={db.get('CONN_MAX_AGE', 0)}, "
+            f"options={db.get('OPTIONS', {})}"
+        )
+        # Leftovers from an interrupted run would collide with the seed usernames
+        self.cleanup()
+        profile_ids, job_ids = self.seed(options['workers'], options['applies'])
+        try:
+            self.run(profile_ids, job_ids)
+        finally:
+            self.cleanup()
+
+    def seed(self, num_workers, num_applies):
+        provider = UserProfile.objects.create(user=User.objects.create_user(f'{SEED_PREFIX}provider'))
+        profile_ids = [
+            UserProfile.objects.create(user=User.objects.create_user(f'{SEED_PREFIX}{i}'), is_job_provider=False).pk
+            for i in range(num_workers)
+        ]
+        JobPosting.objects.bulk_create([
+            JobPosting(
+                posted_by=provider, title=f'{SEED_PREFIX}job', company_name='Bench', company_email='bench@example.com',
+                location='Normal, IL', salary='15', job_type='Part-time', description='-', requirements='[]',
+                status='approved',
+            )
+            for _ in range(num_applies)
+        ])
+        job_ids = list(JobPosting.objects.filter(title=f'{SEED_PREFIX}job').values_list('id', flat=True))
+        return profile_ids, job_ids
+
+    def cleanup(self):
+        JobPosting.objects.filter(title=f'{SEED_PREFIX}job').delete()
+        User.objects.filter(username__startswith=SEED_PREFIX).delete()
+
+    def run(self, profile_ids, job_ids):
+        # Forked workers must open their own connections
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        start_barrier = context.Manager().Barrier(len(profile_ids) + 1)
+        with context.Pool(len(profile_ids)) as pool:
+            pending = [pool.apply_async(apply_all, (profile_id, job_ids, start_barrier)) for profile_id in profile_ids]
+            start_barrier.wait()
+            started = time.perf_counter()
+            results = [result.get() for result in pending]
+            elapsed = time.perf_counter() - started
+
+        latencies = sorted(latency for worker_latencies, _ in results for latency in worker_latencies)
+        failures = sum(worker_failures for _, worker_failures in results)
+        attempted = len(profile_ids) * len(job_ids)
+        if latencies:
+            p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+            summary = f"p50 {statistics.median(latencies) * 1000:.1f} ms, p95 {p95:.1f} ms"
+        else:
+            summary = "no successful writes"
+        self.stdout.write(
+            f"{len(profile_ids)} workers, {attempted} applies in {elapsed:.2f}s: "
+            f"{len(latencies) / elapsed:.0f} applies/s, {failures} failed, {summary}"
+        )
@@ -0,0 +1,111 @@
+import json
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from myapp import llm
+from myapp.fake_llm import BATCH_JOB_PATTERN, FAKE_API_KEY, FakeCompletionServer, default_reply
+from myapp.job_grade import score_description, score_descriptions_batched
+
+# A fixed set of postings (seeded), worded like the ones employers submit
+SEED = 49
+TITLES = ["Cashier", "Lifeguard", "Barista", "Stock associate", "Camp counselor", "Host",
+          "Dishwasher", "Tutor", "Office assistant", "Dog walker", "Sales associate", "Line cook"]
+PLACES = ["grocery store", "community pool", "coffee shop", "hardware store", "day camp", "restaurant",
+          "learning center", "dental office", "pet care company", "clothing store"]
+DETAILS = [
+    "No experience needed; we train on the job.",
+    "Must be 16 or older with a work permit.",
+    "Evenings and weekends, 10 to 20 hours a week.",
+    "Flexible schedule around school hours.",
+    "Prior customer service experience preferred but not required.",
+    "Must be able to lift 30 pounds and stand for long periods.",
+    "Certification required before the first shift; we reimburse the course.",
+    "Friendly, reliable and eager to learn.",
+    "Summer only, full time Monday through Friday.",
+    "Basic math skills and a positive attitude.",
+]
+
+
+def make_description(rng):
+    return (
+        f"{rng.choice(TITLES)} wanted at a local {rng.choice(PLACES)}. "
+        + " ".join(rng.sample(DETAILS, rng.randint(3, 6)))
+        + f" Pay ${rng.randint(12, 18)}/hour."
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Scores a fixed set of job descriptions against a local fake completion server, one "
+        "description per call and then --jobs-per-call to a call, and reports provider calls, "
+        "tokens per graded job, throughput and how many batched scores fell back to a single "
+        "call. --drop-rate makes the fake leave out or garble that share of batched scores, "
+        "to exercise the fallback."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=200)
+        parser.add_argument('--jobs-per-call', type=int, default=settings.JOB_GRADE_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=settings.LLM_MAX_CONCURRENCY)
+        parser.add_argument('--latency', type=float, default=0.05, help="Fake provider seconds per reply.")
+        parser.add_argument('--prefill', type=float, default=0.05, help="Fake provider seconds per 1000 prompt tokens.")
+        parser.add_argument('--drop-rate', type=float, default=0.05)
+
+    def handle(self, *args, **options):
+        if options['jobs_per_call'] <= 1:
+            raise CommandError("--jobs-per-call must be above 1 to compare against single-job calls.")
+        rng = random.Random(SEED)
+        descriptions = [make_description(rng) for _ in range(options['jobs'])]
+        drops = random.Random(SEED)
+
+        def reply(content):
+            text = default_reply(content)
+            if BATCH_JOB_PATTERN.search(content):
+                scores = json.loads(text)
+                for job_id in scores:
+                    roll = drops.random()
+                    if roll < options['drop_rate'] / 2:
+                        scores[job_id] = None
+                    elif roll < options['drop_rate']:
+                        scores[job_id] = "sixty"
+                text = json.dumps({job_id: score for job_id, score in scores.items() if score is not None})
+            return text
+
+        results = {}
+        for name in ('single', 'batched'):
+            with FakeCompletionServer(options['latency'], reply=reply,
+                                      prefill_seconds_per_1k=options['prefill']) as server:
+                with override_settings(LLM_BASE_URL=server.url, LLM_API_KEY=FAKE_API_KEY, LLM_REQUESTS_PER_SECOND=0):
+                    llm.reset_gateway()
+                    started = time.perf_counter()
+                    with ThreadPoolExecutor(options['workers']) as pool:
+                        scores = [None] * len(descriptions)
+                        if name == 'batched':
+                            scores = score_descriptions_batched(descriptions, pool.map, options['jobs_per_call'])
+                        fallbacks = scores.count(None) if name == 'batched' else 0
+                        # What grade_jobs does with a description the batch left unscored
+                        scores = list(pool.map(
+                            lambda pair: pair[0] if pair[0] is not None else score_description(pair[1]),
+                            zip(scores, descriptions),
+                        ))
+                    elapsed = time.perf_counter() - started
+            if any(score is None for score in scores):
+                raise CommandError(f"{name}: some descriptions were not scored.")
+            results[name] = (server, elapsed)
+            jobs = len(descriptions)
+            self.stdout.write(
+                f"{name:8} {jobs} jobs  {server.requests:4} calls  {fallbacks:3} single-call fallbacks  "
+                f"prompt tokens/job={server.prompt_tokens / jobs:6.0f}  "
+                f"completion tokens/job={server.completion_tokens / jobs:4.1f}  "
+                f"{elapsed:5.2f}s  {jobs / elapsed:6.1f} jobs/s"
+            )
+        llm.reset_gateway()
+
+        (single, single_time), (batched, batched_time) = results['single'], results['batched']
+        self.stdout.write(
+            f"Batched: {1 - batched.prompt_tokens / single.prompt_tokens:.0%} fewer prompt tokens, "
+            f"{single_time / batched_time:.1f}x the throughput."
+        )
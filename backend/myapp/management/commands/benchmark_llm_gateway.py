@@ -0,0 +1,90 @@
+import asyncio
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from myapp import llm
+from myapp.fake_llm import FAKE_API_KEY, FakeCompletionServer
+from myapp.job_grade import prompt
+
+
+class Command(BaseCommand):
+    help = (
+        "Fires a burst of job-grading completions at a local fake completion server that "
+        "enforces its own rate limit, once with the gateway effectively off (no rate limit, "
+        "no concurrency cap, no retries: the old direct calls) and once with it on. Reports "
+        "real grades vs fallbacks, provider 429s, peak concurrency and latency."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--calls', type=int, default=200)
+        parser.add_argument('--threads', type=int, default=50, help="Concurrent callers (request threads).")
+        parser.add_argument('--latency', type=float, default=0.2, help="Fake provider seconds per reply.")
+        parser.add_argument('--provider-rps', type=float, default=20, help="Fake provider rate limit.")
+        parser.add_argument('--provider-burst', type=int, default=10)
+        parser.add_argument('--async', action='store_true', dest='use_async', help="Drive calls through acomplete() on one event loop.")
+
+    def handle(self, *args, **options):
+        profiles = [
+            ('ungated', {
+                'LLM_REQUESTS_PER_SECOND': 0,
+                'LLM_MAX_CONCURRENCY': options['calls'],
+                'LLM_MAX_RETRIES': 0,
+            }),
+            ('gateway', {
+                'LLM_REQUESTS_PER_SECOND': options['provider_rps'],
+                'LLM_BURST': options['provider_burst'],
+            }),
+        ]
+        for name, overrides in profiles:
+            with FakeCompletionServer(options['latency'], options['provider_rps'], options['provider_burst']) as server:
+                with override_settings(LLM_BASE_URL=server.url, LLM_API_KEY=FAKE_API_KEY, **overrides):
+                    llm.reset_gateway()
+                    llm.reset_llm_metrics()
+                    self.run(name, server, options)
+        llm.reset_gateway()
+
+    def run(self, name, server, options):
+        content = prompt + "Part-time cashier at a grocery store, weekends and evenings, no experience needed."
+        outcomes = Counter()
+        latencies = []
+
+        def grade(_):
+            started = time.perf_counter()
+            try:
+                llm.complete(content)
+                outcomes['graded'] += 1
+            except Exception as e:
+                # What the graders would turn into a hard-coded fallback grade
+                outcomes[f"fallback ({type(e).__name__})"] += 1
+            latencies.append(time.perf_counter() - started)
+
+        async def agrade(_):
+            started = time.perf_counter()
+            try:
+                await llm.acomplete(content)
+                outcomes['graded'] += 1
+            except Exception as e:
+                outcomes[f"fallback ({type(e).__name__})"] += 1
+            latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        if options['use_async']:
+            async def run_all():
+                await asyncio.gather(*(agrade(i) for i in range(options['calls'])))
+            asyncio.run(run_all())
+        else:
+            with ThreadPoolExecutor(options['threads']) as pool:
+                list(pool.map(grade, range(options['calls'])))
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        metrics = llm.llm_metrics()
+        self.stdout.write(
+            f"{name:8} {elapsed:6.2f}s  {dict(outcomes)}  provider 429s={server.rate_limited} "
+            f"peak in flight={server.peak_in_flight}  p50={statistics.median(latencies):.2f}s "
+            f"p95={latencies[int(len(latencies) * 0.95) - 1]:.2f}s  retries={metrics['retries']} "
+            f"timeouts={metrics['timeouts']}"
+        )
@@ -0,0 +1,150 @@
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from myapp import llm
+from myapp.applicant_checker import get_resume_summary, grade_resume_summary, grade_resume_text
+from myapp.caching import grade_cache
+from myapp.fake_llm import APPLICANT_REPLY, FAKE_API_KEY, FakeCompletionServer
+
+# A fixed evaluation set: the same resumes and jobs on every run (seeded), sized like
+# the redacted text of a one- or two-page student resume
+SEED = 47
+SCHOOLS = ["Lincoln High School", "Westview High School", "Central Academy", "Riverside Prep"]
+ROLES = [
+    ("Cashier", "Grocery store", "Handled the register, balanced the drawer at close, restocked shelves and helped customers find products."),
+    ("Lifeguard", "City pool", "Supervised swimmers, enforced pool rules, performed water rescues drills and kept the deck clean."),
+    ("Tutor", "After-school program", "Tutored middle school students in algebra and reading, planned weekly sessions and tracked progress."),
+    ("Barista", "Coffee shop", "Prepared espresso drinks, trained new hires on the register and opened the store on weekends."),
+    ("Camp counselor", "Summer day camp", "Led groups of ten campers, ran arts and crafts, and handled check-in and check-out with parents."),
+    ("Stock associate", "Hardware store", "Unloaded deliveries, organized the stockroom, and kept inventory counts accurate."),
+]
+SKILLS = ["customer service", "cash handling", "Microsoft Excel", "Spanish", "first aid", "Python",
+          "public speaking", "time management", "social media", "Photoshop", "teamwork", "food safety"]
+ACTIVITIES = ["Varsity soccer", "National Honor Society", "Robotics club", "School newspaper editor",
+              "Food bank volunteer", "Student council", "Marching band", "Debate team"]
+JOBS = [
+    "Part-time cashier at a grocery store. Evenings and weekends. Cash handling and friendly customer service required.",
+    "Lifeguard at the community pool for the summer. Must hold current lifeguard and first aid certification.",
+    "Math tutor for elementary students, two afternoons a week. Strong algebra skills and patience required.",
+    "Barista at a busy downtown cafe. Weekend mornings. Experience with espresso machines preferred.",
+    "Summer camp counselor for children aged 6 to 10. Energetic, responsible, experience with kids a plus.",
+    "Warehouse stock associate. Able to lift 40 pounds, reliable, attention to detail with inventory.",
+    "Social media assistant for a local bakery. Create posts and photos; Photoshop experience is a plus.",
+    "Junior web developer intern. Basic Python or JavaScript; curious and eager to learn.",
+    "Restaurant host. Greet guests, manage the waitlist, answer phones. Friday and Saturday nights.",
+    "Retail sales associate at a clothing store. Outgoing, good with customers, weekends required.",
+]
+
+
+def make_resume(rng, number):
+    school = rng.choice(SCHOOLS)
+    lines = [
+        f"Candidate {number}",
+        "[REDACTED] | [REDACTED] | [REDACTED]",
+        "OBJECTIVE",
+        "Motivated high school student seeking a part-time position where I can grow my skills, "
+        "contribute to a team and gain real work experience while keeping up with my studies.",
+        "EDUCATION",
+        f"{school}, expected graduation {rng.choice([2026, 2027, 2028])}. GPA {rng.uniform(2.8, 4.0):.1f}. "
+        f"Relevant coursework: {', '.join(rng.sample(['Algebra II', 'Biology', 'Business', 'Chemistry', 'English', 'Computer Science', 'Spanish III'], 3))}.",
+        "EXPERIENCE",
+    ]
+    for title, place, duties in rng.sample(ROLES, rng.randint(2, 4)):
+        lines.append(f"{title}, {place} ({rng.randint(3, 18)} months)")
+        lines.append(duties + " Recognized by my manager for reliability and always arriving on time for my shifts.")
+    lines += [
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, rng.randint(4, 7))),
+        "ACTIVITIES AND AWARDS",
+    ]
+    lines += [f"{activity}, {rng.randint(1, 4)} years" for activity in rng.sample(ACTIVITIES, rng.randint(2, 4))]
+    lines += ["AVAILABILITY", rng.choice(["Weekday evenings and weekends.", "Weekends only during the school year; full time in summer."])]
+    return "\n".join(lines)
+
+
+class Command(BaseCommand):
+    help = (
+        "Grades a fixed evaluation set (every resume against every job) against a local fake "
+        "completion server, once single-stage (the whole resume in every grading prompt) and "
+        "once two-stage (each resume summarized once, then the summary graded per job). The "
+        "fake server charges prefill time per prompt token. Reports provider calls, prompt "
+        "and completion tokens and latency for each stage, and the totals with the summaries "
+        "made in the run or already stored on the profiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--resumes', type=int, default=10)
+        parser.add_argument('--jobs', type=int, default=len(JOBS), choices=range(1, len(JOBS) + 1), metavar='1..10')
+        parser.add_argument('--workers', type=int, default=8, help="Gradings in flight at once.")
+        parser.add_argument('--latency', type=float, default=0.05, help="Fake provider seconds per reply.")
+        parser.add_argument('--prefill', type=float, default=0.05, help="Fake provider seconds per 1000 prompt tokens.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(SEED)
+        resumes = [make_resume(rng, number) for number in range(options['resumes'])]
+        pairs = [(resume, job) for resume in resumes for job in JOBS[:options['jobs']]]
+
+        summaries = {}
+
+        def single_stage(resume, job):
+            return grade_resume_text(resume, job)
+
+        def summarize(resume, job):
+            # What a profile stores the first time it is graded
+            summaries[resume] = get_resume_summary(resume)
+            return summaries[resume]
+
+        def grade_summary(resume, job):
+            # Every later grading of that profile
+            return grade_resume_summary(summaries[resume], job)
+
+        runs = [
+            ('single-stage', single_stage, pairs),
+            ('summarize', summarize, [(resume, None) for resume in resumes]),
+            ('grade summary', grade_summary, pairs),
+        ]
+        results = {}
+        for name, grade, work in runs:
+            # Nothing carries over from an earlier run or the other path but the summaries
+            grade_cache.invalidate()
+            with FakeCompletionServer(latency=options['latency'], prefill_seconds_per_1k=options['prefill']) as server:
+                with override_settings(LLM_BASE_URL=server.url, LLM_API_KEY=FAKE_API_KEY, LLM_REQUESTS_PER_SECOND=0):
+                    llm.reset_gateway()
+                    latencies = []
+
+                    def timed(item):
+                        started = time.perf_counter()
+                        reply = grade(*item)
+                        latencies.append(time.perf_counter() - started)
+                        return reply
+
+                    started = time.perf_counter()
+                    with ThreadPoolExecutor(options['workers']) as pool:
+                        replies = list(pool.map(timed, work))
+                    elapsed = time.perf_counter() - started
+            if name != 'summarize':
+                # Fallback grades start with a number too; only the fake's reply is a real grade
+                fallbacks = [reply for reply in replies if reply != APPLICANT_REPLY]
+                if fallbacks:
+                    raise CommandError(f"{name}: {len(fallbacks)} grading(s) fell back: {fallbacks[0]}")
+            results[name] = (server, elapsed)
+            self.stdout.write(
+                f"{name:13} {len(work):4} items  {server.requests:4} calls  "
+                f"prompt tokens={server.prompt_tokens:7}  completion tokens={server.completion_tokens:5}  "
+                f"wall={elapsed:5.2f}s  avg={sum(latencies) / len(latencies) * 1000:4.0f}ms"
+            )
+        grade_cache.invalidate()
+        llm.reset_gateway()
+
+        (single, single_time), (summary, summary_time), (graded, graded_time) = results.values()
+        cold_tokens = summary.prompt_tokens + graded.prompt_tokens
+        self.stdout.write(
+            f"Two-stage, summaries made in the run: {cold_tokens} prompt tokens "
+            f"({1 - cold_tokens / single.prompt_tokens:.0%} fewer), {summary_time + graded_time:.2f}s "
+            f"vs {single_time:.2f}s.\n"
+            f"Two-stage, summaries already on the profiles: {graded.prompt_tokens} prompt tokens "
+            f"({1 - graded.prompt_tokens / single.prompt_tokens:.0%} fewer), {graded_time:.2f}s "
+            f"({1 - graded_time / single_time:.0%} faster)."
+        )
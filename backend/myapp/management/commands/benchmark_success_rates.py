@@ -0,0 +1,80 @@
+import time
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from myapp.models import JobPosting, UserProfile
+from myapp.stats import provider_success_rates
+from myapp.management.rollback import rolled_back
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds job providers inside a transaction that is rolled back, then times the old "
+        "per-provider success rate loop against the single annotated query."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--providers', type=int, default=10000)
+        parser.add_argument('--jobs-per-provider', type=int, default=3)
+        parser.add_argument('--page-size', type=int, default=50)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.seed(options['providers'], options['jobs_per_provider'])
+            self.run(options['page_size'])
+        self.stdout.write("Seed data rolled back.")
+
+    def seed(self, num_providers, jobs_per_provider):
+        self.stdout.write(f"Seeding {num_providers} providers with {jobs_per_provider} job(s) each...")
+        users = User.objects.bulk_create(
+            [User(username=f"bench_provider_{i}") for i in range(num_providers)], batch_size=1000
+        )
+        if users[0].pk is None:
+            users = list(User.objects.filter(username__startswith='bench_provider_').order_by('id'))
+        profiles = UserProfile.objects.bulk_create(
+            [UserProfile(user=user, is_job_provider=True) for user in users], batch_size=1000
+        )
+        if profiles[0].pk is None:
+            profiles = list(UserProfile.objects.filter(user__in=users).order_by('id'))
+        statuses = ['approved', 'pending', 'denied']
+        JobPosting.objects.bulk_create(
+            [
+                JobPosting(
+                    posted_by=profile, title='Benchmark job', company_name='Bench', company_email='bench@example.com',
+                    location='Normal, IL', salary='15', job_type='Part-time', description='-', requirements='[]',
+                    status=statuses[(i + j) % len(statuses)],
+                )
+                for i, profile in enumerate(profiles) for j in range(jobs_per_provider)
+            ],
+            batch_size=1000,
+        )
+
+    def timed(self, label, fn):
+        queries = []
+
+        def count_query(execute, sql, params, many, context):
+            queries.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            start = time.perf_counter()
+            fn()
+            elapsed = (time.perf_counter() - start) * 1000
+        self.stdout.write(f"{label}: {elapsed:.1f} ms, {len(queries)} queries")
+
+    def run(self, page_size):
+        def per_provider_loop():
+            for provider in UserProfile.objects.filter(is_job_provider=True):
+                provider.user.username
+                provider.get_job_post_success_rate()
+
+        def annotated_all():
+            for provider in provider_success_rates():
+                provider.user.username
+
+        def annotated_page():
+            list(provider_success_rates()[:page_size])
+
+        self.timed("Per-provider loop (before)", per_provider_loop)
+        self.timed("Annotated query, all providers", annotated_all)
+        self.timed(f"Annotated query, first page of {page_size}", annotated_page)
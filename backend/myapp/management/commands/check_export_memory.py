@@ -0,0 +1,72 @@
+import time
+import tracemalloc
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+from myapp.models import Message, UserProfile
+from myapp.views import api_admin_export_messages
+from myapp.management.rollback import rolled_back
+
+SEED_BATCH_SIZE = 10000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds message rows inside a transaction that is rolled back, streams the message "
+        "export in each format and fails if peak Python memory exceeds the ceiling."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000)
+        parser.add_argument('--ceiling-mb', type=float, default=64.0, help="Maximum allowed peak traced memory per export.")
+
+    def handle(self, *args, **options):
+        failures = []
+        with rolled_back():
+            admin, recipient = self.seed(options['rows'])
+            for output in ('csv', 'ndjson'):
+                peak_mb = self.measure(admin, recipient, output, options['rows'])
+                if peak_mb > options['ceiling_mb']:
+                    failures.append(f"{output}: {peak_mb:.1f} MB")
+        self.stdout.write("Seed data rolled back.")
+        if failures:
+            raise CommandError(f"Export memory above {options['ceiling_mb']} MB: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS(f"Every export stayed under {options['ceiling_mb']} MB."))
+
+    def seed(self, num_rows):
+        self.stdout.write(f"Seeding {num_rows} messages...")
+        admin = User.objects.create_superuser('export_memory_admin', 'export@example.com', None)
+        sender = UserProfile.objects.create(user=User.objects.create_user('export_memory_sender'))
+        recipient = UserProfile.objects.create(user=User.objects.create_user('export_memory_recipient'))
+        for start in range(0, num_rows, SEED_BATCH_SIZE):
+            Message.objects.bulk_create([
+                Message(sender=sender, recipient=recipient, content=f"Seeded message {i}")
+                for i in range(start, min(start + SEED_BATCH_SIZE, num_rows))
+            ])
+        return admin, recipient
+
+    def measure(self, admin, recipient, output, num_rows):
+        # Scoped to the seeded recipient so existing messages do not skew the row count
+        request = APIRequestFactory().get('/api/admin/exports/messages/', {'output': output, 'user': recipient.id})
+        force_authenticate(request, user=admin)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        response = api_admin_export_messages(request)
+        lines = 0
+        size = 0
+        for chunk in response.streaming_content:
+            lines += 1
+            size += len(chunk)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        expected = num_rows + (1 if output == 'csv' else 0)
+        if lines != expected:
+            raise CommandError(f"{output} export produced {lines} lines, expected {expected}.")
+        peak_mb = peak / (1024 * 1024)
+        self.stdout.write(
+            f"{output}: {lines} lines, {size / (1024 * 1024):.1f} MB streamed in {elapsed:.1f}s, peak traced memory {peak_mb:.1f} MB"
+        )
+        return peak_mb
@@ -0,0 +1,81 @@
+import multiprocessing
+import threading
+import uuid
+from collections import Counter
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import override_settings
+from myapp import llm
+from myapp.applicant_checker import grade_resume_text
+from myapp.fake_llm import FAKE_API_KEY, FakeCompletionServer
+
+JOB_DESCRIPTION = "Part-time cashier, evenings and weekends. No experience needed."
+
+
+def grade_together(resume_text, num_threads, start_barrier=None):
+    """Grades the same resume from num_threads threads released at once; returns their replies."""
+    # A forked worker must build its own client rather than share the parent's connections
+    llm.reset_gateway()
+    thread_barrier = threading.Barrier(num_threads)
+    replies = Counter()
+    lock = threading.Lock()
+
+    def grade():
+        thread_barrier.wait()
+        reply = grade_resume_text(resume_text, JOB_DESCRIPTION)
+        with lock:
+            replies[reply] += 1
+
+    if start_barrier is not None:
+        start_barrier.wait()
+    threads = [threading.Thread(target=grade) for _ in range(num_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return replies
+
+
+class Command(BaseCommand):
+    help = (
+        "Grades one resume from many concurrent requests against a local fake completion "
+        "server and fails unless they made exactly one provider call and all got its reply. "
+        "With --processes above 1 the requests come from separate worker processes, which "
+        "only coalesce through a shared cache (CACHE_BACKEND=file or redis)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help="Concurrent requests per process.")
+        parser.add_argument('--processes', type=int, default=1)
+        parser.add_argument('--latency', type=float, default=0.5, help="Fake provider seconds per reply.")
+
+    def handle(self, *args, **options):
+        if options['processes'] > 1 and settings.CACHE_BACKEND == 'locmem':
+            raise CommandError("Coalescing across processes needs a shared cache: set CACHE_BACKEND=file or redis.")
+
+        # Unique text, so nothing from an earlier run is already cached
+        resume_text = f"Resume {uuid.uuid4().hex}: cashier at a grocery store, honor roll."
+        with FakeCompletionServer(latency=options['latency']) as server, \
+                override_settings(LLM_BASE_URL=server.url, LLM_API_KEY=FAKE_API_KEY):
+            if options['processes'] == 1:
+                replies = grade_together(resume_text, options['requests'])
+            else:
+                connections.close_all()
+                context = multiprocessing.get_context('fork')
+                start_barrier = context.Manager().Barrier(options['processes'])
+                with context.Pool(options['processes']) as pool:
+                    pending = [
+                        pool.apply_async(grade_together, (resume_text, options['requests'], start_barrier))
+                        for _ in range(options['processes'])
+                    ]
+                    replies = sum((result.get() for result in pending), Counter())
+            llm.reset_gateway()
+
+        total = options['requests'] * options['processes']
+        self.stdout.write(
+            f"{total} concurrent requests ({options['processes']} process(es)): "
+            f"{server.requests} provider call(s), replies {dict(replies)}"
+        )
+        if server.requests != 1 or len(replies) != 1:
+            raise CommandError(f"Expected exactly one provider call shared by all requests, got {server.requests}.")
@@ -0,0 +1,177 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+from django.conf import settings
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+from myapp import llm
+from myapp.fake_llm import FAKE_API_KEY, FakeCompletionServer
+
+RESUME_TEXT = "Cashier at a grocery store for one year. Honor roll. Available evenings and weekends."
+JOB_DESCRIPTION = "Part-time cashier, evenings and weekends. No experience needed."
+# Long enough that streaming the explanation takes a while
+REPLY = "85;" + " ".join(
+    "The candidate has a year of cashier experience, is available at the times the job needs, "
+    "and shows reliability through strong grades, so they meet most of the requirements.".split() * 3
+)
+
+
+def write_pdf(path, text):
+    """A one-page PDF whose text PyPDF2 can extract."""
+    stream = f"BT /F1 10 Tf 20 700 Td ({text}) Tj ET".encode()
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream",
+    ]
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(data))
+        data += b"%d 0 obj\n" % number + body + b"\nendobj\n"
+    xref = len(data)
+    data += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    data += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    data += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+async def stream_request(application, path, body, disconnect_after=None, hang_up_after=None):
+    """
+    Sends one POST through the ASGI application and reads the response as a client
+    would. Returns [(seconds since the request, SSE event type, data)]. With
+    disconnect_after, the client hangs up as soon as that event arrives; with
+    hang_up_after, that many seconds after the request.
+    """
+    events = []
+    hang_up = asyncio.Event()
+    if hang_up_after is not None:
+        asyncio.get_running_loop().call_later(hang_up_after, hang_up.set)
+    started = time.perf_counter()
+    body_sent = False
+    buffer = ""
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await hang_up.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal buffer
+        if message['type'] != 'http.response.body':
+            return
+        buffer += message.get('body', b'').decode()
+        while "\n\n" in buffer:
+            block, buffer = buffer.split("\n\n", 1)
+            fields = dict(line.split(": ", 1) for line in block.splitlines() if ": " in line)
+            if 'event' in fields:
+                events.append((time.perf_counter() - started, fields['event'], json.loads(fields['data'])))
+                if fields['event'] == disconnect_after:
+                    hang_up.set()
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'POST',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'', 'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'content-type', b'application/json')],
+        'client': ('127.0.0.1', 50000), 'server': ('localhost', 80),
+    }
+    await application(scope, receive, send)
+    return events
+
+
+class Command(BaseCommand):
+    help = (
+        "Streams an applicant grading through the ASGI app from a local fake completion server "
+        "that sends the reply a word at a time. Fails unless the grade event arrives well "
+        "before the reply ends, the explanation streams after it, a client that hangs up "
+        "right after the grade makes the server close the upstream stream early, and one "
+        "that hangs up while its call waits for a concurrency slot makes no call at all."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latency', type=float, default=0.3, help="Fake provider seconds before the first word.")
+        parser.add_argument('--chunk-delay', type=float, default=0.05, help="Fake provider seconds between words.")
+
+    def handle(self, *args, **options):
+        application = get_asgi_application()
+        with tempfile.TemporaryDirectory() as directory:
+            resume = os.path.join(directory, 'resume.pdf')
+            write_pdf(resume, RESUME_TEXT)
+            body = json.dumps({'resume_url': resume, 'description': JOB_DESCRIPTION}).encode()
+            with FakeCompletionServer(options['latency'], reply=lambda content: REPLY,
+                                      chunk_delay=options['chunk_delay']) as server:
+                # Straight to the streamed grading call: no local verdict, no summary call first
+                with override_settings(LLM_BASE_URL=server.url, LLM_API_KEY=FAKE_API_KEY,
+                                       RESUME_PRESCREEN=False, RESUME_SUMMARIES=False, CACHES=self.uncached()):
+                    llm.reset_gateway()
+                    llm.reset_llm_metrics()
+                    full = asyncio.run(stream_request(application, '/api/grade_applicant_live/stream/', body))
+                    hung_up = asyncio.run(stream_request(
+                        application, '/api/grade_applicant_live/stream/', body, disconnect_after='grade'
+                    ))
+                    # Let the fake server notice the closed connection
+                    time.sleep(options['chunk_delay'] * 4)
+                    metrics = llm.llm_metrics()
+                    aborted = server.aborted
+
+                    # Every slot busy, so the next call queues; its client gives up meanwhile
+                    _, slots = llm.get_limits()
+                    for _ in range(settings.LLM_MAX_CONCURRENCY):
+                        slots.acquire()
+                    calls_before = server.requests
+                    try:
+                        queued = asyncio.run(stream_request(
+                            application, '/api/grade_applicant_live/stream/', body, hang_up_after=1
+                        ))
+                    finally:
+                        for _ in range(settings.LLM_MAX_CONCURRENCY):
+                            slots.release()
+                    queued_calls = server.requests - calls_before
+                    queued_cancelled = llm.llm_metrics()['cancelled'] - metrics['cancelled']
+                llm.reset_gateway()
+
+        kinds = [kind for _, kind, _ in full]
+        self.stdout.write(f"Full stream: {len(full)} events ({', '.join(dict.fromkeys(kinds))})")
+        if not full or kinds[0] != 'grade' or kinds[-1] != 'done' or 'explanation' not in kinds:
+            raise CommandError(f"Expected grade, explanation... and done events, got {kinds}")
+        grade_at, done_at = full[0][0], full[-1][0]
+        explanation = "".join(data['text'] for _, kind, data in full if kind == 'explanation')
+        self.stdout.write(
+            f"  grade {full[0][2]['grade']} after {grade_at:.2f}s; explanation finished after {done_at:.2f}s"
+        )
+        if full[0][2]['grade'] != "85" or explanation.strip() != REPLY.split(';', 1)[1].strip():
+            raise CommandError("The streamed grade or explanation does not match the reply.")
+        if grade_at > done_at / 2:
+            raise CommandError("The grade did not arrive well before the end of the reply.")
+
+        self.stdout.write(
+            f"Client hung up after the grade: {len(hung_up)} event(s); provider streams closed early: "
+            f"{aborted}; gateway cancellations: {metrics['cancelled']}"
+        )
+        if not hung_up or hung_up[0][1] != 'grade' or len(hung_up) >= len(full) / 2:
+            raise CommandError("The response kept streaming after the client hung up.")
+        if aborted != 1 or metrics['cancelled'] != 1:
+            raise CommandError("The upstream stream was not cancelled when the client hung up.")
+
+        self.stdout.write(
+            f"Client hung up while queued: {len(queued)} event(s); provider calls: {queued_calls}; "
+            f"gateway cancellations: {queued_cancelled}"
+        )
+        if queued or queued_calls or queued_cancelled != 1:
+            raise CommandError("A client that hung up while queued still got a provider call.")
+
+    def uncached(self):
+        # A cached grade would arrive whole; this checks the streamed path
+        return {
+            name: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+            for name in ('default', *settings.CACHE_NAMESPACES)
+        }
@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Must stay out of a plain startup; they are loaded on first grade (see myapp.llm)
+LAZY_MODULES = ('cerebras', 'openai', 'PyPDF2', 'pdfplumber')
+
+# Run in a fresh interpreter: setup() plus everything a worker imports to serve requests
+STARTUP_SCRIPT = f"""
+import json, sys
+import django
+django.setup()
+import appbackend.urls, myapp.views
+loaded = sorted({{name.split('.')[0] for name in sys.modules}} & set({LAZY_MODULES!r}))
+print(json.dumps(loaded))
+"""
+
+
+def parse_importtime(stderr):
+    """Total and per-module cumulative microseconds from python -X importtime output."""
+    total = 0
+    cumulative = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        _, cumulative_us, name = line.split('|')
+        cumulative[name.strip()] = int(cumulative_us)
+        # Nested imports are indented under their parent; top-level ones add up to the whole
+        if not name[1:].startswith(' '):
+            total += int(cumulative_us)
+    return total, cumulative
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures interpreter startup with python -X importtime: Django setup plus the URL "
+        "conf and views, as a worker process loads them. Fails if the fastest run is over "
+        "the budget or if any heavy SDK meant to load lazily is imported at startup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters to start; the fastest counts.")
+        parser.add_argument('--budget-ms', type=float, default=800.0, help="Maximum allowed import time.")
+        parser.add_argument('--top', type=int, default=10, help="Slowest top-level imports to list.")
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'appbackend.settings'))
+        best = None
+        for _ in range(options['runs']):
+            result = subprocess.run(
+                [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT],
+                cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+            )
+            if result.returncode != 0:
+                raise CommandError(f"Startup failed:\n{result.stderr[-2000:]}")
+            total, cumulative = parse_importtime(result.stderr)
+            loaded = json.loads(result.stdout.strip().splitlines()[-1])
+            if best is None or total < best[0]:
+                best = (total, cumulative, loaded)
+
+        total, cumulative, loaded = best
+        self.stdout.write(f"Import time (fastest of {options['runs']}): {total / 1000:.0f} ms")
+        self.stdout.write(f"  myapp.views: {cumulative.get('myapp.views', 0) / 1000:.0f} ms")
+        slowest = sorted(cumulative.items(), key=lambda item: item[1], reverse=True)[:options['top']]
+        for name, us in slowest:
+            self.stdout.write(f"  {us / 1000:8.1f} ms  {name}")
+
+        failures = []
+        if loaded:
+            failures.append(f"loaded at startup: {', '.join(loaded)}")
+        if total / 1000 > options['budget_ms']:
+            failures.append(f"{total / 1000:.0f} ms is over the {options['budget_ms']:.0f} ms budget")
+        if failures:
+            raise CommandError("; ".join(failures))
@@ -0,0 +1,72 @@
+import re
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Q
+from myapp.models import JobPosting, LeaderboardEntry, Message, UserProfile
+
+
+def hot_queries():
+    """(label, queryset) for the query shapes the indexes in migration 0022 and earlier are built for."""
+    return [
+        ("Approved jobs, newest first", JobPosting.objects.filter(status='approved').order_by('-created_at')),
+        ("Admin job list by status", JobPosting.objects.filter(status='pending')),
+        ("Admin job list, all statuses", JobPosting.objects.order_by('-created_at')),
+        ("Inbox page", Message.objects.filter(recipient_id=1).order_by('-timestamp', '-id')),
+        ("Sent page", Message.objects.filter(sender_id=1).order_by('-timestamp', '-id')),
+        ("Conversation thread", Message.objects.filter(
+            Q(sender_id=1, recipient_id=2) | Q(sender_id=2, recipient_id=1)
+        ).order_by('-timestamp', '-id')),
+        ("Unread messages in a conversation", Message.objects.filter(recipient_id=1, sender_id=2, is_read=False)),
+        ("Unread messages for a recipient", Message.objects.filter(recipient_id=1, is_read=False)),
+        ("Students by applications", UserProfile.objects.filter(is_job_provider=False).order_by('-num_applications', 'id')),
+        ("Ranked students by applications", UserProfile.objects.filter(
+            is_job_provider=False, opt_in_leaderboard=True
+        ).order_by('-num_applications', 'id')),
+        ("Ranked students by profile completion", UserProfile.objects.filter(
+            is_job_provider=False, opt_in_leaderboard=True
+        ).order_by('-profile_completion', 'id')),
+        ("Job providers", UserProfile.objects.filter(is_job_provider=True).order_by('id')),
+        ("Leaderboard top", LeaderboardEntry.objects.filter(board='applications').order_by('-score', 'user_profile_id')),
+    ]
+
+
+def full_scans(plan, table):
+    """Plan lines that read the whole table without an index."""
+    if connection.vendor == 'sqlite':
+        # "SCAN t" is a full scan; "SCAN t USING INDEX i" walks an index; "SEARCH t USING ..." seeks one
+        return [line for line in plan.splitlines() if re.search(rf'\bSCAN {table}\b(?!.*USING)', line)]
+    if connection.vendor == 'postgresql':
+        return [line for line in plan.splitlines() if f'Seq Scan on {table}' in line]
+    return []
+
+
+class Command(BaseCommand):
+    help = "Runs EXPLAIN on the hot queries and fails if any of them scans its table instead of using an index."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verbose-plans', action='store_true', help="Print every plan, not only failing ones.")
+
+    def handle(self, *args, **options):
+        if connection.vendor not in ('sqlite', 'postgresql'):
+            raise CommandError(f"Plan checks support SQLite and PostgreSQL, not {connection.vendor}.")
+
+        failures = []
+        with transaction.atomic():
+            if connection.vendor == 'postgresql':
+                # Small dev tables make sequential scans look cheapest; ask whether an index is usable at all
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL enable_seqscan = off")
+            for label, queryset in hot_queries():
+                plan = queryset.explain()
+                scans = full_scans(plan, queryset.model._meta.db_table)
+                if scans:
+                    failures.append(label)
+                    self.stdout.write(self.style.ERROR(f"FULL SCAN  {label}"))
+                else:
+                    self.stdout.write(f"index      {label}")
+                if scans or options['verbose_plans']:
+                    self.stdout.write(f"    {plan}".replace('\n', '\n    '))
+
+        if failures:
+            raise CommandError(f"{len(failures)} hot query(ies) scan their table: {', '.join(failures)}")
+        self.stdout.write(self.style.SUCCESS("Every hot query uses an index."))
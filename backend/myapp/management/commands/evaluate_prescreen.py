@@ -0,0 +1,176 @@
+import json
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from myapp.applicant_checker import grade_resume_text
+from myapp.prescreen import document_frequencies, parse_requirements, prescreen_grade
+
+# The built-in labeled set: redacted resumes and job posts graded by hand against the
+# grading prompt's rubric (100 ideal, 85 most requirements, 75 needs a human, 0 no fit).
+# Replace it with real model grades through --labels (see --record).
+JOBS = {
+    'cashier': (
+        "Part-time cashier at a neighborhood grocery store. Ring up customers, handle cash and cards "
+        "and keep the checkout area tidy. Evenings and weekends.",
+        ["cash handling", "customer service", "weekend availability"],
+    ),
+    'lifeguard': (
+        "Lifeguard at the community pool for the summer season. Watch swimmers, enforce pool rules "
+        "and respond to emergencies.",
+        ["lifeguard certification", "CPR", "first aid"],
+    ),
+    'tutor': (
+        "Math tutor for elementary and middle school students, two afternoons a week at the library.",
+        ["algebra", "tutoring experience", "patience"],
+    ),
+    'web intern': (
+        "Junior web developer intern at a small agency. Help build, test and update client websites.",
+        ["Python or JavaScript", "HTML", "Git"],
+    ),
+    'camp counselor': (
+        "Summer day camp counselor for children aged 6 to 10. Lead games and crafts and supervise "
+        "campers on field trips.",
+        ["experience with children", "CPR", "energetic"],
+    ),
+    'social media': (
+        "Social media assistant for a local bakery. Plan posts, take product photos and answer comments.",
+        ["social media", "photography", "Photoshop"],
+    ),
+}
+RESUMES = {
+    'grocery cashier': (
+        "Cashier, FreshMart grocery (1 year). Ran the register, balanced the drawer at close and helped "
+        "customers find products. Employee of the month for customer service. Skills: cash handling, "
+        "Spanish, teamwork. Available evenings and weekends.",
+        {'cashier': 100, 'lifeguard': 0, 'tutor': 0, 'web intern': 0, 'camp counselor': 0, 'social media': 0},
+    ),
+    'certified lifeguard': (
+        "American Red Cross certified lifeguard; CPR/AED and first aid certified. Swim team, 4 years. "
+        "Junior counselor at a YMCA summer camp, supervising groups of kids at the pool.",
+        {'cashier': 75, 'lifeguard': 100, 'tutor': 0, 'web intern': 0, 'camp counselor': 85, 'social media': 0},
+    ),
+    'honor student': (
+        "National Honor Society. AP Calculus and Algebra II, GPA 3.9. Peer tutor in algebra for two "
+        "years through the school's homework help program; patient with struggling students.",
+        {'cashier': 75, 'lifeguard': 0, 'tutor': 100, 'web intern': 0, 'camp counselor': 75, 'social media': 0},
+    ),
+    'student coder': (
+        "Built three websites with HTML, CSS and JavaScript, published on GitHub. President of the "
+        "Python club; robotics team programmer. AP Computer Science A.",
+        {'cashier': 0, 'lifeguard': 0, 'tutor': 75, 'web intern': 100, 'camp counselor': 0, 'social media': 0},
+    ),
+    'yearbook photographer': (
+        "Yearbook photographer for two years. Runs the art club's Instagram and TikTok accounts. "
+        "Edits photos in Photoshop and Lightroom; sells prints at the school craft fair.",
+        {'cashier': 0, 'lifeguard': 0, 'tutor': 0, 'web intern': 75, 'camp counselor': 0, 'social media': 100},
+    ),
+    'freshman': (
+        "Ninth grade student. Member of the marching band. Enjoys video games and drawing.",
+        {'cashier': 0, 'lifeguard': 0, 'tutor': 0, 'web intern': 0, 'camp counselor': 0, 'social media': 0},
+    ),
+    'babysitter': (
+        "Babysitter for three families (2 years), caring for kids aged 2 to 9. Church nursery volunteer. "
+        "CPR certified. Assistant coach for a youth soccer team; energetic and reliable.",
+        {'cashier': 0, 'lifeguard': 75, 'tutor': 0, 'web intern': 0, 'camp counselor': 100, 'social media': 0},
+    ),
+    'fast food crew': (
+        "Crew member at a burger restaurant (8 months). Took orders at the drive-thru and the front "
+        "register, followed food safety rules, worked Saturday and Sunday shifts.",
+        {'cashier': 85, 'lifeguard': 0, 'tutor': 0, 'web intern': 0, 'camp counselor': 0, 'social media': 0},
+    ),
+}
+
+
+def builtin_labels():
+    return [
+        {'resume': resume, 'description': JOBS[job][0], 'requirements': JOBS[job][1], 'grade': grade}
+        for resume, grades in RESUMES.values()
+        for job, grade in grades.items()
+    ]
+
+
+def outcome(grade):
+    """What a grade means for the application: a match, a mismatch, or a human review."""
+    if grade >= 85:
+        return 'match'
+    if grade < 75:
+        return 'mismatch'
+    return 'review'
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs the local applicant pre-screen over a labeled set and reports how many model "
+        "calls it would avoid and how often its grades agree with the labels (a decision "
+        "agrees when both say match, 85 and up, or both say mismatch, below 75). Uses the "
+        "built-in hand-labeled set, or model grades from --labels (JSON lines with resume, "
+        "description, requirements and grade); --record writes such a file by grading the "
+        "built-in set with the configured model."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--labels', help="JSON lines file of labeled gradings.")
+        parser.add_argument('--record', metavar='FILE', help="Grade the built-in set with the model and write the labels here.")
+        parser.add_argument('--match', type=float, default=settings.PRESCREEN_MATCH_SCORE)
+        parser.add_argument('--mismatch', type=float, default=settings.PRESCREEN_MISMATCH_SCORE)
+        parser.add_argument('--sweep', action='store_true', help="Report a range of thresholds instead.")
+
+    def handle(self, *args, **options):
+        if options['record']:
+            return self.record(options['record'])
+
+        labels = self.read_labels(options['labels']) if options['labels'] else builtin_labels()
+        # IDF over the labeled set's own postings, so the report does not depend on the database
+        frequencies = document_frequencies(sorted({
+            f"{label['description']} {' '.join(parse_requirements(label['requirements']))}" for label in labels
+        }))
+
+        thresholds = [(options['match'], options['mismatch'])]
+        if options['sweep']:
+            thresholds = [(match, mismatch) for match in (0.4, 0.5, 0.6, 0.7) for mismatch in (0.05, 0.1, 0.15, 0.2)]
+        self.stdout.write(f"{len(labels)} labeled gradings")
+        for match, mismatch in thresholds:
+            self.evaluate(labels, frequencies, match, mismatch)
+
+    def evaluate(self, labels, frequencies, match, mismatch):
+        decided = agreed = false_matches = false_mismatches = 0
+        for label in labels:
+            grade = prescreen_grade(label['resume'], label['description'], label['requirements'],
+                                    frequencies, match, mismatch)
+            if grade is None:
+                continue
+            decided += 1
+            predicted, expected = outcome(int(grade.split(';', 1)[0])), outcome(label['grade'])
+            agreed += predicted == expected
+            false_matches += predicted == 'match' and expected == 'mismatch'
+            false_mismatches += predicted == 'mismatch' and expected == 'match'
+        agreement = f"{agreed / decided:.0%}" if decided else "n/a"
+        self.stdout.write(
+            f"match>={match:.2f} mismatch<={mismatch:.2f}: {decided}/{len(labels)} decided locally "
+            f"({decided / len(labels):.0%} of model calls avoided), agreement {agreement}, "
+            f"{false_matches} mismatch(es) graded as matches, {false_mismatches} match(es) graded as mismatches"
+        )
+
+    def read_labels(self, path):
+        try:
+            with open(path) as f:
+                labels = [json.loads(line) for line in f if line.strip()]
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read labels from {path}: {e}")
+        for number, label in enumerate(labels, 1):
+            if not {'resume', 'description', 'grade'} <= label.keys():
+                raise CommandError(f"Label {number} needs resume, description and grade.")
+            label.setdefault('requirements', [])
+            label['grade'] = int(label['grade'])
+        return labels
+
+    def record(self, path):
+        labels = builtin_labels()
+        with open(path, 'w') as f:
+            for number, label in enumerate(labels, 1):
+                # The full-text grading path, skipping both the pre-screen and the summary
+                grade = grade_resume_text(label['resume'], label['description']).split(';', 1)[0]
+                if not grade.strip().isdigit():
+                    raise CommandError(f"The model returned no grade for label {number}: {grade}")
+                f.write(json.dumps({**label, 'grade': int(grade)}) + "\n")
+                self.stdout.write(f"{number}/{len(labels)} graded")
+        self.stdout.write(f"Wrote {len(labels)} model-graded labels to {path}.")
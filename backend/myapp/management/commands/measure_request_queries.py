@@ -0,0 +1,99 @@
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from rest_framework_simplejwt.tokens import RefreshToken
+from myapp.models import JobPosting, Message, Reference, UserProfile
+from myapp.management.rollback import rolled_back
+
+
+# (role, method, path) with {job}, {other} and {message} filled in from the seed data
+ENDPOINTS = [
+    ('student', 'get', '/api/profile/'),
+    ('student', 'get', '/api/profile/references/'),
+    ('student', 'post', '/api/profile/references/add/'),
+    ('student', 'get', '/api/profile/education/'),
+    ('student', 'get', '/api/my-applications/'),
+    ('student', 'get', '/api/jobs/'),
+    ('student', 'get', '/api/jobs/{job}/'),
+    ('student', 'post', '/api/favorite-job/'),
+    ('student', 'get', '/api/favorited-jobs/'),
+    ('student', 'get', '/api/check-is-staff/'),
+    ('student', 'get', '/api/conversations/'),
+    ('student', 'get', '/api/conversations/{other}/'),
+    ('student', 'get', '/api/inbox/'),
+    ('student', 'get', '/api/sent-messages/'),
+    ('student', 'post', '/api/send-message/'),
+    ('student', 'patch', '/api/messages/{message}/read/'),
+    ('student', 'get', '/api/messages/unread-count/'),
+    ('student', 'get', '/api/gamification/profile/'),
+    ('student', 'get', '/api/gamification/badges/'),
+    ('student', 'get', '/api/gamification/challenges/'),
+    ('student', 'get', '/api/gamification/leaderboard/me/'),
+    ('provider', 'get', '/api/applicants/'),
+    ('admin', 'get', '/api/admin/jobs/'),
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Calls the authenticated API endpoints with a JWT inside a transaction that is rolled "
+        "back, and reports the queries each request makes. Caches are cleared before every "
+        "request, so the counts are for a cold request."
+    )
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.run(self.seed())
+        self.stdout.write("Seed data rolled back.")
+
+    def seed(self):
+        student = UserProfile.objects.create(user=User.objects.create_user('measure_student', first_name='Sam'))
+        provider = UserProfile.objects.create(user=User.objects.create_user('measure_provider'), is_job_provider=True)
+        admin = UserProfile.objects.create(user=User.objects.create_superuser('measure_admin', 'measure@example.com', None))
+        job = JobPosting.objects.create(
+            posted_by=provider, title='Measure job', company_name='Measure', company_email='measure@example.com',
+            location='Normal, IL', salary='15', job_type='Part-time', description='-', requirements='[]',
+            status='approved',
+        )
+        student.applied_jobs.add(job)
+        Reference.objects.create(user_profile=student, name='Ref', relation='Teacher', contact='ref@example.com')
+        message = Message.objects.create(sender=provider, recipient=student, content='Hello')
+        Message.objects.create(sender=student, recipient=provider, content='Hello back')
+        return {
+            'profiles': {'student': student, 'provider': provider, 'admin': admin},
+            'ids': {'job': job.id, 'other': provider.id, 'message': message.id},
+            'bodies': {
+                '/api/profile/references/add/': {'name': 'Ref 2', 'relation': 'Coach', 'contact': 'coach@example.com'},
+                '/api/favorite-job/': {'job_id': job.id},
+                '/api/send-message/': {'recipient_id': provider.id, 'content': 'Hello again'},
+            },
+        }
+
+    def run(self, seed):
+        clients = {}
+        for role, profile in seed['profiles'].items():
+            token = RefreshToken.for_user(profile.user).access_token
+            clients[role] = Client(HTTP_AUTHORIZATION=f'Bearer {token}', SERVER_NAME='localhost')
+
+        total = 0
+        for role, method, path in ENDPOINTS:
+            url = path.format(**seed['ids'])
+            for cache in caches.all():
+                cache.clear()
+            queries = []
+
+            def count_query(execute, sql, params, many, context):
+                queries.append(sql)
+                return execute(sql, params, many, context)
+
+            client = clients[role]
+            with connection.execute_wrapper(count_query):
+                if method == 'get':
+                    response = client.get(url)
+                else:
+                    response = getattr(client, method)(url, seed['bodies'].get(path, {}), content_type='application/json')
+            total += len(queries)
+            self.stdout.write(f"{method.upper():5} {url:40} {response.status_code}  {len(queries):3} queries")
+        self.stdout.write(f"{len(ENDPOINTS)} requests, {total} queries")
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from myapp.challenge_logic import PROVISION_BATCH_SIZE, get_active_challenges, provision_challenges
+from myapp.models import Challenge
+
+
+class Command(BaseCommand):
+    help = (
+        "Creates and evaluates missing UserChallenge rows for active challenges across all profiles in bounded batches. "
+        "Safe to re-run; schedule daily so challenges with a future start date are provisioned when they go live."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--challenge', type=int, action='append', dest='challenge_ids',
+                            help="Provision only this challenge id (repeatable). Defaults to every active challenge.")
+        parser.add_argument('--batch-size', type=int, default=PROVISION_BATCH_SIZE,
+                            help="Profiles per bulk_create batch.")
+
+    def handle(self, *args, **options):
+        if options['challenge_ids']:
+            challenges = Challenge.objects.filter(id__in=options['challenge_ids'])
+            missing = set(options['challenge_ids']) - set(challenges.values_list('id', flat=True))
+            if missing:
+                raise CommandError(f"Unknown challenge id(s): {', '.join(map(str, sorted(missing)))}")
+        else:
+            challenges = get_active_challenges()
+
+        challenge_ids = list(challenges.values_list('id', flat=True))
+        if not challenge_ids:
+            self.stdout.write("No challenges to provision.")
+            return
+
+        self.stdout.write(f"Provisioning {len(challenge_ids)} challenge(s)...")
+        processed = provision_challenges(
+            challenge_ids,
+            batch_size=options['batch_size'],
+            progress=lambda count: self.stdout.write(f"  {count} profiles processed"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Provisioned {len(challenge_ids)} challenge(s) for {processed} profile(s)."))
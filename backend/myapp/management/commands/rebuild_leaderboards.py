@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from myapp.leaderboard import REBUILD_BATCH_SIZE, rebuild_leaderboards
+
+
+class Command(BaseCommand):
+    help = "Rebuilds every materialized leaderboard row from the profile counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=REBUILD_BATCH_SIZE, help="Profiles per upsert batch.")
+
+    def handle(self, *args, **options):
+        total = rebuild_leaderboards(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt leaderboards for {total} profile(s)."))
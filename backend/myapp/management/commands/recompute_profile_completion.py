@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from myapp.challenge_logic import PROFILE_COMPLETION_CHANGED, process_challenge_event
+from myapp.leaderboard import rebuild_leaderboards
+from myapp.models import UserProfile
+from myapp.profile_completion import refresh_profile_completion
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the stored profile_completion of every profile with the current "
+        "calculation, awarding completion badges and firing the completion challenge event "
+        "for profiles whose value moved, then rebuilds the leaderboards if any did. Run once "
+        "after changing calculate_profile_completion; safe to re-run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Profiles loaded per query.")
+
+    def handle(self, *args, **options):
+        processed = changed = 0
+        last_id = 0
+        while True:
+            profiles = list(
+                UserProfile.objects.select_related('user').filter(id__gt=last_id).order_by('id')[:options['batch_size']]
+            )
+            if not profiles:
+                break
+            for profile in profiles:
+                if refresh_profile_completion(profile):
+                    process_challenge_event(profile, PROFILE_COMPLETION_CHANGED)
+                    changed += 1
+            processed += len(profiles)
+            last_id = profiles[-1].id
+            self.stdout.write(f"  {processed} profiles processed")
+
+        if changed:
+            rebuild_leaderboards()
+        self.stdout.write(self.style.SUCCESS(f"Recomputed completion for {processed} profile(s); {changed} changed."))
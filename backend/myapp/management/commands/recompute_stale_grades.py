@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from myapp.caching import job_list_cache
+from myapp.job_grade import GRADE_FIELDS, grade_jobs, stale_grades
+from myapp.models import JobPosting
+from myapp.stats import invalidate_dashboard_stats
+
+# Visible jobs first; within a status, newest first (each is a scan of the status index)
+STATUS_PRIORITY = ['approved', 'pending', 'denied']
+
+
+def next_stale_batch(size, attempted):
+    """Up to size stale jobs in priority order, skipping ids already tried in this pass."""
+    batch = []
+    for status in STATUS_PRIORITY:
+        jobs = (
+            stale_grades(JobPosting.objects.filter(status=status))
+            .exclude(id__in=attempted)
+            .only('id', 'description', 'location', *GRADE_FIELDS)
+            .order_by('-created_at')
+        )
+        batch.extend(jobs[:size - len(batch)])
+        if len(batch) == size:
+            break
+    return batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-grades the job postings whose grade provenance is stale: graded by another prompt "
+        "or model or from a since-edited description or location, with a part that fell back to its default, set by hand, or never graded by the "
+        "server. Approved jobs go first, then pending and denied, newest first, in small batches "
+        "through the shared LLM gateway, so a prompt change rolls out gradually. Run it from cron, "
+        "or leave it running with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=50, help="Jobs graded and saved together.")
+        parser.add_argument('--max-jobs', type=int, help="Stop after this many jobs (per pass with --loop).")
+        parser.add_argument('--workers', type=int, default=settings.LLM_MAX_CONCURRENCY)
+        parser.add_argument('--jobs-per-call', type=int, default=settings.JOB_GRADE_BATCH_SIZE,
+                            help="Descriptions scored per model call; 1 scores each on its own.")
+        parser.add_argument('--loop', action='store_true', help="Keep running, checking again every --interval.")
+        parser.add_argument('--interval', type=float, default=60, help="Seconds between passes with --loop.")
+
+    def handle(self, *args, **options):
+        with ThreadPoolExecutor(options['workers']) as pool:
+            while True:
+                self.run_pass(pool, options)
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+
+    def run_pass(self, pool, options):
+        # A job whose part fails stays stale; it is tried once per pass, not again at once
+        attempted = set()
+        started = time.perf_counter()
+        fresh = 0
+        while options['max_jobs'] is None or len(attempted) < options['max_jobs']:
+            size = options['batch_size']
+            if options['max_jobs'] is not None:
+                size = min(size, options['max_jobs'] - len(attempted))
+            batch = next_stale_batch(size, attempted)
+            if not batch:
+                break
+            attempted.update(job.id for job in batch)
+            graded = [job for job, _ in grade_jobs(batch, pool.map, batch_size=options['jobs_per_call'])]
+            JobPosting.objects.bulk_update(graded, GRADE_FIELDS)
+            # bulk_update sends no post_save, so drop what the job receivers would
+            job_list_cache.invalidate()
+            invalidate_dashboard_stats()
+            ids = [job.id for job in graded]
+            fresh += len(ids) - stale_grades(JobPosting.objects.filter(id__in=ids)).count()
+            self.stdout.write(
+                f"{len(attempted)} re-graded ({fresh} now current), "
+                f"{len(attempted) / (time.perf_counter() - started):.1f} jobs/s"
+            )
+        remaining = stale_grades(JobPosting.objects.all()).count()
+        self.stdout.write(f"Pass done: {len(attempted)} re-graded, {remaining} still stale.")
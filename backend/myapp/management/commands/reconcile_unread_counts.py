@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from myapp.models import Message, UserProfile
+
+BATCH_SIZE = 500
+
+
+class Command(BaseCommand):
+    help = "Recomputes UserProfile.unread_message_count from Message rows and repairs any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Report drifted profiles without fixing them.")
+
+    def handle(self, *args, **options):
+        actual_unread = Coalesce(
+            Subquery(
+                Message.objects.filter(recipient=OuterRef('pk'), is_read=False)
+                .order_by()
+                .values('recipient')
+                .annotate(count=Count('id'))
+                .values('count'),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+        drifted = (
+            UserProfile.objects.annotate(actual_unread=actual_unread)
+            .exclude(unread_message_count=F('actual_unread'))
+        )
+        drifted_ids = list(drifted.values_list('id', flat=True))
+
+        if options['dry_run']:
+            self.stdout.write(f"{len(drifted_ids)} profile(s) have a drifted unread counter.")
+            return
+
+        # One UPDATE per batch of drifted rows, keeping IN lists under SQLite's variable limit
+        repaired = 0
+        for start in range(0, len(drifted_ids), BATCH_SIZE):
+            batch = drifted_ids[start:start + BATCH_SIZE]
+            repaired += UserProfile.objects.filter(id__in=batch).update(unread_message_count=actual_unread)
+        self.stdout.write(self.style.SUCCESS(f"Repaired unread counters for {repaired} profile(s)."))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from myapp.prescreen import refresh_job_document_frequencies
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the resume pre-screen's IDF table over every job posting and stores it "
+        "in the prescreen cache namespace. Schedule it from cron (more often than "
+        "CACHE_TTL_PRESCREEN) with a shared cache (CACHE_BACKEND=file or redis), so "
+        "requests never build it themselves."
+    )
+
+    def handle(self, *args, **options):
+        count, frequencies = refresh_job_document_frequencies()
+        self.stdout.write(self.style.SUCCESS(f"Stored the IDF table: {count} posting(s), {len(frequencies)} term(s)."))
+        if settings.CACHE_BACKEND == 'locmem':
+            self.stdout.write("CACHE_BACKEND is locmem: the web processes do not see this table and build their own.")
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as day_time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from myapp.caching import job_list_cache
+from myapp.job_grade import GRADE_FIELDS, grade_jobs
+from myapp.models import JobPosting
+from myapp.stats import invalidate_dashboard_stats
+
+DEFAULT_CHECKPOINT = os.path.join(settings.BASE_DIR, 'regrade_jobs.checkpoint.json')
+
+
+def parse_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f"Invalid date '{value}', expected YYYY-MM-DD.")
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-grades job postings (model score plus travel score) through the shared LLM gateway, "
+        "so its rate limit and concurrency cap apply, scoring --jobs-per-call descriptions per "
+        "call. Jobs go in id order, in chunks; after each chunk the grades are saved and the "
+        "last id is checkpointed, so --resume continues an interrupted run with the same "
+        "filters. Jobs whose model call or travel lookup fails keep their current grade and "
+        "are listed at the end."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--status', action='append', choices=['pending', 'approved', 'denied'],
+                            help="Only jobs with this status (repeatable).")
+        parser.add_argument('--since', type=parse_date, help="Only jobs created on or after this date (YYYY-MM-DD).")
+        parser.add_argument('--until', type=parse_date, help="Only jobs created on or before this date (YYYY-MM-DD).")
+        parser.add_argument('--missing', action='store_true', help="Only jobs without a grade.")
+        parser.add_argument('--grade', type=int, action='append', dest='grades',
+                            help="Only jobs with exactly this grade, e.g. 75 for a fallback model score "
+                                 "with a fallback travel score (repeatable; combines with --missing).")
+        parser.add_argument('--limit', type=int, help="Stop after this many jobs.")
+        parser.add_argument('--workers', type=int, default=settings.LLM_MAX_CONCURRENCY,
+                            help="Jobs graded at once; the gateway's limits still apply.")
+        parser.add_argument('--jobs-per-call', type=int, default=settings.JOB_GRADE_BATCH_SIZE,
+                            help="Descriptions scored per model call; 1 scores each on its own.")
+        parser.add_argument('--chunk-size', type=int, default=100, help="Jobs per checkpoint.")
+        parser.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+        parser.add_argument('--resume', action='store_true', help="Continue after the checkpointed job.")
+        parser.add_argument('--dry-run', action='store_true', help="Report what would be re-graded; call nothing.")
+
+    def handle(self, *args, **options):
+        # Stored with the checkpoint; a resumed run must select the same jobs
+        filters = {
+            'status': options['status'],
+            'since': options['since'] and str(options['since']),
+            'until': options['until'] and str(options['until']),
+            'missing': options['missing'],
+            'grades': options['grades'],
+        }
+        after_id = 0
+        if options['resume']:
+            checkpoint = self.read_checkpoint(options['checkpoint'])
+            if checkpoint['filters'] != filters:
+                raise CommandError(f"The checkpoint was written with other filters: {checkpoint['filters']}")
+            after_id = checkpoint['last_id']
+            self.stdout.write(f"Resuming after job {after_id}.")
+
+        jobs = self.select(options).filter(id__gt=after_id).order_by('id')
+        total = jobs.count()
+        if options['limit'] is not None:
+            total = min(total, options['limit'])
+
+        if options['dry_run']:
+            rate = settings.LLM_REQUESTS_PER_SECOND
+            estimate = f", about {total / rate / 60:.1f} min at {rate:g} calls/s" if rate > 0 else ""
+            self.stdout.write(f"Would re-grade {total} job(s){estimate}.")
+            for job in jobs[:min(total, 20)]:
+                self.stdout.write(f"  {job.id}: {job.title} (grade {job.grade})")
+            return
+
+        self.run(jobs, total, filters, options)
+
+    def select(self, options):
+        jobs = JobPosting.objects.only('id', 'title', 'description', 'location', *GRADE_FIELDS)
+        if options['status']:
+            jobs = jobs.filter(status__in=options['status'])
+        if options['since']:
+            jobs = jobs.filter(created_at__gte=timezone.make_aware(datetime.combine(options['since'], day_time.min)))
+        if options['until']:
+            jobs = jobs.filter(created_at__lte=timezone.make_aware(datetime.combine(options['until'], day_time.max)))
+        grade_filter = Q()
+        if options['missing']:
+            grade_filter |= Q(grade__isnull=True)
+        if options['grades']:
+            grade_filter |= Q(grade__in=options['grades'])
+        return jobs.filter(grade_filter)
+
+    def run(self, jobs, total, filters, options):
+        done = changed = 0
+        failed = []
+        started = time.perf_counter()
+        last_id = 0
+        with ThreadPoolExecutor(options['workers']) as pool:
+            while done + len(failed) < total:
+                size = min(options['chunk_size'], total - done - len(failed))
+                chunk = list(jobs.filter(id__gt=last_id)[:size])
+                if not chunk:
+                    break
+                graded = []
+                chunk_changed = 0
+                previous = {job.id: job.grade for job in chunk}
+                # Strict: nothing falls back to a default, a failed part fails the job
+                for job, error in grade_jobs(chunk, pool.map, strict=True, batch_size=options['jobs_per_call']):
+                    if error is not None:
+                        failed.append((job.id, f"{type(error).__name__}: {error}"))
+                        continue
+                    graded.append(job)
+                    chunk_changed += job.grade != previous[job.id]
+                # Every graded job is saved, so its provenance is current even if the grade is not new
+                JobPosting.objects.bulk_update(graded, GRADE_FIELDS)
+                done += len(graded)
+                changed += chunk_changed
+                if chunk_changed:
+                    # bulk_update sends no post_save, so drop what the job receivers would
+                    job_list_cache.invalidate()
+                    invalidate_dashboard_stats()
+                last_id = chunk[-1].id
+                self.write_checkpoint(options['checkpoint'], filters, last_id)
+
+                elapsed = time.perf_counter() - started
+                processed = done + len(failed)
+                rate = processed / elapsed if elapsed else 0
+                eta = (total - processed) / rate if rate else 0
+                self.stdout.write(
+                    f"{processed}/{total} jobs, {changed} changed, {len(failed)} failed, "
+                    f"{rate:.1f} jobs/s, ETA {eta:.0f}s"
+                )
+
+        self.stdout.write(f"Re-graded {done} job(s), {changed} changed, in {time.perf_counter() - started:.1f}s.")
+        if failed:
+            self.stdout.write(f"{len(failed)} job(s) kept their grade:")
+            for job_id, error in failed:
+                self.stdout.write(f"  {job_id}: {error}")
+
+    def read_checkpoint(self, path):
+        try:
+            with open(path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise CommandError(f"No checkpoint at {path}.")
+
+    def write_checkpoint(self, path, filters, last_id):
+        # Written to a temporary file first, so an interrupted write leaves the previous one
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump({'filters': filters, 'last_id': last_id}, f)
+        os.replace(f"{path}.tmp", path)
@@ -0,0 +1,13 @@
+from contextlib import contextmanager
+from django.db import transaction
+
+
+@contextmanager
+def rolled_back():
+    """
+    Runs the block in a transaction that is always rolled back, for commands that seed
+    throwaway rows to measure or check against. Errors from the block still propagate.
+    """
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
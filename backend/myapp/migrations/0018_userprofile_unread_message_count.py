@@ -0,0 +1,33 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:18
+
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_unread_counts(apps, schema_editor):
+    UserProfile = apps.get_model('myapp', 'UserProfile')
+    Message = apps.get_model('myapp', 'Message')
+    counts = (
+        Message.objects.filter(is_read=False)
+        .values('recipient')
+        .annotate(count=Count('id'))
+        .order_by()
+    )
+    for row in counts:
+        UserProfile.objects.filter(pk=row['recipient']).update(unread_message_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0017_message_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='unread_message_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_unread_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.3 on 2026-10-19 12:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_leaderboards(apps, schema_editor):
+    UserProfile = apps.get_model('myapp', 'UserProfile')
+    LeaderboardEntry = apps.get_model('myapp', 'LeaderboardEntry')
+    profiles = UserProfile.objects.filter(is_job_provider=False, opt_in_leaderboard=True).select_related('user').annotate(
+        num_challenges_completed=Count('user_challenges', filter=Q(user_challenges__is_completed=True))
+    )
+    entries = []
+    for profile in profiles.iterator():
+        user = profile.user
+        display_name = profile.account_holder_name or f"{user.first_name} {user.last_name}".strip() or user.username
+        for board, score in (
+            ('applications', profile.num_applications or 0),
+            ('profile_completion', profile.profile_completion or 0),
+            ('challenge_completers', profile.num_challenges_completed),
+        ):
+            entries.append(LeaderboardEntry(
+                board=board, user_profile=profile, score=score, username=user.username,
+                display_name=display_name,
+                avatar=f"{settings.MEDIA_URL}{profile.profile_picture}" if profile.profile_picture else '',
+            ))
+    LeaderboardEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0018_userprofile_unread_message_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('applications', 'Applications'), ('profile_completion', 'Profile Completion'), ('challenge_completers', 'Challenges Completed')], max_length=32)),
+                ('score', models.FloatField(default=0)),
+                ('username', models.CharField(max_length=150)),
+                ('display_name', models.CharField(max_length=255)),
+                ('avatar', models.CharField(blank=True, max_length=255)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user_profile', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to='myapp.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['board', '-score', 'user_profile'], name='leaderboard_board_score_idx')],
+                'unique_together': {('board', 'user_profile')},
+            },
+        ),
+        migrations.RunPython(backfill_leaderboards, migrations.RunPython.noop),
+    ]
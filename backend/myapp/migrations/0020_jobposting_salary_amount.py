@@ -0,0 +1,34 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:05
+
+import re
+
+from django.db import migrations, models
+
+SALARY_NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def backfill_salary_amount(apps, schema_editor):
+    JobPosting = apps.get_model('myapp', 'JobPosting')
+    jobs = []
+    for job in JobPosting.objects.only('id', 'salary').iterator():
+        match = SALARY_NUMBER_RE.search(job.salary or '')
+        if match:
+            job.salary_amount = float(match.group().replace(',', ''))
+            jobs.append(job)
+    JobPosting.objects.bulk_update(jobs, ['salary_amount'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0019_leaderboardentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='salary_amount',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_salary_amount, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.3 on 2026-10-19 15:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0020_jobposting_salary_amount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=32, unique=True)),
+                ('last_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(choices=[('jobs_posted', 'Jobs Posted'), ('student_signups', 'Student Signups'), ('employer_signups', 'Employer Signups'), ('applications', 'Applications')], max_length=32)),
+                ('day', models.DateField()),
+                ('dimension', models.CharField(blank=True, default='', max_length=64)),
+                ('value', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'unique_together': {('metric', 'day', 'dimension')},
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.1.3 on 2026-10-19 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0021_dailystat_rollupwatermark'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='message',
+            name='message_recipient_read_idx',
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['status', '-created_at'], name='jobposting_status_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['-created_at'], name='jobposting_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'recipient', 'timestamp'], name='message_pair_ts_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(condition=models.Q(('is_read', False)), fields=['recipient', 'sender'], name='message_unread_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('is_job_provider', False)), fields=['-num_applications', 'id'], name='userprofile_student_apps_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('is_job_provider', False), ('opt_in_leaderboard', True)), fields=['-num_applications', 'id'], name='userprofile_ranked_apps_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('is_job_provider', False), ('opt_in_leaderboard', True)), fields=['-profile_completion', 'id'], name='userprofile_ranked_compl_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(condition=models.Q(('is_job_provider', True)), fields=['id'], name='userprofile_provider_idx'),
+        ),
+    ]
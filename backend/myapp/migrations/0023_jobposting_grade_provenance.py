@@ -0,0 +1,43 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0022_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='grade_description_points',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='grade_model',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='grade_prompt_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='grade_travel_minutes',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='grade_travel_points',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='graded_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
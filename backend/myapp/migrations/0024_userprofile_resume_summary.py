@@ -0,0 +1,23 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0023_jobposting_grade_provenance'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='resume_summary',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='resume_summary_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+    ]
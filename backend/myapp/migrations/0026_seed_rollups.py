@@ -0,0 +1,64 @@
+from collections import Counter
+
+from django.db import migrations
+from django.db.models import Max
+from django.utils import timezone
+
+
+def local_day(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+def seed_rollups(apps, schema_editor):
+    """
+    Counts every existing row into DailyStat and starts each source's watermark after
+    it, so reads only ever walk the rows since the last rollup run. Sources a run has
+    already started are left alone.
+    """
+    DailyStat = apps.get_model('myapp', 'DailyStat')
+    RollupWatermark = apps.get_model('myapp', 'RollupWatermark')
+    JobPosting = apps.get_model('myapp', 'JobPosting')
+    UserProfile = apps.get_model('myapp', 'UserProfile')
+    Application = UserProfile.applied_jobs.through
+
+    def job_keys(rows):
+        for created_at, job_type in rows.values_list('created_at', 'job_type').iterator(chunk_size=5000):
+            yield 'jobs_posted', local_day(created_at), job_type or ''
+
+    def profile_keys(rows):
+        for date_joined, is_job_provider in rows.values_list('user__date_joined', 'is_job_provider').iterator(chunk_size=5000):
+            yield ('employer_signups' if is_job_provider else 'student_signups'), local_day(date_joined), ''
+
+    def application_keys(rows):
+        # No timestamp: dated by their job's posting day, as for the rollups' backlog
+        for created_at in rows.values_list('jobposting__created_at', flat=True).iterator(chunk_size=5000):
+            yield 'applications', local_day(created_at), ''
+
+    now = timezone.now()
+    for source, model, keys in (
+        ('jobs', JobPosting, job_keys),
+        ('profiles', UserProfile, profile_keys),
+        ('applications', Application, application_keys),
+    ):
+        if RollupWatermark.objects.filter(source=source).exists():
+            continue
+        max_id = model.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+        counts = Counter(keys(model.objects.filter(id__lte=max_id).order_by()))
+        DailyStat.objects.bulk_create(
+            [DailyStat(metric=metric, day=day, dimension=dimension, value=n) for (metric, day, dimension), n in counts.items()],
+            batch_size=1000,
+        )
+        RollupWatermark.objects.create(
+            source=source, last_id=max_id, seen_id=max_id, seen_at=now, backlog_id=max_id,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0025_rollupwatermark_seen'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_rollups, migrations.RunPython.noop),
+    ]
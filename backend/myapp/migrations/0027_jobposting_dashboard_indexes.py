@@ -0,0 +1,21 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0026_seed_rollups'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['salary_amount'], name='jobposting_salary_amount_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobposting',
+            index=models.Index(fields=['grade'], name='jobposting_grade_idx'),
+        ),
+    ]
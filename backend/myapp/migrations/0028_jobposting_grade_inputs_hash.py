@@ -0,0 +1,50 @@
+# Generated by Django 5.1.3 on 2026-10-19 14:54
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def inputs_hash(description, location):
+    # myapp.models.grade_inputs_hash as of this migration
+    digest = hashlib.sha256()
+    for part in (description or '', location or ''):
+        digest.update(str(part).encode())
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def backfill_inputs_hash(apps, schema_editor):
+    """
+    Hashes every job's description and location. A grade made since the job was last
+    saved was made from that text, so it gets the same hash; older grades stay stale.
+    """
+    JobPosting = apps.get_model('myapp', 'JobPosting')
+    jobs = []
+    for job in JobPosting.objects.only('id', 'description', 'location', 'graded_at', 'updated_at').iterator():
+        job.inputs_hash = inputs_hash(job.description, job.location)
+        if job.graded_at is not None and job.graded_at >= job.updated_at:
+            job.grade_inputs_hash = job.inputs_hash
+        jobs.append(job)
+    JobPosting.objects.bulk_update(jobs, ['inputs_hash', 'grade_inputs_hash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0027_jobposting_dashboard_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobposting',
+            name='grade_inputs_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='jobposting',
+            name='inputs_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=64),
+        ),
+        migrations.RunPython(backfill_inputs_hash, migrations.RunPython.noop),
+    ]
@@ -1,7 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 import json
+import math
+import re
 from django.utils import timezone
+from .caching import hash_key
 
 class TodoItem(models.Model):
     title = models.CharField(max_length=200)
@@ -26,10 +29,34 @@ class UserProfile(models.Model):
     opt_in_leaderboard = models.BooleanField(default=True)
     badges = models.ManyToManyField('Badge', related_name='users', blank=True)
     challenges = models.ManyToManyField('Challenge', related_name='participants', blank=True)
+    # Denormalized count of unread received messages, kept in step with F() updates
+    # when messages are sent or read. Repair drift with `manage.py reconcile_unread_counts`.
+    unread_message_count = models.PositiveIntegerField(default=0)
+    # Compact JSON summary of the last resume graded for this profile, and the hash of the
+    # redacted resume text (and summary prompt) it was made from; see applicant_checker
+    resume_summary = models.TextField(blank=True, default='', editable=False)
+    resume_summary_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+
+    # Maintained only through targeted UPDATEs, so a regular save() must never write back
+    # a stale copy: atomic F() counters, the stored completion from myapp.profile_completion
+    # and the resume summary from myapp.applicant_checker
+    COUNTER_FIELDS = ('unread_message_count', 'profile_completion')
+    DERIVED_FIELDS = ('resume_summary', 'resume_summary_hash')
+    SAVE_EXCLUDED_FIELDS = COUNTER_FIELDS + DERIVED_FIELDS
 
     def __str__(self):
         return self.user.username
 
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None and not kwargs.get('force_insert'):
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SAVE_EXCLUDED_FIELDS
+            ]
+        # Atomic so the rollup correction for a role change commits with it (myapp.rollups)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def get_job_post_success_rate(self):
         total_jobs_posted = self.posted_jobs.count()
         if total_jobs_posted == 0:
@@ -38,13 +65,69 @@ class UserProfile(models.Model):
         approved_jobs = self.posted_jobs.filter(status='approved').count()
         return (approved_jobs / total_jobs_posted) * 100
     
+    # Profile fields that count towards profile completion. Changes to them (or to the
+    # user's name/email, skills, references or education) trigger a recompute.
+    COMPLETION_FIELDS = ('profile_picture', 'resume', 'gpa')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if all(name in field_names for name in cls.COMPLETION_FIELDS):
+            instance._completion_snapshot = instance.completion_field_values()
+        if 'is_job_provider' in field_names:
+            instance._rolled_up_is_job_provider = instance.is_job_provider
+        return instance
+
+    def completion_field_values(self):
+        return tuple(str(getattr(self, name) or '') for name in self.COMPLETION_FIELDS)
+
+    def completion_fields_changed(self):
+        snapshot = getattr(self, '_completion_snapshot', None)
+        return snapshot is None or snapshot != self.completion_field_values()
+
     def calculate_profile_completion(self):
-        # Example: count filled fields for progress
-        fields = [self.profile_picture, self.resume, self.gpa, self.account_holder_name]
-        filled = sum(1 for f in fields if f)
-        total = len(fields)
-        # Add more fields as needed
-        return (filled / total) * 100 if total > 0 else 0
+        """
+        The single profile completion engine. Costs three EXISTS queries, so callers
+        should go through myapp.profile_completion, which only recomputes when an
+        input changed and stores the result in profile_completion.
+        """
+        fields_to_check = [
+            # User model fields
+            self.user.first_name,
+            self.user.last_name,
+            self.user.email,
+            # UserProfile model fields
+            self.profile_picture,
+            self.resume,
+            self.gpa,
+            self.skills.exists(),
+            self.references.exists(),
+            self.education.exists(),
+        ]
+        completed_fields = sum(1 for field in fields_to_check if field)
+        return math.floor((completed_fields / len(fields_to_check)) * 100)
+
+    class Meta:
+        # Partial indexes sized to the rows each query reads: student lists sorted by
+        # applications, leaderboard rebuilds, and the job provider stats
+        indexes = [
+            models.Index(
+                fields=['-num_applications', 'id'], name='userprofile_student_apps_idx',
+                condition=models.Q(is_job_provider=False),
+            ),
+            models.Index(
+                fields=['-num_applications', 'id'], name='userprofile_ranked_apps_idx',
+                condition=models.Q(is_job_provider=False, opt_in_leaderboard=True),
+            ),
+            models.Index(
+                fields=['-profile_completion', 'id'], name='userprofile_ranked_compl_idx',
+                condition=models.Q(is_job_provider=False, opt_in_leaderboard=True),
+            ),
+            models.Index(
+                fields=['id'], name='userprofile_provider_idx',
+                condition=models.Q(is_job_provider=True),
+            ),
+        ]
 
 class Reference(models.Model):
     user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='references')
@@ -58,6 +141,20 @@ class Education(models.Model):
     graduation_date = models.DateField(blank=True, null=True)
     gpa = models.DecimalField(max_digits=4, decimal_places=2, blank=True, null=True)
 
+SALARY_NUMBER_RE = re.compile(r'\d[\d,]*(?:\.\d+)?')
+
+
+def parse_salary(salary):
+    """First number in a free-text salary ("$18/hr", "15-20", "18.50"), or None if there is none."""
+    match = SALARY_NUMBER_RE.search(salary or '')
+    return float(match.group().replace(',', '')) if match else None
+
+
+def grade_inputs_hash(description, location):
+    """Identifies the text a job grade is computed from."""
+    return hash_key(description or '', location or '')
+
+
 class JobPosting(models.Model):
     """
     JobPosting Model for managing job postings on the platform.
@@ -82,6 +179,21 @@ class JobPosting(models.Model):
     custom_questions = models.TextField(blank=True, null=True)
     featured = models.BooleanField(default=False) 
     grade = models.IntegerField(blank=True, null=True)
+    # Provenance of grade when the server computed it (see job_grade.apply_grade); a part
+    # that fell back to its default is left null. Rows whose provenance does not match the
+    # current prompt, model and text are re-graded by recompute_stale_grades
+    grade_prompt_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    grade_inputs_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
+    grade_model = models.CharField(max_length=100, blank=True, default='', editable=False)
+    grade_description_points = models.IntegerField(blank=True, null=True, editable=False)
+    grade_travel_minutes = models.FloatField(blank=True, null=True, editable=False)
+    grade_travel_points = models.IntegerField(blank=True, null=True, editable=False)
+    graded_at = models.DateTimeField(blank=True, null=True, editable=False)
+    # Numeric form of salary, parsed on save so stats can aggregate it in SQL
+    salary_amount = models.FloatField(blank=True, null=True, editable=False)
+    # grade_inputs_hash of the current description and location, set on save, so stale
+    # grades can be found in SQL
+    inputs_hash = models.CharField(max_length=64, blank=True, default='', editable=False)
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
   
@@ -116,10 +228,36 @@ class JobPosting(models.Model):
                 # If not JSON, treat as newline-separated
                 self.custom_questions = json.dumps([q.strip() for q in self.custom_questions.split('\n') if q.strip()])
 
-        super().save(*args, **kwargs)
+        self.salary_amount = parse_salary(self.salary)
+        self.inputs_hash = grade_inputs_hash(self.description, self.location)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'salary' in update_fields:
+            kwargs['update_fields'] = update_fields = {*update_fields, 'salary_amount'}
+        if update_fields is not None and {'description', 'location'} & set(update_fields):
+            kwargs['update_fields'] = {*update_fields, 'inputs_hash'}
+
+        # Atomic so the rollup correction for a job_type change commits with it (myapp.rollups)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'job_type' in field_names:
+            instance._rolled_up_job_type = instance.job_type
+        return instance
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Public job lists and the admin list filtered by status, newest first
+            models.Index(fields=['status', '-created_at'], name='jobposting_status_created_idx'),
+            # Unfiltered admin list and exports in the default ordering
+            models.Index(fields=['-created_at'], name='jobposting_created_idx'),
+            # Admin dashboard salary bins and average grade, read from the index alone
+            models.Index(fields=['salary_amount'], name='jobposting_salary_amount_idx'),
+            models.Index(fields=['grade'], name='jobposting_grade_idx'),
+        ]
 
 class Skill(models.Model):
     name = models.CharField(max_length=255, unique=True)
@@ -139,6 +277,15 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['-timestamp']
+        # Back the inbox/sent/thread cursor pagination and unread lookups
+        indexes = [
+            models.Index(fields=['recipient', 'timestamp'], name='message_recipient_ts_idx'),
+            models.Index(fields=['sender', 'timestamp'], name='message_sender_ts_idx'),
+            # Both directions of a conversation thread, in order
+            models.Index(fields=['sender', 'recipient', 'timestamp'], name='message_pair_ts_idx'),
+            # Only unread rows: marking a conversation read and reconciling counters
+            models.Index(fields=['recipient', 'sender'], name='message_unread_idx', condition=models.Q(is_read=False)),
+        ]
 
 class Badge(models.Model):
     name = models.CharField(max_length=100, unique=True)
@@ -164,6 +311,18 @@ class Challenge(models.Model):
     def __str__(self):
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if 'start_date' in field_names and 'end_date' in field_names:
+            instance._was_active = instance.is_active()
+        return instance
+
+    def is_active(self):
+        """Whether the challenge is live today; the same test as challenge_logic.get_active_challenges."""
+        today = timezone.now().date()
+        return self.start_date <= today <= self.end_date
+
 class UserChallenge(models.Model):
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='user_challenges')
     challenge = models.ForeignKey(Challenge, on_delete=models.CASCADE, related_name='user_challenges')
@@ -178,6 +337,77 @@ class UserChallenge(models.Model):
     def __str__(self):
         return f"{self.user.user.username}'s {self.challenge.name} - {'Completed' if self.is_completed else 'In Progress'}"
 
+class LeaderboardEntry(models.Model):
+    """
+    Precomputed leaderboard row, one per (board, profile). Kept current by
+    myapp.leaderboard when the underlying counters change so the leaderboard
+    endpoints read a handful of indexed rows instead of ranking every profile.
+    """
+    BOARD_CHOICES = [
+        ('applications', 'Applications'),
+        ('profile_completion', 'Profile Completion'),
+        ('challenge_completers', 'Challenges Completed'),
+    ]
+
+    board = models.CharField(max_length=32, choices=BOARD_CHOICES)
+    user_profile = models.ForeignKey(UserProfile, on_delete=models.CASCADE, related_name='leaderboard_entries')
+    score = models.FloatField(default=0)
+    username = models.CharField(max_length=150)
+    display_name = models.CharField(max_length=255)
+    avatar = models.CharField(max_length=255, blank=True)  # Media-relative profile picture URL
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('board', 'user_profile')
+        indexes = [
+            models.Index(fields=['board', '-score', 'user_profile'], name='leaderboard_board_score_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.board}: {self.username} ({self.score})"
+
+class DailyStat(models.Model):
+    """
+    One pre-aggregated count per (metric, day, dimension), filled incrementally by
+    `manage.py rollup_stats` so admin charts read a few hundred rows instead of
+    scanning jobs, profiles and applications. Deleted and re-typed jobs and deleted or
+    re-roled profiles are taken back out as they change.
+    """
+    METRIC_CHOICES = [
+        ('jobs_posted', 'Jobs Posted'),
+        ('student_signups', 'Student Signups'),
+        ('employer_signups', 'Employer Signups'),
+        ('applications', 'Applications'),
+    ]
+
+    metric = models.CharField(max_length=32, choices=METRIC_CHOICES)
+    day = models.DateField()
+    dimension = models.CharField(max_length=64, blank=True, default='')  # e.g. job_type for jobs_posted
+    value = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # Also serves range queries on (metric, day)
+        unique_together = ('metric', 'day', 'dimension')
+
+    def __str__(self):
+        return f"{self.metric} {self.day} {self.dimension}: {self.value}"
+
+class RollupWatermark(models.Model):
+    """
+    Highest source row id already counted into DailyStat, per rollup source, and the
+    highest id the latest run saw (counted once it has had time to settle; see
+    myapp.rollups). Rows up to backlog_id already existed when rollups started.
+    """
+    source = models.CharField(max_length=32, unique=True)
+    last_id = models.BigIntegerField(default=0)
+    seen_id = models.BigIntegerField(default=0)
+    seen_at = models.DateTimeField(null=True, blank=True)
+    backlog_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}: {self.last_id}"
+
 # Example badge types for gamification system:
 # - First Application
 # - 5 Applications
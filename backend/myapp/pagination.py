@@ -0,0 +1,105 @@
+import base64
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import ValidationError
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(message):
+    """Encodes a message's (timestamp, id) position as an opaque cursor string."""
+    raw = f"{message.timestamp.isoformat()}|{message.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Decodes a cursor back into a (timestamp, id) tuple. Raises ValidationError if it is malformed."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        timestamp_str, message_id = raw.rsplit('|', 1)
+        timestamp = parse_datetime(timestamp_str)
+        if timestamp is None:
+            raise ValueError
+        return timestamp, int(message_id)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        raise ValidationError({'cursor': 'Invalid cursor.'})
+
+
+def get_page_size(params):
+    try:
+        limit = int(params.get('limit', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        raise ValidationError({'limit': 'Limit must be an integer.'})
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+
+def paginate_messages(queryset, params, chronological=False):
+    """
+    Keyset pagination over Message rows ordered by (timestamp, id).
+
+    - No cursor: the newest page.
+    - ?before=<cursor>: messages older than the cursor (infinite scroll back).
+    - ?after=<cursor>: messages newer than the cursor (polling for new messages).
+
+    Returns (messages, page_info). Messages are newest-first unless `chronological`
+    is set, in which case they are returned oldest-first for rendering a thread.
+    page_info carries the cursors to request the next older/newer page.
+    """
+    before = params.get('before')
+    after = params.get('after')
+    if before and after:
+        raise ValidationError({'cursor': 'Use either before or after, not both.'})
+
+    limit = get_page_size(params)
+
+    if after:
+        timestamp, message_id = decode_cursor(after)
+        queryset = queryset.filter(
+            Q(timestamp__gt=timestamp) | Q(timestamp=timestamp, id__gt=message_id)
+        ).order_by('timestamp', 'id')
+    else:
+        if before:
+            timestamp, message_id = decode_cursor(before)
+            queryset = queryset.filter(
+                Q(timestamp__lt=timestamp) | Q(timestamp=timestamp, id__lt=message_id)
+            )
+        queryset = queryset.order_by('-timestamp', '-id')
+
+    # Fetch one extra row to know whether another page exists without a COUNT
+    messages = list(queryset[:limit + 1])
+    has_more = len(messages) > limit
+    messages = messages[:limit]
+
+    # Normalise to newest-first so the cursor bookkeeping below is the same for both directions
+    if after:
+        messages.reverse()
+
+    page_info = {
+        'has_more': has_more,
+        # Pass as ?before= to load older messages
+        'before': encode_cursor(messages[-1]) if messages else before,
+        # Pass as ?after= to poll for newer messages
+        'after': encode_cursor(messages[0]) if messages else after,
+    }
+
+    if chronological:
+        messages.reverse()
+    return messages, page_info
+
+
+def paginate_offset(queryset, params):
+    """
+    Limit/offset pagination for lists ordered by computed values, where a keyset
+    cursor does not fit. Returns (items, page_info) like paginate_messages.
+    """
+    limit = get_page_size(params)
+    try:
+        offset = max(0, int(params.get('offset', 0)))
+    except (TypeError, ValueError):
+        raise ValidationError({'offset': 'Offset must be an integer.'})
+
+    # One extra row tells whether another page exists without a COUNT
+    items = list(queryset[offset:offset + limit + 1])
+    has_more = len(items) > limit
+    return items[:limit], {'has_more': has_more, 'next_offset': offset + limit if has_more else None}
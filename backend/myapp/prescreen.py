@@ -0,0 +1,198 @@
+import json
+import math
+import re
+from collections import Counter
+from django.conf import settings
+from .caching import prescreen_cache
+from .models import JobPosting
+
+# Phrases that mean the same thing on a resume and in a job post; each group is folded
+# into its first entry before tokenizing, so "handled the register" covers "cash handling"
+SYNONYMS = [
+    ["cash handling", "cash register", "point of sale", "handled cash", "handle cash", "handling cash",
+     "cashier", "register", "pos", "till", "drawer"],
+    ["customer service", "customer support", "client service", "helped customers", "helping customers",
+     "served customers", "serving customers", "guest service", "customers", "customer", "guests"],
+    ["cpr", "aed", "basic life support", "bls"],
+    ["first aid", "first-aid", "emergency care"],
+    ["lifeguard", "lifeguarding", "life guard", "water safety", "water rescue"],
+    ["certification", "certified", "certificate", "licensed", "license"],
+    ["tutoring", "tutor", "tutored", "mentoring", "mentored", "teaching assistant"],
+    ["patience", "patient"],
+    ["algebra", "calculus", "geometry", "precalculus", "trigonometry", "math", "mathematics"],
+    ["children", "kids", "child", "campers", "babysitting", "babysitter", "nanny", "youth", "nursery"],
+    ["javascript", "js", "typescript", "node.js", "react"],
+    ["python", "django", "flask"],
+    ["html", "css", "web pages", "websites", "website", "web design", "web development"],
+    ["git", "github", "gitlab", "version control"],
+    ["social media", "instagram", "tiktok", "facebook", "twitter", "content creation"],
+    ["photography", "photographer", "photos", "photo", "camera", "yearbook photographer"],
+    ["photoshop", "lightroom", "adobe", "canva", "graphic design", "illustrator"],
+    ["microsoft excel", "excel", "spreadsheets", "spreadsheet", "google sheets"],
+    ["food safety", "food handler", "servsafe", "food handling"],
+    ["availability", "available", "schedule"],
+    ["weekend", "weekends", "saturday", "saturdays", "sunday", "sundays"],
+    ["evening", "evenings", "nights", "night"],
+]
+
+# Words that say nothing about fit: function words and the boilerplate of job posts
+STOPWORDS = set("""
+a an and any are as at be been by can do for from has have i if in into is it its me my
+no not of on or our so such that the their them they this to up us we will with you your
+ability able must required requirement requirements preferred plus strong good great
+experience experienced knowledge skill skills work working job position role candidate
+candidates looking seeking help helps part time full per week weeks day days hour hours
+new other well also some all more most one two three least etc including include
+""".split())
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9_+#]+")
+
+# Requirement terms count this many times more than description terms
+REQUIREMENT_WEIGHT = 3
+
+# Below this many weighted terms a posting says too little to judge locally
+MIN_JOB_TERMS = 3
+
+IDF_CACHE_KEY = 'prescreen_document_frequencies'
+
+
+def _synonym_patterns():
+    patterns = []
+    for group in SYNONYMS:
+        canonical = group[0].replace(' ', '_').replace('-', '_')
+        # Longest first, so "cash register" is folded before "register"
+        for phrase in sorted(group, key=len, reverse=True):
+            patterns.append((re.compile(rf"(?<![a-z0-9_]){re.escape(phrase)}(?![a-z0-9_])"), canonical))
+    return patterns
+
+
+SYNONYM_PATTERNS = _synonym_patterns()
+
+
+def stem(token):
+    """Folds plurals only; anything subtler goes in SYNONYMS."""
+    if len(token) > 4 and token.endswith('ies'):
+        return token[:-3] + 'y'
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        return token[:-1]
+    return token
+
+
+def tokenize(text):
+    """Content terms of text: lowercased, synonyms folded, stopwords dropped, plurals stemmed."""
+    text = text.lower()
+    for pattern, canonical in SYNONYM_PATTERNS:
+        text = pattern.sub(canonical, text)
+    return [stem(token) for token in TOKEN_PATTERN.findall(text) if token not in STOPWORDS and len(token) > 1]
+
+
+def parse_requirements(requirements):
+    """JobPosting.requirements (a JSON list, or comma-separated text) as a list of phrases."""
+    if not requirements:
+        return []
+    if isinstance(requirements, (list, tuple)):
+        return [str(r).strip() for r in requirements if str(r).strip()]
+    try:
+        parsed = json.loads(requirements)
+        if isinstance(parsed, list):
+            return [str(r).strip() for r in parsed if str(r).strip()]
+    except ValueError:
+        pass
+    return [r.strip() for r in requirements.split(',') if r.strip()]
+
+
+def document_frequencies(documents):
+    """(number of documents, Counter of how many contain each term) for an IDF table."""
+    frequencies = Counter()
+    for document in documents:
+        frequencies.update(set(tokenize(document)))
+    return len(documents), frequencies
+
+
+def compute_job_document_frequencies():
+    """The IDF table over every job posting's description and requirements."""
+    return document_frequencies([
+        f"{description} {' '.join(parse_requirements(requirements))}"
+        for description, requirements in JobPosting.objects.values_list('description', 'requirements').iterator()
+    ])
+
+
+def job_document_frequencies():
+    """
+    The cached IDF table. It barely moves as jobs come and go, so it is kept for the
+    prescreen namespace's TTL (a day) rather than following job writes, and rebuilt
+    off the request path by `manage.py refresh_prescreen_idf`; a request only builds
+    it when the cache is cold, once for all concurrent callers.
+    """
+    return prescreen_cache.get_or_set_once(IDF_CACHE_KEY, compute_job_document_frequencies)
+
+
+def refresh_job_document_frequencies():
+    """Rebuilds and stores the IDF table. Returns it."""
+    frequencies = compute_job_document_frequencies()
+    prescreen_cache.set(IDF_CACHE_KEY, frequencies)
+    return frequencies
+
+
+def idf(term, frequencies):
+    count, document_counts = frequencies
+    # Smoothed, so terms no posting uses yet still weigh the most rather than dividing by zero
+    return math.log((1 + count) / (1 + document_counts[term])) + 1
+
+
+def score_resume(resume_text, job_description, requirements=None, frequencies=None):
+    """
+    How well resume_text covers the job, locally: {'score', 'terms', 'matched',
+    'missing'}. The job's terms are weighted TF-IDF style (occurrences in the
+    description, plus REQUIREMENT_WEIGHT per requirement mentioning them, times their
+    IDF over all postings) and score is the weighted fraction present in the resume.
+    matched and missing list the requirement phrases with at least half of their
+    weight present, and the rest.
+    """
+    frequencies = frequencies or job_document_frequencies()
+    resume_terms = set(tokenize(resume_text))
+    phrases = parse_requirements(requirements)
+
+    term_counts = Counter(tokenize(job_description))
+    phrase_terms = []
+    for phrase in phrases:
+        terms = set(tokenize(phrase))
+        phrase_terms.append(terms)
+        for term in terms:
+            term_counts[term] += REQUIREMENT_WEIGHT
+    weights = {term: count * idf(term, frequencies) for term, count in term_counts.items()}
+
+    total = sum(weights.values())
+    score = sum(weight for term, weight in weights.items() if term in resume_terms) / total if total else 0
+    matched, missing = [], []
+    for phrase, terms in zip(phrases, phrase_terms):
+        phrase_weight = sum(weights[term] for term in terms)
+        present = sum(weights[term] for term in terms if term in resume_terms)
+        (matched if terms and present * 2 >= phrase_weight else missing).append(phrase)
+    return {'score': score, 'terms': len(weights), 'matched': matched, 'missing': missing}
+
+
+def prescreen_grade(resume_text, job_description, requirements=None, frequencies=None,
+                    match_score=None, mismatch_score=None):
+    """
+    A grade in the model's "<Grade>;<Explanation>" form when the resume is a clear
+    match (score at least match_score and every requirement met: 85) or a clear
+    mismatch (the job lists requirements, none is met and the score is at most
+    mismatch_score: 0); None when it needs the model. Without requirements a low
+    score is never enough to reject. Thresholds default to PRESCREEN_MATCH_SCORE and
+    PRESCREEN_MISMATCH_SCORE.
+    """
+    match_score = settings.PRESCREEN_MATCH_SCORE if match_score is None else match_score
+    mismatch_score = settings.PRESCREEN_MISMATCH_SCORE if mismatch_score is None else mismatch_score
+    if not resume_text.strip():
+        return None
+    result = score_resume(resume_text, job_description, requirements, frequencies)
+    if result['terms'] < MIN_JOB_TERMS:
+        return None
+    if result['score'] >= match_score and not result['missing']:
+        met = f" and meets every listed requirement ({', '.join(result['matched'])})" if result['matched'] else ""
+        return f"85;The resume covers most of the job's key terms{met}."
+    if result['score'] <= mismatch_score and result['missing'] and not result['matched']:
+        return (f"0;The resume shows almost none of the job's key terms, and none of the listed "
+                f"requirements ({', '.join(result['missing'])}).")
+    return None
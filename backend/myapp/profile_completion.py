@@ -0,0 +1,50 @@
+from django.core.cache import cache
+from django.utils.text import slugify
+from .models import Badge, UserProfile
+
+BADGE_CACHE_TTL = 60 * 60  # seconds
+
+# (minimum completion, badge name, description, icon), highest threshold first
+COMPLETION_BADGES = [
+    (100, "All-Star Profile", "Completed 100% of your profile!", "star"),
+    (50, "Profile 50% Complete", "Completed 50% of your profile!", "star"),
+]
+
+
+def badge_cache_key(name):
+    return f"badge_id:{slugify(name)}"
+
+
+def get_badge_id(name, description, icon):
+    """Id of the named badge, creating it on first use. Cached until the badge is deleted."""
+    key = badge_cache_key(name)
+    badge_id = cache.get(key)
+    if badge_id is None:
+        badge, _ = Badge.objects.get_or_create(name=name, defaults={'description': description, 'icon': icon})
+        badge_id = badge.id
+        cache.set(key, badge_id, BADGE_CACHE_TTL)
+    return badge_id
+
+
+def award_completion_badge(user_profile, completion):
+    for threshold, name, description, icon in COMPLETION_BADGES:
+        if completion >= threshold:
+            # add() skips ids the profile already holds
+            user_profile.badges.add(get_badge_id(name, description, icon))
+            return
+
+
+def refresh_profile_completion(user_profile):
+    """
+    Recomputes the profile's completion and stores it. Call only after an input of
+    the calculation changed. Returns True if the stored value moved, in which case
+    the matching badge has been awarded; the caller fires the challenge event.
+    """
+    new_completion = user_profile.calculate_profile_completion()
+    stored = UserProfile.objects.values_list('profile_completion', flat=True).get(pk=user_profile.pk)
+    user_profile.profile_completion = new_completion
+    if stored == new_completion:
+        return False
+    UserProfile.objects.filter(pk=user_profile.pk).update(profile_completion=new_completion)
+    award_completion_badge(user_profile, new_completion)
+    return True
@@ -0,0 +1,173 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+
+# Events a subscriber can miss before new ones are dropped (slow or stalled clients)
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class LocalSubscription:
+    def __init__(self, backend, channel):
+        self.backend = backend
+        self.channel = channel
+        self.loop = None
+        self.queue = None
+
+    async def __aenter__(self):
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self.backend._add(self)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.backend._remove(self)
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self, timeout=None):
+        """Waits for the next event. Returns None if the timeout elapses first."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class LocalBackend:
+    """
+    In-process fan-out. Publishers may call from any thread (sync views run in a
+    thread pool under ASGI); events are handed to each subscriber's event loop.
+    Only reaches clients connected to the same process, so it is the stand-in
+    for development, tests and single-node deployments.
+    """
+
+    def __init__(self, **options):
+        self._subscriptions = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def _add(self, subscription):
+        with self._lock:
+            self._subscriptions[subscription.channel].add(subscription)
+
+    def _remove(self, subscription):
+        with self._lock:
+            subscriptions = self._subscriptions.get(subscription.channel)
+            if subscriptions:
+                subscriptions.discard(subscription)
+                if not subscriptions:
+                    del self._subscriptions[subscription.channel]
+
+    def subscriber_count(self, channel):
+        with self._lock:
+            return len(self._subscriptions.get(channel, ()))
+
+    def publish(self, channel, event):
+        with self._lock:
+            subscriptions = list(self._subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The subscriber's loop has already closed
+                pass
+
+    def subscribe(self, channel):
+        return LocalSubscription(self, channel)
+
+
+class RedisSubscription:
+    def __init__(self, url, channel):
+        self.url = url
+        self.channel = channel
+        self.client = None
+        self.pubsub = None
+
+    async def __aenter__(self):
+        import redis.asyncio
+        self.client = redis.asyncio.from_url(self.url)
+        self.pubsub = self.client.pubsub()
+        await self.pubsub.subscribe(self.channel)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.pubsub.unsubscribe(self.channel)
+        await self.pubsub.aclose()
+        await self.client.aclose()
+
+    async def get(self, timeout=None):
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        if message is None:
+            return None
+        return json.loads(message['data'])
+
+
+class RedisBackend:
+    """Fans events out across processes and nodes through Redis pub/sub."""
+
+    def __init__(self, url=None, **options):
+        try:
+            import redis
+        except ImportError:
+            raise ImproperlyConfigured("REALTIME_BACKEND 'redis' requires the redis package (pip install redis).")
+        if not url:
+            raise ImproperlyConfigured("REALTIME_BACKEND 'redis' requires REALTIME_REDIS_URL to be set.")
+        self.url = url
+        self.client = redis.Redis.from_url(url)
+
+    def publish(self, channel, event):
+        self.client.publish(channel, json.dumps(event))
+
+    def subscribe(self, channel):
+        return RedisSubscription(self.url, channel)
+
+
+BACKENDS = {
+    'local': LocalBackend,
+    'redis': RedisBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = getattr(settings, 'REALTIME_BACKEND', 'local')
+                if name not in BACKENDS:
+                    raise ImproperlyConfigured(f"Unknown REALTIME_BACKEND '{name}'. Choose one of: {', '.join(BACKENDS)}")
+                _backend = BACKENDS[name](url=getattr(settings, 'REALTIME_REDIS_URL', None))
+    return _backend
+
+
+def set_backend(backend):
+    """Swaps the active backend, e.g. for a fresh LocalBackend in tests."""
+    global _backend
+    _backend = backend
+
+
+def user_channel(profile_id):
+    return f"user:{profile_id}"
+
+
+def publish_to_user(profile_id, event_type, data):
+    """
+    Pushes an event to every stream the user has open. Deferred until the current
+    transaction commits so clients never see data they cannot read back yet.
+    """
+    event = {'type': event_type, 'data': data}
+    transaction.on_commit(lambda: get_backend().publish(user_channel(profile_id), event))
+
+
+def format_sse(event):
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
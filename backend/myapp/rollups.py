@@ -0,0 +1,260 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from .models import DailyStat, JobPosting, RollupWatermark, UserProfile
+
+ROLLUP_BATCH_SIZE = 5000
+
+# How long a run waits before counting up to the highest id an earlier run saw. Ids are
+# handed out before commit, so a lower id can still appear after a higher one is visible;
+# this must exceed the longest transaction that inserts into a source table.
+ROLLUP_LAG = timedelta(minutes=5)
+
+Application = UserProfile.applied_jobs.through
+
+
+def local_day(value):
+    return timezone.localdate(value) if timezone.is_aware(value) else value.date()
+
+
+# --- Sources ---
+# Each source walks its rows by id between two watermarks and yields one (metric, day,
+# dimension) key per row. seen_on is the day the rows were first seen by a run and
+# backlog_id the highest id that predates the rollups; only undated sources use them.
+
+def job_key(created_at, job_type):
+    return 'jobs_posted', local_day(created_at), job_type or ''
+
+
+def profile_key(date_joined, is_job_provider):
+    return ('employer_signups' if is_job_provider else 'student_signups'), local_day(date_joined), ''
+
+
+def job_keys(after_id, up_to_id, seen_on, backlog_id):
+    rows = JobPosting.objects.filter(id__gt=after_id, id__lte=up_to_id).order_by().values_list('created_at', 'job_type')
+    for created_at, job_type in rows.iterator(chunk_size=ROLLUP_BATCH_SIZE):
+        yield job_key(created_at, job_type)
+
+
+def profile_keys(after_id, up_to_id, seen_on, backlog_id):
+    rows = (
+        UserProfile.objects.filter(id__gt=after_id, id__lte=up_to_id)
+        .order_by().values_list('user__date_joined', 'is_job_provider')
+    )
+    for date_joined, is_job_provider in rows.iterator(chunk_size=ROLLUP_BATCH_SIZE):
+        yield profile_key(date_joined, is_job_provider)
+
+
+def application_keys(after_id, up_to_id, seen_on, backlog_id):
+    # The applied_jobs relation has no timestamp, so an application counts towards the day
+    # a run first saw it. Applications made before the rollups started were never seen
+    # as they happened; they count towards their job's posting day, the earliest they can be
+    rows = Application.objects.filter(id__gt=after_id, id__lte=up_to_id)
+    backlog = rows.filter(id__lte=backlog_id).order_by().values_list('jobposting__created_at', flat=True)
+    for created_at in backlog.iterator(chunk_size=ROLLUP_BATCH_SIZE):
+        yield 'applications', local_day(created_at), ''
+    for _ in range(rows.filter(id__gt=backlog_id).count()):
+        yield 'applications', seen_on, ''
+
+
+ROLLUP_SOURCES = {
+    'jobs': (JobPosting, job_keys),
+    'profiles': (UserProfile, profile_keys),
+    'applications': (Application, application_keys),
+}
+
+# Metric -> the source that produces it
+METRIC_SOURCES = {
+    'jobs_posted': 'jobs',
+    'student_signups': 'profiles',
+    'employer_signups': 'profiles',
+    'applications': 'applications',
+}
+
+
+def save_counts(counts):
+    """
+    Adds a Counter of (metric, day, dimension) -> n onto the stored DailyStat rows.
+    n may be negative for corrections; a value never drops below zero.
+    """
+    counts = {key: n for key, n in counts.items() if n}
+    if not counts:
+        return
+    existing = {
+        (stat.metric, stat.day, stat.dimension): stat
+        for stat in DailyStat.objects.filter(
+            metric__in={metric for metric, _, _ in counts},
+            day__in={day for _, day, _ in counts},
+        )
+    }
+    to_update, to_create = [], []
+    for (metric, day, dimension), n in counts.items():
+        stat = existing.get((metric, day, dimension))
+        if stat is None:
+            if n > 0:
+                to_create.append(DailyStat(metric=metric, day=day, dimension=dimension, value=n))
+        else:
+            stat.value = max(stat.value + n, 0)
+            to_update.append(stat)
+    DailyStat.objects.bulk_update(to_update, ['value'], batch_size=1000)
+    DailyStat.objects.bulk_create(to_create, batch_size=1000)
+
+
+def rollup_source(source, batch_size=ROLLUP_BATCH_SIZE, lag=ROLLUP_LAG):
+    """
+    Counts one source's rows into DailyStat. A run only counts up to the highest id
+    that a run at least lag earlier saw (every row at or below it had its id by then,
+    so has committed), then records the highest id it sees now for a later run. One
+    batch of ids per transaction; the watermark row is locked, so concurrent runs
+    cannot double count. Returns the number of rows rolled up.
+    """
+    model, keys = ROLLUP_SOURCES[source]
+    now = timezone.now()
+    processed = 0
+    while True:
+        with transaction.atomic():
+            watermark, created = RollupWatermark.objects.select_for_update().get_or_create(source=source)
+            if watermark.seen_at is None or watermark.last_id >= watermark.seen_id:
+                # Everything seen is counted: note what is there now for a later run
+                watermark.seen_id = model.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+                watermark.seen_at = now
+                if created:
+                    watermark.backlog_id = watermark.seen_id
+                watermark.save()
+                break
+            if now - watermark.seen_at < lag:
+                break
+            up_to_id = min(watermark.last_id + batch_size, watermark.seen_id)
+            counts = Counter(keys(watermark.last_id, up_to_id, local_day(watermark.seen_at), watermark.backlog_id))
+            save_counts(counts)
+            watermark.last_id = up_to_id
+            watermark.save()
+        processed += sum(counts.values())
+    return processed
+
+
+def run_rollups(batch_size=ROLLUP_BATCH_SIZE, lag=ROLLUP_LAG):
+    """Rolls up every source. Returns {source: rows rolled up}."""
+    return {source: rollup_source(source, batch_size, lag) for source in ROLLUP_SOURCES}
+
+
+# --- Corrections ---
+# Runs count a row once, as it is then. Deleting a counted job or profile, or changing
+# the job_type or role it was counted under, takes it back out here. These run inside the
+# transaction that writes the row (see the receivers in views.py) with the watermark
+# locked, so a concurrent run either counted the old row already or will read the new one.
+# Removed applications stay counted: a seen application's day is not stored anywhere.
+
+def correct_rollup(source, row_id, counts):
+    """Applies counts (usually negative) if a run has already counted row_id."""
+    with transaction.atomic():
+        watermark = RollupWatermark.objects.select_for_update().filter(source=source).first()
+        if watermark is not None and row_id <= watermark.last_id:
+            save_counts(counts)
+
+
+def correct_job(job, deleted=False):
+    """
+    Takes a deleted job, or the job_type a re-typed job was counted under, back out.
+    Returns whether the job's counts moved.
+    """
+    old_type = getattr(job, '_rolled_up_job_type', job.job_type)
+    counts = Counter()
+    if deleted:
+        counts[job_key(job.created_at, old_type)] -= 1
+    elif old_type != job.job_type:
+        counts[job_key(job.created_at, old_type)] -= 1
+        counts[job_key(job.created_at, job.job_type)] += 1
+    if counts:
+        correct_rollup('jobs', job.id, counts)
+    job._rolled_up_job_type = job.job_type
+    return bool(counts)
+
+
+def correct_profile(profile, deleted=False):
+    """
+    Takes a deleted profile, or the role a re-roled profile was counted under, back out.
+    Returns whether the profile's counts moved.
+    """
+    old_role = getattr(profile, '_rolled_up_is_job_provider', profile.is_job_provider)
+    counts = Counter()
+    if deleted:
+        counts[profile_key(profile.user.date_joined, old_role)] -= 1
+    elif old_role != profile.is_job_provider:
+        counts[profile_key(profile.user.date_joined, old_role)] -= 1
+        counts[profile_key(profile.user.date_joined, profile.is_job_provider)] += 1
+    if counts:
+        correct_rollup('profiles', profile.id, counts)
+    profile._rolled_up_is_job_provider = profile.is_job_provider
+    return bool(counts)
+
+
+# --- Queries ---
+
+def pending_counts(sources):
+    """
+    Counts for rows not rolled up yet, so reads are current between rollup runs. That
+    is the rows since the last run plus at most a lag's worth before it.
+    """
+    watermarks = {watermark.source: watermark for watermark in RollupWatermark.objects.filter(source__in=sources)}
+    today = timezone.localdate()
+    counts = Counter()
+    for source in sources:
+        model, keys = ROLLUP_SOURCES[source]
+        watermark = watermarks.get(source)
+        if watermark is None:
+            # Seeded by migration 0026 and never deleted; without one nothing is counted
+            continue
+        after_id = watermark.last_id
+        max_id = model.objects.filter(id__gt=after_id).aggregate(max_id=Max('id'))['max_id']
+        if max_id is None:
+            continue
+        if watermark.seen_at and watermark.seen_id > after_id:
+            counts.update(keys(after_id, watermark.seen_id, local_day(watermark.seen_at), watermark.backlog_id))
+            after_id = watermark.seen_id
+        counts.update(keys(after_id, max_id, today, watermark.backlog_id))
+    return counts
+
+
+def daily_counts(metrics, start=None, end=None):
+    """
+    {metric: {(day, dimension): value}} for the given metrics over the inclusive
+    [start, end] day range (open-ended when omitted).
+    """
+    stats = DailyStat.objects.filter(metric__in=metrics)
+    if start:
+        stats = stats.filter(day__gte=start)
+    if end:
+        stats = stats.filter(day__lte=end)
+
+    result = {metric: Counter() for metric in metrics}
+    for metric, day, dimension, value in stats.values_list('metric', 'day', 'dimension', 'value'):
+        result[metric][(day, dimension)] += value
+    for (metric, day, dimension), n in pending_counts({METRIC_SOURCES[metric] for metric in metrics}).items():
+        if metric in result and (not start or day >= start) and (not end or day <= end):
+            result[metric][(day, dimension)] += n
+    return result
+
+
+def period_key(day, interval):
+    return day.replace(day=1) if interval == 'month' else day
+
+
+def series(counts, interval='day'):
+    """
+    Folds one metric's {(day, dimension): value} into a list of
+    {'period', 'value', 'dimensions'} ordered by period.
+    """
+    totals = Counter()
+    dimensions = defaultdict(Counter)
+    for (day, dimension), value in counts.items():
+        period = period_key(day, interval)
+        totals[period] += value
+        if dimension:
+            dimensions[period][dimension] += value
+    return [
+        {'period': period, 'value': totals[period], 'dimensions': dict(dimensions[period])}
+        for period in sorted(totals)
+    ]
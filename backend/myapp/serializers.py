@@ -2,7 +2,7 @@ from rest_framework import serializers
 from django.contrib.auth.models import User # Keep for UserProfile.user relation if UserProfile is AUTH_USER_MODEL
 # Or preferably: from django.contrib.auth import get_user_model
 # User = get_user_model() # This would be UserProfile if set as AUTH_USER_MODEL
-from .models import JobPosting, UserProfile, Reference, Education, TodoItem, Skill, Message, Badge, Challenge, UserChallenge # Ensure UserProfile is imported
+from .models import JobPosting, UserProfile, Reference, Education, TodoItem, Skill, Message, Badge, Challenge, UserChallenge, LeaderboardEntry # Ensure UserProfile is imported
 from datetime import datetime, timezone
 import json
 
@@ -87,6 +87,21 @@ class UserChallengeSerializer(serializers.ModelSerializer):
         model = UserChallenge
         fields = ['id', 'challenge', 'is_completed', 'completed_at', 'progress']
 
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    """Slim leaderboard row; everything comes from the materialized entry, no related lookups."""
+    id = serializers.IntegerField(source='user_profile_id', read_only=True)
+    profile_picture_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LeaderboardEntry
+        fields = ['id', 'username', 'display_name', 'profile_picture_url', 'score']
+
+    def get_profile_picture_url(self, obj):
+        request = self.context.get('request')
+        if obj.avatar and request:
+            return request.build_absolute_uri(obj.avatar)
+        return None
+
 class UserProfileSerializer(serializers.ModelSerializer):
     skills = serializers.SlugRelatedField(
         many=True,
@@ -161,7 +176,8 @@ class JobPostingSerializer(serializers.ModelSerializer):
                    'custom_questions', 'posted_by', 'status',
                    'created_at', 'updated_at','grade', 'applicant_count']
         
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        # The grade is computed on the server (see create), never taken from the client
+        read_only_fields = ['id', 'created_at', 'updated_at', 'grade']
 
     def get_applicant_count(self, obj):
         """Return the number of applicants for this job"""
@@ -201,6 +217,8 @@ class JobPostingSerializer(serializers.ModelSerializer):
             # Handle cases where user is not available in context
             pass 
 
+        # Saved ungraded, off the request path: with no provenance the job is stale, so
+        # recompute_stale_grades grades it (the /grade_job_live/ score is only a preview)
         return super().create(validated_data)
 
 class JobSearchSerializer(serializers.Serializer):
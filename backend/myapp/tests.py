@@ -1,3 +1,178 @@
-from django.test import TestCase
+import csv
+import io
+import json
+
+from django.contrib.auth.models import User
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import Client, SimpleTestCase, TestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from myapp.management.commands.measure_request_queries import ENDPOINTS, Command as MeasureRequestQueries
+from myapp.models import JobPosting, UserProfile
+
+
+def jwt_client(user):
+    token = RefreshToken.for_user(user).access_token
+    return Client(HTTP_AUTHORIZATION=f'Bearer {token}', SERVER_NAME='localhost')
+
+
+def clear_caches():
+    for cache in caches.all():
+        cache.clear()
+
+
+# Queries a cold request (caches cleared) may make, keyed by the measure_request_queries path
+QUERY_BUDGETS = {
+    '/api/profile/': 8,
+    '/api/profile/references/': 2,
+    '/api/profile/references/add/': 7,
+    '/api/profile/education/': 2,
+    '/api/my-applications/': 1,
+    '/api/jobs/': 5,
+    '/api/jobs/{job}/': 3,
+    '/api/favorite-job/': 6,
+    '/api/favorited-jobs/': 3,
+    '/api/check-is-staff/': 1,
+    '/api/conversations/': 10,
+    '/api/conversations/{other}/': 4,
+    '/api/inbox/': 2,
+    '/api/sent-messages/': 2,
+    '/api/send-message/': 9,
+    '/api/messages/{message}/read/': 7,
+    '/api/messages/unread-count/': 1,
+    '/api/gamification/profile/': 8,
+    '/api/gamification/badges/': 2,
+    '/api/gamification/challenges/': 2,
+    '/api/gamification/leaderboard/me/': 2,
+    '/api/applicants/': 2,
+    '/api/admin/jobs/': 3,
+}
+
+
+class RequestQueryBudgetTests(TestCase):
+    """The hot endpoints' query counts, on the measure_request_queries seed data."""
+
+    def setUp(self):
+        self.seed = MeasureRequestQueries().seed()
+        self.clients = {role: jwt_client(profile.user) for role, profile in self.seed['profiles'].items()}
+
+    def test_every_endpoint_is_budgeted(self):
+        self.assertEqual(sorted(QUERY_BUDGETS), sorted(path for _, _, path in ENDPOINTS))
+
+    def test_query_budgets(self):
+        # In ENDPOINTS order: the POSTs create the rows later requests read
+        for role, method, path in ENDPOINTS:
+            url = path.format(**self.seed['ids'])
+            with self.subTest(url=url):
+                clear_caches()
+                client = self.clients[role]
+                with self.assertNumQueries(QUERY_BUDGETS[path]):
+                    if method == 'get':
+                        response = client.get(url)
+                    else:
+                        response = getattr(client, method)(url, self.seed['bodies'].get(path, {}), content_type='application/json')
+                self.assertLess(response.status_code, 300)
+
+
+class StudentAccountStatsTests(TestCase):
+
+    def setUp(self):
+        admin = User.objects.create_superuser('stats_admin', 'stats@example.com', None)
+        UserProfile.objects.create(user=admin)
+        provider = UserProfile.objects.create(user=User.objects.create_user('stats_provider'), is_job_provider=True)
+        self.jobs = [
+            JobPosting.objects.create(
+                posted_by=provider, title=f'Job {n}', company_name='Stats', company_email='stats@example.com',
+                location='Normal, IL', salary='15', job_type='Part-time', description='-', requirements='[]',
+                status='approved',
+            )
+            for n in range(3)
+        ]
+        self.client = jwt_client(admin)
+
+    def add_students(self, count, start=0):
+        students = []
+        for n in range(start, start + count):
+            # num_applications is the counter the apply view keeps
+            student = UserProfile.objects.create(
+                user=User.objects.create_user(f'stats_student_{n}'), is_job_provider=False, num_applications=n % 4,
+            )
+            student.favorited_jobs.add(*self.jobs[:(n + 1) % 4])
+            students.append(student)
+        return students
+
+    def get_stats(self, **params):
+        clear_caches()
+        response = self.client.get('/api/admin/student-account-stats/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_query_count_does_not_grow_with_students(self):
+        self.add_students(2)
+        clear_caches()
+        # The admin's user, then one query for the page
+        with self.assertNumQueries(2):
+            self.client.get('/api/admin/student-account-stats/')
+        self.add_students(8, start=2)
+        clear_caches()
+        with self.assertNumQueries(2):
+            self.client.get('/api/admin/student-account-stats/')
+
+    def test_counts_and_ordering(self):
+        self.add_students(4)
+        rows = self.get_stats(ordering='-applications')['student_stats']
+        self.assertEqual([row['username'] for row in rows][0], 'stats_student_3')
+        self.assertEqual([row['num_applications'] for row in rows], [3, 2, 1, 0])
+        rows = self.get_stats(ordering='favorites')['student_stats']
+        self.assertEqual([row['num_favorited_jobs'] for row in rows], [0, 1, 2, 3])
+
+    def test_pagination(self):
+        self.add_students(5)
+        first = self.get_stats(ordering='joined', limit=2)
+        second = self.get_stats(ordering='joined', limit=2, offset=2)
+        self.assertEqual(len(first['student_stats']), 2)
+        self.assertEqual(len(second['student_stats']), 2)
+        usernames = [row['username'] for row in first['student_stats'] + second['student_stats']]
+        self.assertEqual(usernames, [f'stats_student_{n}' for n in range(4)])
+
+    def test_csv_export_matches_stats(self):
+        self.add_students(4)
+        clear_caches()
+        response = self.client.get('/api/admin/student-account-stats/export/', {'output': 'csv', 'ordering': 'joined'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), 5)
+        self.assertIn('stats_student_0', rows[1])
+
+    def test_ndjson_export_matches_stats(self):
+        self.add_students(4)
+        clear_caches()
+        response = self.client.get('/api/admin/student-account-stats/export/', {'output': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual({json.loads(line)['username'] for line in lines}, {f'stats_student_{n}' for n in range(4)})
+
+
+class CheckCommandTests(TestCase):
+    """The check_* commands raise CommandError when what they check regresses."""
+
+    def test_export_memory(self):
+        call_command('check_export_memory', rows=20_000, ceiling_mb=64, stdout=io.StringIO())
+
+    def test_import_time(self):
+        call_command('check_import_time', runs=1, stdout=io.StringIO())
+
+
+class GradingCheckTests(SimpleTestCase):
+    """Grading checks against the local fake completion server; they run threads, so outside a test transaction."""
+
+    def test_concurrent_grades_coalesce(self):
+        call_command('check_grade_coalescing', requests=10, latency=0.2, stdout=io.StringIO())
+
+    def test_grade_streams_before_the_explanation(self):
+        call_command('check_grade_streaming', stdout=io.StringIO())
 
-# Create your tests here.
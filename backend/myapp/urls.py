@@ -9,7 +9,8 @@ from .views import (
     api_user_profile, api_update_profile, api_register,
     api_login, api_logout, api_user_applications,
     get_applicants, api_inbox, api_sent_messages, api_send_message, 
-    api_mark_message_read, api_unread_message_count, api_get_conversations
+    api_mark_message_read, api_unread_message_count, api_get_conversations,
+    api_conversation_thread
 )
 
 urlpatterns = [
@@ -45,6 +46,7 @@ urlpatterns = [
     path('profile/education/add/', views.api_add_education, name='api_add_education'),
     path('profile/education/<int:education_id>/delete/', views.api_delete_education, name='api_delete_education'),
     path('grade_applicant_live/', grade_applicant_live, name='grade_applicant_live'),
+    path('grade_applicant_live/stream/', views.grade_applicant_live_stream, name='grade_applicant_live_stream'),
     path('grade_job_live/', views.grade_job_live, name='api_grade_job_live'),
     path('favorite-job/', views.api_favorite_job, name='api_favorite_job'),
     path('favorited-jobs/', views.api_favorited_jobs_list, name='api_favorited_jobs_list'),
@@ -53,11 +55,14 @@ urlpatterns = [
     path('applicants/', get_applicants, name='get_applicants'),
       # Message API endpoints
     path('conversations/', api_get_conversations, name='api_get_conversations'),
+    path('conversations/<int:other_user_id>/', api_conversation_thread, name='api_conversation_thread'),
     path('inbox/', api_inbox, name='api_inbox'),
     path('sent-messages/', api_sent_messages, name='api_sent_messages'),
     path('send-message/', api_send_message, name='api_send_message'),
     path('messages/<int:message_id>/read/', api_mark_message_read, name='api_mark_message_read'),
+    path('conversations/<int:other_user_id>/read/', views.api_mark_conversation_read, name='api_mark_conversation_read'),
     path('messages/unread-count/', api_unread_message_count, name='api_unread_message_count'),
+    path('events/', views.api_event_stream, name='api_event_stream'),
     
     # Frontend routes - redirect to appropriate existing views or API endpoints
     path('jobs/', views.search, name='frontend_jobs'),  # Redirect to search view instead of api_job_list
@@ -74,11 +79,19 @@ urlpatterns = [
     path('admin/jobs/<int:job_id>/', views.api_admin_delete_job, name='api_admin_delete_job'),
     path('admin/users/<int:user_id>/', views.api_admin_get_user, name='api_admin_get_user'),
     path('admin/dashboard-stats/', views.api_admin_dashboard_stats, name='api_admin_dashboard_stats'),
+    path('admin/stats/daily/', views.api_admin_daily_stats, name='api_admin_daily_stats'),
+    path('admin/cache-stats/', views.api_admin_cache_stats, name='api_admin_cache_stats'),
+    path('admin/llm-stats/', views.api_admin_llm_stats, name='api_admin_llm_stats'),
     path('admin/student-account-stats/', views.api_admin_student_account_stats, name='api_admin_student_account_stats'),
+    path('admin/student-account-stats/export/', views.api_admin_student_account_stats_export, name='api_admin_student_account_stats_export'),
+    path('admin/exports/jobs/', views.api_admin_export_jobs, name='api_admin_export_jobs'),
+    path('admin/exports/jobs/<int:job_id>/applicants/', views.api_admin_export_job_applicants, name='api_admin_export_job_applicants'),
+    path('admin/exports/messages/', views.api_admin_export_messages, name='api_admin_export_messages'),
     path('gamification/profile/', views.api_gamification_profile, name='api_gamification_profile'),
     path('gamification/badges/', views.api_gamification_badges, name='api_gamification_badges'),
     path('gamification/challenges/', views.api_gamification_challenges, name='api_gamification_challenges'),
     path('gamification/leaderboard/', views.api_gamification_leaderboard, name='api_gamification_leaderboard'),
+    path('gamification/leaderboard/me/', views.api_gamification_my_rank, name='api_gamification_my_rank'),
     path('admin/challenges/overhaul/', views.admin_overhaul_challenges, name='admin-overhaul-challenges'),
 ]
 
@@ -1,7 +1,7 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny, IsAdminUser
-from .serializers import UserProfileSerializer, JobPostingSerializer, UserSerializer, ReferenceSerializer, EducationSerializer, MessageSerializer, ConversationSerializer, BadgeSerializer, ChallengeSerializer, UserChallengeSerializer
+from .serializers import UserProfileSerializer, JobPostingSerializer, UserSerializer, ReferenceSerializer, EducationSerializer, MessageSerializer, ConversationSerializer, BadgeSerializer, ChallengeSerializer, UserChallengeSerializer, LeaderboardEntrySerializer
 from .models import UserProfile, Reference, Education, JobPosting, Message, Badge, Challenge, UserChallenge, Skill
 from django.db import models
 import mimetypes
@@ -12,7 +12,6 @@ from django.contrib.admin.views.decorators import staff_member_required
 from .forms import SignUpForm, SignInForm, UserProfileForm, ReferenceFormSet, EducationFormSet, JobPostingForm
 from django.db.models import Q
 from django.core.mail import EmailMultiAlternatives
-from dotenv import find_dotenv, load_dotenv
 import os
 from .geo_apify import *
 from .applicant_checker import *
@@ -21,50 +20,45 @@ from django.http import JsonResponse
 from django.conf import settings
 from django.core.serializers import serialize
 import json
-from openai import OpenAI, RateLimitError, APIError, APIConnectionError
 from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework import permissions
-from cerebras.cloud.sdk import Cerebras
 from rest_framework import status
-from django.db.models.functions import TruncMonth
-from django.db.models import Count, Avg, F
-from datetime import datetime
-from django.db.models.signals import post_save, m2m_changed
+from django.db.models.functions import Greatest
+from django.db import close_old_connections, transaction
+from django.db.models import Count, Avg, F, prefetch_related_objects
+from datetime import date, datetime
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.dispatch import receiver
 from django.utils import timezone
-from .challenge_logic import update_all_challenges_for_user
-from rest_framework.exceptions import ValidationError
-
-Api = os.getenv("API_KEY")
-
-# Initialize Cerebras client
-client = Cerebras(
-  api_key=Api,
+from .challenge_logic import (
+    process_challenge_event,
+    get_active_challenges, provision_challenges, provision_challenges_for_profiles,
+    APPLIED, FAVORITED, MESSAGE_RECEIVED, MESSAGES_READ, REFERENCE_ADDED, PROFILE_SAVED,
+    PROFILE_COMPLETION_CHANGED,
 )
-
-# Initialize with a default response in case of API failure
-try:
-    stream = client.chat.completions.create(
-        messages=[
-            {
-                "role": "system",
-                "content": "You are an administrator for a job finder website designed to help high school students find jobs. Your task is to grade how obtainable a job is for high school students on a scale from 1 to 75. The final score should reflect only how attainable the job is, without considering location (location accounts for an additional 25 points, calculated separately).Scoring Criteria:Education Requirements (High Weight): Jobs requiring little to no formal education should score higher. Positions demanding higher education (e.g., college degrees) should be heavily penalized.Typical High School Job (Moderate Weight): If the job is common for high school students (e.g., retail, food service, internships), it should score higher.Experience Requirements (Moderate Weight): Jobs requiring little to no prior work experience should score higher. If minimal experience is needed but attainable through extracurriculars, minor deductions apply.Age Restrictions (Moderate Weight): Jobs with strict age requirements (e.g., must be 18+) should have points deducted.Job Complexity (Low Weight): Highly technical or specialized jobs should lose some points, but only slightly, as long as they remain attainable.Work Hours (Moderate Weight): Jobs requiring work during typical school hours should lose points unless flexible scheduling is mentioned.IMPORTANT:ONLY OUTPUT A SINGLE INTEGER BETWEEN 1 AND 75.DO NOT include any text, explanations, or additional details—ONLY the integer.IF YOU DO INCLUDE ANY DETAILS  OTHER THAN THE INTEGER YOU WILL BE TERMINATED NO MATTER THE CIRCUMSTANCES SO ONLY OUT PUT AN INTTEGER. You must fully reason through all relevant factors to determine the most accurate score, but DO NOT include your reasoning in the output.Focus solely on obtainability, not pay, soft skills, demand, or location.Assume the student has minimal job experience but strong extracurricular involvement and basic job-ready skills.The job description may be unstructured, so interpret details flexibly.Example Outputs:A typical part-time retail job with no education or experience requirements: 75A full-time office job requiring a college degree: 15A seasonal lifeguard job requiring certification and age 18+: 50- Here is the Job to be grader: "
-            }
-        ],
-        model="llama-4-scout-17b-16e-instruct",
-        stream=True,
-        max_completion_tokens=16382,
-        temperature=0.7,
-        top_p=0.95
-    )
-except (RateLimitError, APIError, APIConnectionError) as e:
-    print(f"Warning: Initial API call failed: {str(e)}")
-    completion = None
-except Exception as e:
-    print(f"Warning: Unexpected error in initial API call: {str(e)}")
-    completion = None
+from .profile_completion import badge_cache_key, refresh_profile_completion
+from .stats import (
+    get_dashboard_stats, invalidate_dashboard_stats,
+    PROVIDER_ORDERINGS, provider_success_rates, get_cached_provider_stats, student_account_stats,
+)
+from .exports import export_response, job_export, applicant_export, student_stats_export, message_export
+from .rollups import METRIC_SOURCES, correct_job, correct_profile, daily_counts, series
+from .pagination import paginate_messages, paginate_offset, get_page_size
+from .leaderboard import BOARDS, get_leaderboard, get_ranks, refresh_leaderboard_entries
+from .caching import cache_metrics, hash_key, job_list_cache
+from .llm import llm_metrics
+from .realtime import get_backend, publish_to_user, user_channel, format_sse
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from contextlib import aclosing
+from .authentication import ProfileJWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework.exceptions import ValidationError
 
 def index(request):
     return render(request, 'index.html')
@@ -72,7 +66,7 @@ def index(request):
 @login_required
 def account(request):
     try:
-        profile = UserProfile.objects.get(user=request.user)
+        profile = request.user.userprofile
     except UserProfile.DoesNotExist:
         profile = UserProfile(user=request.user)
         profile.save()
@@ -175,87 +169,95 @@ def search(request):
         'current_search': query or '',
     })
 
+def search_job_postings(request):
+    """Approved job postings filtered by the request's query params, serialized."""
+    # Start with approved job postings
+    queryset = JobPosting.objects.filter(status='approved')
+    print(f"Initial approved queryset count: {queryset.count()}")
+
+    # Get query parameters
+    search_term = request.query_params.get('search', None)
+    job_types = request.query_params.getlist('job_type[]')
+    companies = request.query_params.getlist('company[]')
+    min_salary = request.query_params.get('min_salary', None)
+    max_salary = request.query_params.get('max_salary', None)
+    show_favorited_only = request.query_params.get('showFavoritedOnly', 'false').lower() == 'true'
+
+    print(f"Received query params: search={search_term}, job_types={job_types}, companies={companies}, min_salary={min_salary}, max_salary={max_salary}, show_favorited_only={show_favorited_only}")
+
+    # Build up a combined filter using Q objects
+    combined_filters = Q()
+
+    # Apply search filter
+    if search_term:
+        search_q = (
+            Q(title__icontains=search_term) |
+            Q(company_name__icontains=search_term) |
+            Q(location__icontains=search_term) |
+            Q(salary__icontains=search_term) |
+            Q(description__icontains=search_term) |
+            Q(requirements__icontains=search_term)
+        )
+        combined_filters &= search_q
+        print(f"After applying search Q object: {queryset.filter(combined_filters).count()}")
+
+    # Apply job type filter
+    job_type_q = Q()
+    if job_types:
+        for job_type in job_types:
+            job_type_q |= Q(job_type__icontains=job_type)
+        combined_filters &= job_type_q
+        print(f"After applying job type Q object ({job_types}): {queryset.filter(combined_filters).count()}")
+
+    # Apply company filter
+    company_q = Q()
+    if companies:
+        for company in companies:
+            company_q |= Q(company_name__icontains=company)
+        combined_filters &= company_q
+        print(f"After applying company Q object ({companies}): {queryset.filter(combined_filters).count()}")
+
+    # Apply salary range filter
+    if min_salary is not None or max_salary is not None:
+        try:
+            if min_salary is not None:
+                min_salary = float(min_salary)
+                combined_filters &= Q(salary__gte=min_salary)
+            if max_salary is not None:
+                max_salary = float(max_salary)
+                combined_filters &= Q(salary__lte=max_salary)
+            print(f"After applying salary range filter: {queryset.filter(combined_filters).count()}")
+        except (ValueError, TypeError) as e:
+            print(f"Error parsing salary range: {e}")
+
+    # Apply all combined filters
+    queryset = queryset.filter(combined_filters)
+
+    # Apply favorited jobs filter if requested and user is authenticated
+    if show_favorited_only and request.user.is_authenticated:
+        user_profile = request.user.userprofile
+        queryset = queryset.filter(id__in=user_profile.favorited_jobs.all().values_list('id', flat=True))
+        print(f"After applying favorited jobs filter: {queryset.count()}")
+
+    print(f"Final queryset count after all filters: {queryset.count()}")
+
+    # Default ordering
+    queryset = queryset.order_by('-created_at')
+
+    serializer = JobPostingSerializer(queryset, many=True, context={'request': request})
+    return serializer.data
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated]) # Require authentication for both GET and POST
 def api_job_list(request):
     """API endpoint for job search and creation"""
     if request.method == 'GET':
-        # Start with approved job postings
-        queryset = JobPosting.objects.filter(status='approved')
-        print(f"Initial approved queryset count: {queryset.count()}")
-
-        # Get query parameters
-        search_term = request.query_params.get('search', None)
-        job_types = request.query_params.getlist('job_type[]')
-        companies = request.query_params.getlist('company[]')
-        min_salary = request.query_params.get('min_salary', None)
-        max_salary = request.query_params.get('max_salary', None)
-        show_favorited_only = request.query_params.get('showFavoritedOnly', 'false').lower() == 'true'
-
-        print(f"Received query params: search={search_term}, job_types={job_types}, companies={companies}, min_salary={min_salary}, max_salary={max_salary}, show_favorited_only={show_favorited_only}")
-
-        # Build up a combined filter using Q objects
-        combined_filters = Q()
-
-        # Apply search filter
-        if search_term:
-            search_q = (
-                Q(title__icontains=search_term) |
-                Q(company_name__icontains=search_term) |
-                Q(location__icontains=search_term) |
-                Q(salary__icontains=search_term) |
-                Q(description__icontains=search_term) |
-                Q(requirements__icontains=search_term)
-            )
-            combined_filters &= search_q
-            print(f"After applying search Q object: {queryset.filter(combined_filters).count()}")
-
-        # Apply job type filter
-        job_type_q = Q()
-        if job_types:
-            for job_type in job_types:
-                job_type_q |= Q(job_type__icontains=job_type)
-            combined_filters &= job_type_q
-            print(f"After applying job type Q object ({job_types}): {queryset.filter(combined_filters).count()}")
-
-        # Apply company filter
-        company_q = Q()
-        if companies:
-            for company in companies:
-                company_q |= Q(company_name__icontains=company)
-            combined_filters &= company_q
-            print(f"After applying company Q object ({companies}): {queryset.filter(combined_filters).count()}")
-
-        # Apply salary range filter
-        if min_salary is not None or max_salary is not None:
-            try:
-                if min_salary is not None:
-                    min_salary = float(min_salary)
-                    combined_filters &= Q(salary__gte=min_salary)
-                if max_salary is not None:
-                    max_salary = float(max_salary)
-                    combined_filters &= Q(salary__lte=max_salary)
-                print(f"After applying salary range filter: {queryset.filter(combined_filters).count()}")
-            except (ValueError, TypeError) as e:
-                print(f"Error parsing salary range: {e}")
-
-        # Apply all combined filters
-        queryset = queryset.filter(combined_filters)
-
-        # Apply favorited jobs filter if requested and user is authenticated
-        if show_favorited_only and request.user.is_authenticated:
-            user_profile = request.user.userprofile
-            queryset = queryset.filter(id__in=user_profile.favorited_jobs.all().values_list('id', flat=True))
-            print(f"After applying favorited jobs filter: {queryset.count()}")
-
-        print(f"Final queryset count after all filters: {queryset.count()}")
-
-        # Default ordering
-        queryset = queryset.order_by('-created_at')
-
-        serializer = JobPostingSerializer(queryset, many=True, context={'request': request})
-        
-        return Response(serializer.data)
+        if request.query_params.get('showFavoritedOnly', 'false').lower() == 'true':
+            # Depends on the user's favorites, so not shared through the cache
+            return Response(search_job_postings(request))
+        # Everyone gets the same results for the same filters
+        key = hash_key(sorted(request.query_params.lists()))
+        return Response(job_list_cache.get_or_set(key, lambda: search_job_postings(request)))
 
     elif request.method == 'POST':
         serializer = JobPostingSerializer(data=request.data, context={'request': request})
@@ -363,7 +365,7 @@ def apply(request, job_id):
     user_education = []
     
     if request.user.is_authenticated:
-        user_profile = UserProfile.objects.get(user=request.user)
+        user_profile = request.user.userprofile
         user_references = user_profile.references.all()
         user_education = user_profile.education.all()
     
@@ -380,7 +382,7 @@ def apply(request, job_id):
         text_content, html_content = create_email_content(
             job_posting, name, email, resume,
             custom_questions, custom_answers,
-            user_references, user_education
+            user_references, user_education, user_profile
         )
         
         # Prepare email object
@@ -414,7 +416,7 @@ def apply(request, job_id):
         'user_education': user_education
     })
 
-def create_email_content(job_posting, name, email, resume, custom_questions, custom_answers, references, education):
+def create_email_content(job_posting, name, email, resume, custom_questions, custom_answers, references, education, profile=None):
     # Create text content
     text_content = f"""
 A new application has been submitted for {job_posting.title}.
@@ -486,7 +488,7 @@ Email: {email}
 
     if resume:
         html_content += "<h4>Applicant Grade:</h4>"
-        grade, reason = clean_grade(check_applicant(resume, job_posting.description))
+        grade, reason = clean_grade(check_applicant(resume, job_posting.description, profile, job_posting.requirements))
     
         html_content += f"<p>{grade}</p>"
         html_content += "<h6>Reason For Grade:</h6>"
@@ -520,13 +522,92 @@ def grade_applicant_live(request):
             return Response({'error': 'Resume URL and job description are required'}, status=400)
 
         # Get the grade
-        grade = clean_grade(check_applicant(resume_url, description))
+        profile = getattr(request.user, 'userprofile', None) if request.user.is_authenticated else None
+        grade = clean_grade(check_applicant(resume_url, description, profile, request.data.get('requirements')))
+        if profile is not None:
+            publish_to_user(profile.id, 'grade', {'resume_url': resume_url, 'grade': grade})
         
         return Response({'grade': grade})
     except Exception as e:
         print(f"Error in grade_applicant_live: {str(e)}")
         return Response({'error': 'Failed to grade applicant'}, status=500)
 
+@csrf_exempt
+async def grade_applicant_live_stream(request):
+    """
+    grade_applicant_live as Server-Sent Events, so the page need not wait for the
+    whole reply: a 'grade' event as soon as the numeric grade has arrived, then
+    'explanation' events as the reason streams in, and 'done' with both. Serve the
+    app through appbackend.asgi: the wait runs on the event loop rather than holding
+    a worker thread, and a client that disconnects cancels the model's stream.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'error': 'Method not allowed'}, status=405)
+    try:
+        data = json.loads(request.body or b'{}')
+    except ValueError:
+        return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    resume_url = data.get('resume_url')
+    description = data.get('description')
+    if not resume_url or not description:
+        return JsonResponse({'error': 'Resume URL and job description are required'}, status=400)
+
+    # Anonymous callers may grade too; a signed-in student's summary is stored on the profile
+    profile = await sync_to_async(authenticate_stream_request)(request)
+
+    async def event_stream():
+        try:
+            # Reading the resume and summarizing it are blocking; keep them off the event loop
+            grade, cache_key, content = await sync_to_async(prepare_live_grading, thread_sensitive=False)(
+                resume_url, description, profile, data.get('requirements')
+            )
+        except Exception as e:
+            print(f"Error in grade_applicant_live_stream: {str(e)}")
+            yield format_sse({'type': 'error', 'data': {'error': 'Failed to grade applicant'}})
+            return
+
+        reply = ""
+        grade_sent = False
+        try:
+            async with aclosing(astream_grade(cache_key, content) if grade is None else single_piece(grade)) as pieces:
+                async for piece in pieces:
+                    reply += piece
+                    if not grade_sent:
+                        if ';' not in reply:
+                            continue
+                        grade_sent = True
+                        yield format_sse({'type': 'grade', 'data': {'grade': reply.split(';', 1)[0].strip()}})
+                        piece = reply.split(';', 1)[1]
+                    if piece:
+                        yield format_sse({'type': 'explanation', 'data': {'text': piece}})
+        except Exception as e:
+            print(f"Error in grade_applicant_live_stream: {str(e)}")
+            yield format_sse({'type': 'error', 'data': {'error': 'Grading stopped before it finished'}})
+            return
+
+        grade = clean_grade(reply)
+        if not grade_sent:
+            # A reply without the separator is all grade
+            yield format_sse({'type': 'grade', 'data': {'grade': reply.strip()}})
+        if profile is not None:
+            await sync_to_async(publish_to_user)(profile.id, 'grade', {'resume_url': resume_url, 'grade': grade})
+        yield format_sse({'type': 'done', 'data': {'grade': grade}})
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def prepare_live_grading(*args):
+    # Runs on a pool thread outside the request's, so close the connection it opened
+    try:
+        return prepare_grading(*args)
+    finally:
+        close_old_connections()
+
+async def single_piece(text):
+    yield text
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def api_job_detail(request, pk):
@@ -545,7 +626,7 @@ def api_apply_job(request, job_id):
     try:
         job_posting = get_object_or_404(JobPosting, id=job_id, status='approved')
         user = request.user
-        user_profile = UserProfile.objects.get(user=user)
+        user_profile = user.userprofile
 
         # Get application data from request
         form_data = request.data
@@ -585,7 +666,8 @@ def api_apply_job(request, job_id):
             job_posting.custom_questions.split('\n') if job_posting.custom_questions else [],
             custom_answers,
             references,
-            education
+            education,
+            user_profile
         )
     
         # Prepare email
@@ -608,11 +690,12 @@ def api_apply_job(request, job_id):
         grade = None
         if resume:
             try:
-                grade_response = check_applicant(resume, job_posting.description)
+                grade_response = check_applicant(resume, job_posting.description, user_profile, job_posting.requirements)
                 grade = clean_grade(grade_response)
             except Exception as e:
                 print(f"Error calculating grade: {str(e)}")
                 grade = "75;Error calculating grade"
+            publish_to_user(user_profile.id, 'grade', {'job_id': job_posting.id, 'grade': grade})
 
         return Response({
             'message': 'Application submitted successfully',
@@ -633,7 +716,7 @@ def api_apply_job(request, job_id):
 def api_user_profile(request):
     """API endpoint for fetching user profile"""
     try:
-        profile = UserProfile.objects.get(user=request.user)
+        profile = request.user.userprofile
         serializer = UserProfileSerializer(profile, context={'request': request})
         return Response(serializer.data)
     except UserProfile.DoesNotExist:
@@ -644,7 +727,7 @@ def api_user_profile(request):
 def api_update_profile(request):
     """API endpoint for updating user profile"""
     try:
-        profile = UserProfile.objects.get(user=request.user)
+        profile = request.user.userprofile
     except UserProfile.DoesNotExist:
         return Response({'error': 'User profile not found'}, status=404)
     
@@ -735,7 +818,7 @@ def api_user_applications(request):
 def api_references(request):
     """API endpoint for fetching user references"""
     try:
-        user_profile = UserProfile.objects.get(user=request.user)
+        user_profile = request.user.userprofile
         references = Reference.objects.filter(user_profile=user_profile)
         serializer = ReferenceSerializer(references, many=True)
         return Response(serializer.data)
@@ -747,7 +830,7 @@ def api_references(request):
 def api_add_reference(request):
     """API endpoint for adding refrences"""
     try:
-        user_profile = UserProfile.objects.get(user=request.user)
+        user_profile = request.user.userprofile
     except UserProfile.DoesNotExist:
         return Response({'error': 'User profile not found'}, status=404)
     
@@ -772,7 +855,7 @@ def api_delete_reference(request, reference_id):
 def api_education(request):
     """API endpoint for fetching user education"""
     try:
-        user_profile = UserProfile.objects.get(user=request.user)
+        user_profile = request.user.userprofile
         education = Education.objects.filter(user_profile=user_profile)
         serializer = EducationSerializer(education, many=True)
         return Response(serializer.data)
@@ -784,7 +867,7 @@ def api_education(request):
 def api_add_education(request):
     """API endpoint for adding education"""
     try:
-        user_profile = UserProfile.objects.get(user=request.user)
+        user_profile = request.user.userprofile
     except UserProfile.DoesNotExist:
         return Response({'error': 'User profile not found'}, status=404)
     
@@ -916,134 +999,188 @@ def api_check_is_staff(request):
 def api_admin_dashboard_stats(request):
     """API endpoint for admin dashboard statistics"""
     try:
-        # Total job submissions
-        total_job_submissions = JobPosting.objects.count()
-
-        # Approved job postings
-        approved_postings = JobPosting.objects.filter(status='approved').count()
-
-        # Job submissions per month
-        monthly_submissions = JobPosting.objects.annotate(month=TruncMonth('created_at')) \
-                                               .values('month') \
-                                               .annotate(count=Count('id')) \
-                                               .order_by('month')
-        # Format for frontend consumption (e.g., 'YYYY-MM')
-        formatted_monthly_submissions = [{'month': item['month'].strftime('%B-%Y'), 'count': item['count']} for item in monthly_submissions]
-
-        # Breakdown by job categories
-        job_category_breakdown = JobPosting.objects.values('job_type') \
-                                               .annotate(count=Count('id')) \
-                                               .order_by('-count')
-        # Filter out entries where job_type is empty or None
-        job_category_breakdown = [item for item in job_category_breakdown if item['job_type']]
-
-        # Total student accounts (proxy for student applications if no dedicated Application model)
-        total_student_accounts = UserProfile.objects.filter(is_job_provider=False).count()
-        # Note: For accurate application counts, a dedicated JobApplication model linking UserProfile to JobPosting
-        # would be required, along with updates to the api_apply_job endpoint to create these entries.
-
-        # Total employer accounts
-        total_employer_accounts = UserProfile.objects.filter(is_job_provider=True).count()
-
-        # Salary Distribution
-        salary_bins = {
-            '$0-16/hr': 0,
-            '$16-35/hr': 0,
-            '$35+/hr': 0,
-        }
-
-        # Helper to parse salary (removes non-numeric, converts to int) and convert to hourly
-        def parse_salary_to_hourly(salary_str):
-            if not salary_str: return None
-            # Clean string to get only digits, assuming it's a numerical salary
-            cleaned_salary = int(salary_str)
-            return cleaned_salary
-
-        for job in JobPosting.objects.all():
-            hourly_rate = parse_salary_to_hourly(job.salary)
-            if hourly_rate is not None:
-                if (hourly_rate < 17): 
-                    salary_bins['$0-16/hr'] += 1
-                elif (hourly_rate < 35): 
-                    salary_bins['$16-35/hr'] += 1
-                else: 
-                    salary_bins['$35+/hr'] += 1
-        
-        formatted_salary_distribution = [{'name': k, 'count': v} for k, v in salary_bins.items()]
-
-        # Average Job Grade
-        total_grades = []
-        for job in JobPosting.objects.all():
-            try:
-                grade = float(job.grade) # Assuming job.grade is a string that can be converted to float
-                total_grades.append(grade)
-            except (ValueError, TypeError):
-                # Handle cases where grade is not a valid number (e.g., 'N/A')
-                continue
-        
-        average_job_grade = sum(total_grades) / len(total_grades) if total_grades else None
-
-        return Response({
-            'total_job_submissions': total_job_submissions,
-            'approved_postings': approved_postings,
-            'monthly_submissions': formatted_monthly_submissions,
-            'job_category_breakdown': job_category_breakdown,
-            'total_student_accounts': total_student_accounts,
-            'total_employer_accounts': total_employer_accounts,
-            'salary_distribution': formatted_salary_distribution,
-            'average_job_grade': average_job_grade,
-        })
+        return Response(get_dashboard_stats())
     except Exception as e:
         return Response({'error': f'Failed to retrieve dashboard stats: {str(e)}'}, status=500)
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
-def api_admin_student_account_stats(request):
-    """API endpoint to view statistics per student account, including number of applications and favorited jobs."""
+def api_admin_daily_stats(request):
+    """
+    Time series from the daily rollup tables.
+    Query params: metrics (comma-separated, default all), start and end (YYYY-MM-DD, inclusive),
+    interval ('day' or 'month').
+    """
+    metrics = [m for m in request.GET.get('metrics', '').split(',') if m] or list(METRIC_SOURCES)
+    unknown = [m for m in metrics if m not in METRIC_SOURCES]
+    if unknown:
+        return Response({'error': f"Unknown metric(s): {', '.join(unknown)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    interval = request.GET.get('interval', 'day')
+    if interval not in ('day', 'month'):
+        return Response({'error': "interval must be 'day' or 'month'."}, status=status.HTTP_400_BAD_REQUEST)
+
     try:
-        student_profiles = UserProfile.objects.filter(is_job_provider=False)
-        student_stats_list = []
+        start = date.fromisoformat(request.GET['start']) if request.GET.get('start') else None
+        end = date.fromisoformat(request.GET['end']) if request.GET.get('end') else None
+    except ValueError:
+        return Response({'error': 'start and end must be dates in YYYY-MM-DD format.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        for profile in student_profiles:
-            # Number of favorited jobs is directly available
-            num_favorited_jobs = profile.favorited_jobs.count()
+    counts = daily_counts(metrics, start, end)
+    return Response({
+        'interval': interval,
+        'start': start,
+        'end': end,
+        'series': {metric: series(counts[metric], interval) for metric in metrics},
+    })
 
-            # Get profile picture URL
-            profile_picture_url = None
-            if profile.profile_picture:
-                profile_picture_url = request.build_absolute_uri(profile.profile_picture.url)
-            else:
-                # Fallback to UI Avatars if no profile picture is set
-                profile_picture_url = f"https://ui-avatars.com/api/?name={profile.user.first_name}+{profile.user.last_name}&background=FF6B00&color=fff"
-
-            num_applications = profile.num_applications
-
-            student_stats_list.append({
-                'id': profile.id,
-                'username': profile.user.username,
-                'profile_picture': profile_picture_url, 
-                'num_applications': num_applications,
-                'num_favorited_jobs': num_favorited_jobs,
-                'is_active': profile.user.is_active, # Example: could indicate active students
-            })
-        return Response({'student_stats': student_stats_list})
-    except Exception as e:
-        return Response({'error': f'Failed to retrieve student stats: {str(e)}'}, status=500)
+# The dashboard snapshot is cached; drop it whenever the jobs or accounts it counts change
+# (job creation, approval, denial, edits and deletions)
+@receiver(post_save, sender=JobPosting)
+@receiver(post_delete, sender=JobPosting)
+def job_changed_dashboard_stats(sender, **kwargs):
+    invalidate_dashboard_stats()
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def account_changed_dashboard_stats(sender, created=True, **kwargs):
+    # Account counts move when a profile is created or deleted (role changes: below)
+    if created:
+        invalidate_dashboard_stats()
+
+# Rolled-up counts for deleted jobs and profiles, and for changed job types and roles, are
+# corrected in the transaction that writes the row (their saves and deletes are atomic)
+@receiver(post_save, sender=JobPosting)
+def job_saved_rollups(sender, instance, **kwargs):
+    correct_job(instance)
+
+@receiver(post_delete, sender=JobPosting)
+def job_deleted_rollups(sender, instance, **kwargs):
+    correct_job(instance, deleted=True)
+
+@receiver(post_save, sender=UserProfile)
+def profile_saved_rollups(sender, instance, **kwargs):
+    if correct_profile(instance):
+        invalidate_dashboard_stats()
+
+@receiver(pre_delete, sender=UserProfile)
+def profile_deleted_rollups(sender, instance, **kwargs):
+    # Before the delete, while the user it was dated by is still there
+    correct_profile(instance, deleted=True)
+
+# Cached job searches are dropped whenever a job changes, and whenever an application
+# is added or removed, since they carry each job's applicant_count
+@receiver(post_save, sender=JobPosting)
+@receiver(post_delete, sender=JobPosting)
+def job_changed_job_lists(sender, **kwargs):
+    transaction.on_commit(job_list_cache.invalidate)
+
+@receiver(m2m_changed, sender=UserProfile.applied_jobs.through)
+def applications_changed_job_lists(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        transaction.on_commit(job_list_cache.invalidate)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_admin_cache_stats(request):
+    """Hit rates per cache namespace, counted by the process that serves this request."""
+    return Response({
+        'backend': settings.CACHE_BACKEND,
+        'namespaces': cache_metrics(),
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_admin_llm_stats(request):
+    """LLM gateway counters (calls, 429s, retries, timeouts, latency) for the serving process."""
+    return Response(llm_metrics())
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_admin_student_account_stats(request):
+    """
+    API endpoint to view statistics per student account, including number of applications and favorited jobs.
+    Filtering and ordering params are described in stats.student_account_stats; paginated with limit/offset.
+    """
+    students, page_info = paginate_offset(student_account_stats(request.GET), request.GET)
+    student_stats_list = []
+    for profile in students:
+        # Get profile picture URL
+        profile_picture_url = None
+        if profile.profile_picture:
+            profile_picture_url = request.build_absolute_uri(profile.profile_picture.url)
+        else:
+            # Fallback to UI Avatars if no profile picture is set
+            profile_picture_url = f"https://ui-avatars.com/api/?name={profile.user.first_name}+{profile.user.last_name}&background=FF6B00&color=fff"
+
+        student_stats_list.append({
+            'id': profile.id,
+            'username': profile.user.username,
+            'profile_picture': profile_picture_url,
+            'num_applications': profile.num_applications,
+            'num_favorited_jobs': profile.num_favorited_jobs,
+            'date_joined': profile.user.date_joined,
+            'is_active': profile.user.is_active, # Example: could indicate active students
+        })
+    return Response({'student_stats': student_stats_list, **page_info})
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_admin_student_account_stats_export(request):
+    """Streams the student account stats (?output=csv|ndjson). Takes the same filter and ordering params, unpaginated."""
+    header, rows = student_stats_export(student_account_stats(request.GET))
+    return export_response(request, 'student_account_stats', header, rows)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_admin_export_jobs(request):
+    """Streams every job posting (?output=csv|ndjson), optionally filtered by ?status=."""
+    header, rows = job_export(request.GET.get('status'))
+    return export_response(request, 'jobs', header, rows)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_admin_export_job_applicants(request, job_id):
+    """Streams the applicants of one job posting (?output=csv|ndjson)."""
+    job = get_object_or_404(JobPosting, id=job_id)
+    header, rows = applicant_export(job)
+    return export_response(request, f'job_{job.id}_applicants', header, rows)
 
 @api_view(['GET'])
+@permission_classes([IsAdminUser])
+def api_admin_export_messages(request):
+    """Streams message metadata, never bodies (?output=csv|ndjson), optionally for one profile (?user=<profile id>)."""
+    profile_id = request.GET.get('user')
+    if profile_id and not profile_id.isdigit():
+        return Response({'error': 'user must be a profile id.'}, status=status.HTTP_400_BAD_REQUEST)
+    header, rows = message_export(profile_id)
+    return export_response(request, 'messages', header, rows)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
 def job_post_success_rate(request):
-    job_provider_profiles = UserProfile.objects.filter(is_job_provider=True)
-    provider_stat_list = []
+    """
+    Job providers with the share of their postings that were approved, in one query.
+    Query params: ordering (see stats.PROVIDER_ORDERINGS, default -success_rate), limit, offset.
+    """
+    ordering = request.GET.get('ordering', '-success_rate')
+    if ordering not in PROVIDER_ORDERINGS:
+        return Response({'error': f"ordering must be one of: {', '.join(PROVIDER_ORDERINGS)}"}, status=status.HTTP_400_BAD_REQUEST)
 
-    for provider in job_provider_profiles:
-        provider_stat_list.append({
+    def compute():
+        providers, page_info = paginate_offset(provider_success_rates(ordering), request.GET)
+        provider_stat_list = [{
             'id': provider.id,
             'username': provider.user.username,
             'profile_picture': request.build_absolute_uri(provider.profile_picture.url) if provider.profile_picture else f"https://ui-avatars.com/api/?name={provider.user.first_name}+{provider.user.last_name}&background=FF6B00&color=fff",
-            'job_post_success_rate': provider.get_job_post_success_rate(),
-        })
+            'job_post_success_rate': provider.success_rate,
+            'total_jobs': provider.total_jobs,
+            'approved_jobs': provider.approved_jobs,
+        } for provider in providers]
+        return {'job_provider_stats': provider_stat_list, **page_info}
 
-    return Response({'job_provider_stats':provider_stat_list})
+    page = get_cached_provider_stats(ordering, request.GET.get('offset', '0'), get_page_size(request.GET), compute)
+    return Response(page)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -1152,7 +1289,7 @@ def get_applicants(request):
 @permission_classes([IsAuthenticated])
 def user_profile_detail(request):
     try:
-        profile = UserProfile.objects.get(user=request.user)
+        profile = request.user.userprofile
     except UserProfile.DoesNotExist:
         return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
 
@@ -1186,7 +1323,7 @@ def user_profile_detail(request):
 def api_get_conversations(request):
     """API endpoint for fetching all conversations for a user"""
     try:
-        user_profile = UserProfile.objects.get(user=request.user)        # Get all messages where the user is either sender or recipient
+        user_profile = request.user.userprofile        # Get all messages where the user is either sender or recipient
         all_messages = Message.objects.filter(
             Q(sender=user_profile) | Q(recipient=user_profile)
         ).order_by('timestamp')
@@ -1234,27 +1371,55 @@ def api_get_conversations(request):
     except UserProfile.DoesNotExist:
         return Response({'error': 'User profile not found'}, status=404)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_conversation_thread(request, other_user_id):
+    """API endpoint for fetching one conversation thread, cursor-paginated and returned oldest first"""
+    try:
+        user_profile = request.user.userprofile
+        other_user = UserProfile.objects.select_related('user').get(id=other_user_id)
+    except UserProfile.DoesNotExist:
+        return Response({'error': 'User profile not found'}, status=404)
+
+    thread_messages = Message.objects.filter(
+        Q(sender=user_profile, recipient=other_user) |
+        Q(sender=other_user, recipient=user_profile)
+    ).select_related('sender__user', 'recipient__user')
+    messages, page_info = paginate_messages(thread_messages, request.query_params, chronological=True)
+
+    unread_count = Message.objects.filter(sender=other_user, recipient=user_profile, is_read=False).count()
+
+    serializer = ConversationSerializer({
+        'other_user': other_user,
+        'messages': messages,
+        'last_message_timestamp': messages[-1].timestamp if messages else None,
+        'unread_count': unread_count,
+    }, context={'request': request})
+    return Response({**serializer.data, **page_info})
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def api_inbox(request):
-    """API endpoint for fetching a user's inbox (received messages)"""
+    """API endpoint for fetching a user's inbox (received messages), cursor-paginated newest first"""
     try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        messages = Message.objects.filter(recipient=user_profile).order_by('-timestamp')
+        user_profile = request.user.userprofile
+        messages = Message.objects.filter(recipient=user_profile).select_related('sender__user', 'recipient__user')
+        messages, page_info = paginate_messages(messages, request.query_params)
         serializer = MessageSerializer(messages, many=True, context={'request': request})
-        return Response(serializer.data)
+        return Response({'results': serializer.data, **page_info})
     except UserProfile.DoesNotExist:
         return Response({'error': 'User profile not found'}, status=404)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def api_sent_messages(request):
-    """API endpoint for fetching a user's sent messages"""
+    """API endpoint for fetching a user's sent messages, cursor-paginated newest first"""
     try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        messages = Message.objects.filter(sender=user_profile).order_by('-timestamp')
+        user_profile = request.user.userprofile
+        messages = Message.objects.filter(sender=user_profile).select_related('sender__user', 'recipient__user')
+        messages, page_info = paginate_messages(messages, request.query_params)
         serializer = MessageSerializer(messages, many=True, context={'request': request})
-        return Response(serializer.data)
+        return Response({'results': serializer.data, **page_info})
     except UserProfile.DoesNotExist:
         return Response({'error': 'User profile not found'}, status=404)
 
@@ -1263,7 +1428,7 @@ def api_sent_messages(request):
 def api_send_message(request):
     """API endpoint for sending a message"""
     try:
-        sender_profile = UserProfile.objects.get(user=request.user)
+        sender_profile = request.user.userprofile
         
             
         recipient_id = request.data.get('recipient_id')
@@ -1277,14 +1442,22 @@ def api_send_message(request):
         except UserProfile.DoesNotExist:
             return Response({'error': 'Recipient not found'}, status=404)
             
-        # Create the message
-        message = Message.objects.create(
-            sender=sender_profile,
-            recipient=recipient_profile,
-            content=content
-        )
+        # Create the message and bump the recipient's unread counter together
+        with transaction.atomic():
+            message = Message.objects.create(
+                sender=sender_profile,
+                recipient=recipient_profile,
+                content=content
+            )
+            UserProfile.objects.filter(pk=recipient_profile.pk).update(unread_message_count=F('unread_message_count') + 1)
+        process_challenge_event(recipient_profile, MESSAGE_RECEIVED)
         
         serializer = MessageSerializer(message, context={'request': request})
+
+        # Push the new message and unread badge to the recipient's open streams
+        publish_to_user(recipient_profile.id, 'message', serializer.data)
+        publish_unread_count(recipient_profile)
+
         return Response(serializer.data, status=201)
     except UserProfile.DoesNotExist:
         return Response({'error': 'User profile not found'}, status=404)
@@ -1294,11 +1467,11 @@ def api_send_message(request):
 def api_mark_message_read(request, message_id):
     """API endpoint for marking a message as read"""
     try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        message = Message.objects.get(id=message_id, recipient=user_profile)
-        
-        message.is_read = True
-        message.save()
+        user_profile = request.user.userprofile
+        messages = Message.objects.filter(id=message_id, recipient=user_profile)
+
+        if not mark_messages_read(user_profile, messages) and not messages.exists():
+            raise Message.DoesNotExist
         
         return Response({'status': 'Message marked as read'})
     except UserProfile.DoesNotExist:
@@ -1306,13 +1479,105 @@ def api_mark_message_read(request, message_id):
     except Message.DoesNotExist:
         return Response({'error': 'Message not found or you don\'t have permission to access it'}, status=404)
 
+@api_view(['PATCH'])
+@permission_classes([IsAuthenticated])
+def api_mark_conversation_read(request, other_user_id):
+    """API endpoint for marking every message received from one user as read"""
+    try:
+        user_profile = request.user.userprofile
+    except UserProfile.DoesNotExist:
+        return Response({'error': 'User profile not found'}, status=404)
+
+    marked = mark_messages_read(user_profile, Message.objects.filter(sender_id=other_user_id, recipient=user_profile))
+    return Response({'status': 'Conversation marked as read', 'marked_count': marked})
+
+def mark_messages_read(user_profile, messages):
+    """
+    Marks the given received messages as read and decrements the profile's unread
+    counter by the number actually flipped, one UPDATE each. Returns that number.
+    """
+    with transaction.atomic():
+        marked = messages.filter(is_read=False).update(is_read=True)
+        if marked:
+            UserProfile.objects.filter(pk=user_profile.pk).update(
+                unread_message_count=Greatest(F('unread_message_count') - marked, 0)
+            )
+    if marked:
+        publish_unread_count(user_profile)
+        process_challenge_event(user_profile, MESSAGES_READ)
+    return marked
+
+def get_unread_count(user_profile):
+    return UserProfile.objects.values_list('unread_message_count', flat=True).get(pk=user_profile.pk)
+
+def publish_unread_count(user_profile):
+    publish_to_user(user_profile.id, 'unread_count', {'unread_count': get_unread_count(user_profile)})
+
+STREAM_HEARTBEAT_SECONDS = getattr(settings, 'REALTIME_HEARTBEAT_SECONDS', 15)
+
+def authenticate_stream_request(request):
+    """
+    Resolves the profile for an event stream. EventSource cannot send an
+    Authorization header, so the JWT access token is accepted as ?token= as well
+    as in the header. Falls back to the session user.
+    """
+    token = request.GET.get('token')
+    jwt_auth = ProfileJWTAuthentication()
+    if not token:
+        # fetch()-based streams can send the usual header
+        token = jwt_auth.get_raw_token(jwt_auth.get_header(request) or b'')
+    if token:
+        try:
+            user = jwt_auth.get_user(jwt_auth.get_validated_token(token))
+        except (InvalidToken, TokenError):
+            return None
+    else:
+        user = request.user
+    if not user.is_authenticated:
+        return None
+    try:
+        return user.userprofile
+    except UserProfile.DoesNotExist:
+        return None
+
+async def api_event_stream(request):
+    """
+    Server-Sent Events stream of new messages, unread-count changes and grading
+    results for the current user. Replaces polling messages/unread-count/; serve
+    the app through appbackend.asgi so open streams do not each hold a worker thread.
+    """
+    user_profile = await sync_to_async(authenticate_stream_request)(request)
+    if user_profile is None:
+        return JsonResponse({'error': 'Authentication credentials were not provided or are invalid'}, status=401)
+
+    subscription = get_backend().subscribe(user_channel(user_profile.id))
+
+    async def event_stream():
+        async with subscription:
+            # Read after subscribing: a change made in between is also delivered as an event
+            initial_count = await sync_to_async(
+                UserProfile.objects.values_list('unread_message_count', flat=True).get
+            )(pk=user_profile.pk)
+            yield format_sse({'type': 'unread_count', 'data': {'unread_count': initial_count}})
+            while True:
+                event = await subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Comment line keeps proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                else:
+                    yield format_sse(event)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def api_unread_message_count(request):
     """API endpoint for getting the count of unread messages"""
     try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        count = Message.objects.filter(recipient=user_profile, is_read=False).count()
+        count = request.user.userprofile.unread_message_count
         return Response({'unread_count': count})
     except UserProfile.DoesNotExist:
         return Response({'error': 'User profile not found'}, status=404)
@@ -1321,10 +1586,9 @@ def api_unread_message_count(request):
 @permission_classes([IsAuthenticated])
 def api_gamification_profile(request):
     """Return gamification data for the current user (progress, points, level, badges, challenges)"""
-    profile = UserProfile.objects.get(user=request.user)
-    # Update profile completion
-    profile.profile_completion = profile.calculate_profile_completion()
-    profile.save()
+    # Read-only: profile_completion is stored and kept current by the completion receivers below
+    profile = request.user.userprofile
+    prefetch_related_objects([profile], 'skills', 'references', 'education', 'badges', 'challenges')
     serializer = UserProfileSerializer(profile, context={'request': request})
     return Response(serializer.data)
 
@@ -1340,27 +1604,16 @@ def api_gamification_badges(request):
 @permission_classes([IsAuthenticated])
 def api_gamification_challenges(request):
     """
-    Returns all active challenges for the authenticated user.
-    First, it ensures UserChallenge entries exist for all active challenges.
-    Then, it uses the new logic to check and update progress before serialization.
+    Returns all active challenges for the authenticated user. Read-only: rows are
+    provisioned and first evaluated when a challenge goes live or the profile is
+    created (see provision_challenges), and kept current by challenge events
+    (applying, favoriting, messages, profile saves).
     """
     user_profile = request.user.userprofile
-    
-    active_challenges = Challenge.objects.filter(
-        start_date__lte=timezone.now().date(),
-        end_date__gte=timezone.now().date()
-    )
-
-    # Ensure UserChallenge objects exist.
-    for challenge in active_challenges:
-        UserChallenge.objects.get_or_create(user=user_profile, challenge=challenge)
-
-    # Use the new, robust checking mechanism.
-    update_all_challenges_for_user(user_profile)
 
     user_challenges = UserChallenge.objects.filter(
         user=user_profile,
-        challenge__in=active_challenges
+        challenge__in=get_active_challenges()
     ).select_related('challenge', 'challenge__badge').order_by('is_completed', 'challenge__end_date')
 
     serializer = UserChallengeSerializer(user_challenges, many=True)
@@ -1369,54 +1622,103 @@ def api_gamification_challenges(request):
 @api_view(['GET'])
 @permission_classes([AllowAny])
 def api_gamification_leaderboard(request):
-    """Return leaderboards for applications, profile completion, and completed challenges."""
-    # Top by applications
-    top_applications = UserProfile.objects.filter(is_job_provider=False, opt_in_leaderboard=True).order_by('-num_applications')[:10]
-    
-    # Top by profile completion
-    top_completion = UserProfile.objects.filter(is_job_provider=False, opt_in_leaderboard=True).order_by('-profile_completion')[:10]
-    
-    # Top by completed challenges
-    top_challenge_completers = UserProfile.objects.filter(
-        is_job_provider=False, 
-        opt_in_leaderboard=True
-    ).annotate(
-        num_challenges_completed=Count('user_challenges', filter=Q(user_challenges__is_completed=True))
-    ).order_by('-num_challenges_completed')[:10]
+    """
+    Return leaderboards for applications, profile completion, and completed challenges.
+    Reads the materialized LeaderboardEntry rows (cached briefly), one query per board on a miss.
+    """
+    return Response({board: serialize_leaderboard(request, board) for board in BOARDS})
 
-    return Response({
-        'applications': UserProfileSerializer(top_applications, many=True, context={'request': request}).data,
-        'profile_completion': UserProfileSerializer(top_completion, many=True, context={'request': request}).data,
-        'challenge_completers': UserProfileSerializer(top_challenge_completers, many=True, context={'request': request}).data,
-    })
+def serialize_leaderboard(request, board):
+    stat_key = BOARDS[board]
+    rows = []
+    for rank, entry in get_leaderboard(board):
+        data = LeaderboardEntrySerializer(entry, context={'request': request}).data
+        # The board's stat key is kept alongside score for existing clients
+        rows.append({'rank': rank, **data, stat_key: entry.score})
+    return rows
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def api_gamification_my_rank(request):
+    """Return the current user's rank and score on each leaderboard they appear on."""
+    profile_id = request.user.userprofile.id
+    return Response(get_ranks(profile_id))
 
 # --- Award points and badges on key actions ---
+# Profile completion is recomputed only when one of its inputs changes: the profile's own
+# completion fields, the user's name/email, skills, references or education.
+def profile_completion_inputs_changed(user_profile, refresh_leaderboard=True):
+    if refresh_profile_completion(user_profile):
+        process_challenge_event(user_profile, PROFILE_COMPLETION_CHANGED)
+        if refresh_leaderboard:
+            refresh_leaderboard_entries(user_profile.pk)
+
 @receiver(post_save, sender=UserProfile)
 def update_profile_completion_and_badges(sender, instance, created, **kwargs):
-    # Calculate new profile completion
-    new_completion = instance.calculate_profile_completion()
-    if instance.profile_completion != new_completion:
-        UserProfile.objects.filter(pk=instance.pk).update(profile_completion=new_completion)
-    # Award badge logic (do NOT call instance.save() here)
-    if new_completion >= 100:
-        badge, _ = Badge.objects.get_or_create(
-            name="All-Star Profile",
-            defaults={'description': "Completed 100% of your profile!", 'icon': "star"},
-        )
-        instance.badges.add(badge)
-    elif new_completion >= 50:
-        badge, _ = Badge.objects.get_or_create(
-            name="Profile 50% Complete",
-            defaults={'description': "Completed 50% of your profile!", 'icon': "star"},
-        )
-        instance.badges.add(badge)
-
-# Example: award points and badges on job application
+    if created or instance.completion_fields_changed():
+        # refresh_profile_leaderboards runs next for every profile save
+        profile_completion_inputs_changed(instance, refresh_leaderboard=False)
+    instance._completion_snapshot = instance.completion_field_values()
+
+@receiver(post_save, sender=User)
+def user_details_completion(sender, instance, created, update_fields, **kwargs):
+    # Logins save last_login only; skip saves that cannot touch name or email
+    if created or (update_fields is not None and not {'first_name', 'last_name', 'email'} & set(update_fields)):
+        return
+    user_profile = UserProfile.objects.filter(user=instance).first()
+    if user_profile is not None:
+        user_profile.user = instance
+        profile_completion_inputs_changed(user_profile)
+
+@receiver(post_delete, sender=Reference)
+@receiver(post_delete, sender=Education)
+def profile_relation_deleted(sender, instance, **kwargs):
+    user_profile = UserProfile.objects.filter(pk=instance.user_profile_id).first()
+    if user_profile is not None:
+        profile_completion_inputs_changed(user_profile)
+
+@receiver(post_delete, sender=Badge)
+def forget_badge_id(sender, instance, **kwargs):
+    cache.delete(badge_cache_key(instance.name))
+
+# --- Challenge events ---
+# Each receiver re-evaluates only the challenges its event can affect (see challenge_logic.EVENT_CHALLENGE_KINDS)
 @receiver(m2m_changed, sender=UserProfile.applied_jobs.through)
-def award_application_badges(sender, instance, action, **kwargs):
-    if action == "post_add":
-        # This function is now also responsible for checking application-related challenges
-        update_all_challenges_for_user(instance)
+def award_application_badges(sender, instance, action, reverse, **kwargs):
+    if action == "post_add" and not reverse:
+        process_challenge_event(instance, APPLIED)
+
+@receiver(m2m_changed, sender=UserProfile.favorited_jobs.through)
+def favorited_job_challenges(sender, instance, action, reverse, **kwargs):
+    if action == "post_add" and not reverse:
+        process_challenge_event(instance, FAVORITED)
+
+@receiver(m2m_changed, sender=UserProfile.skills.through)
+def skills_changed_challenges(sender, instance, action, reverse, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear") and not reverse:
+        profile_completion_inputs_changed(instance)
+
+@receiver(post_save, sender=UserProfile)
+def profile_saved_challenges(sender, instance, created, **kwargs):
+    if not created:
+        process_challenge_event(instance, PROFILE_SAVED)
+
+@receiver(post_save, sender=UserProfile)
+def refresh_profile_leaderboards(sender, instance, **kwargs):
+    # Connected after update_profile_completion_and_badges so the stored completion is current
+    refresh_leaderboard_entries(instance.pk)
+
+@receiver(post_save, sender=Reference)
+def reference_added_challenges(sender, instance, created, **kwargs):
+    if created:
+        process_challenge_event(instance.user_profile, REFERENCE_ADDED)
+        profile_completion_inputs_changed(instance.user_profile)
+
+@receiver(post_save, sender=Education)
+def education_saved_challenges(sender, instance, created, **kwargs):
+    # Completion only counts whether education exists, so edits cannot move it
+    if created:
+        profile_completion_inputs_changed(instance.user_profile)
 
 # Award badges for challenges completed (assume a completed_challenges m2m or similar)
 def award_challenge_badges(user_profile):
@@ -1434,12 +1736,24 @@ def award_challenge_badges(user_profile):
 
 # Utility: assign new default challenges to all existing profiles
 def assign_new_challenges_to_all():
-    from datetime import date
-    today = date.today()
-    default_challenges = Challenge.objects.filter(start_date__lte=today, end_date__gte=today)
-    for profile in UserProfile.objects.all():
-        profile.challenges.set(default_challenges)
-        profile.save()
+    provision_challenges(get_active_challenges().values_list('id', flat=True))
+
+# Provision challenges in bulk as soon as they go live, and for each new profile.
+# Only a save that creates an active challenge or moves one from inactive to active
+# provisions it, after the commit; edits to a live challenge do not walk every profile again.
+# Challenges whose start date is in the future are picked up by `manage.py provision_challenges`.
+@receiver(post_save, sender=Challenge)
+def provision_active_challenge(sender, instance, created, **kwargs):
+    was_active = getattr(instance, '_was_active', False)
+    instance._was_active = instance.is_active()
+    if instance._was_active and (created or not was_active):
+        challenge_id = instance.pk
+        transaction.on_commit(lambda: provision_challenges([challenge_id]))
+
+@receiver(post_save, sender=UserProfile)
+def provision_new_profile_challenges(sender, instance, created, **kwargs):
+    if created:
+        provision_challenges_for_profiles(list(get_active_challenges().values_list('id', flat=True)), [instance.pk])
 
 @api_view(['POST'])
 @permission_classes([IsAdminUser])
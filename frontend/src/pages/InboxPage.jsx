@@ -34,9 +34,7 @@ const InboxPage = () => {
   const { user } = useAuth();
   const messagesContainerRef = useRef(null);
   const convPollingRef = useRef(null);
-  const msgPollingRef = useRef(null);
   const isFetchingConvs = useRef(false);
-  const isFetchingMsgs = useRef(false);
 
   const scrollToBottom = () => {
      const container = messagesContainerRef.current;
@@ -65,34 +63,6 @@ const InboxPage = () => {
     }
   };
 
-  // Fetch only updates (new messages) for the active conversation
-  const fetchConversationUpdates = async (conversationId) => {
-    if (isFetchingMsgs.current || !selectedConversation) return;
-    isFetchingMsgs.current = true;
-    try {
-      const response = await api.get(`/conversations/`);
-      const updated = response.data;
-      const existingIds = new Set(selectedConversation.messages.map(m => m.id));
-      const newMsgs = updated.messages.filter(m => !existingIds.has(m.id));
-      if (newMsgs.length) {
-        setSelectedConversation(prev => ({
-          ...prev,
-          messages: [...prev.messages, ...newMsgs],
-          last_message_timestamp: updated.last_message_timestamp,
-          unread_count: updated.unread_count
-        }));
-        setConversations(prev => prev.map(conv => conv.id === conversationId
-          ? { ...conv, messages: updated.messages, last_message_timestamp: updated.last_message_timestamp, unread_count: updated.unread_count }
-          : conv));
-        scrollToBottom();
-      }
-    } catch (err) {
-      console.error('Polling update error:', err);
-    } finally {
-      isFetchingMsgs.current = false;
-    }
-  };
-
   // Load an entire conversation immediately
   const loadConversation = async (conversationId) => {
     try {
@@ -109,25 +79,38 @@ const InboxPage = () => {
     }
   }, [user]);
   
-  // Start 1s polling for conversations and active conversation updates
+  // Live updates from the server's event stream: a new message refreshes the conversation
+  // list and the open conversation. Falls back to polling if the stream cannot be opened.
+  const selectedIdRef = useRef(null);
   useEffect(() => {
-    clearInterval(convPollingRef.current);
-    clearInterval(msgPollingRef.current);
-    // poll all conversations every 1.5s without loader
-    convPollingRef.current = setInterval(() => {
-      if (document.visibilityState === 'visible') fetchConversations(false);
-    }, 1500);
-    // poll active convo messages every 1.5s
-    if (selectedConversation) {
-      msgPollingRef.current = setInterval(() => {
-        if (document.visibilityState === 'visible') fetchConversationUpdates(selectedConversation.id);
-      }, 1500);
-    }
+    selectedIdRef.current = selectedConversation ? selectedConversation.id : null;
+  }, [selectedConversation]);
+
+  useEffect(() => {
+    if (!user) return undefined;
+    const token = localStorage.getItem('access_token') || '';
+    const source = new EventSource(`${api.defaults.baseURL}/events/?token=${encodeURIComponent(token)}`);
+    source.addEventListener('message', () => {
+      fetchConversations(false);
+      if (selectedIdRef.current) loadConversation(selectedIdRef.current);
+    });
+    source.onerror = () => {
+      // EventSource retries dropped connections itself; it gives up only on a rejected one
+      if (source.readyState === EventSource.CLOSED && !convPollingRef.current) {
+        convPollingRef.current = setInterval(() => {
+          if (document.visibilityState === 'visible') {
+            fetchConversations(false);
+            if (selectedIdRef.current) loadConversation(selectedIdRef.current);
+          }
+        }, 1500);
+      }
+    };
     return () => {
+      source.close();
       clearInterval(convPollingRef.current);
-      clearInterval(msgPollingRef.current);
+      convPollingRef.current = null;
     };
-  }, [selectedConversation]);
+  }, [user]);
 
   // auto-scroll to bottom whenever a new conversation is loaded or messages update
   useEffect(() => {